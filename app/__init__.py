@@ -1,19 +1,72 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app import change_stream, compression, instrumentation, syndication
+from app.json_provider import FastJSONProvider
 
 from app.routes.newsletter import newsletter_bp
 from app.routes.posts import posts_bp
 from app.routes.categories import categories_bp
+from app.routes.metrics import metrics_bp
+from app.routes.health import health_bp
+from app.routes.feeds import feeds_bp
+from app.routes.changes import changes_bp
+from app.workers.newsletter_worker import start_background_worker
+from app.workers.feed_scheduler import start_background_scheduler
+from app.workers.outbox_dispatcher import start_background_dispatcher
+from config import Config
 
 
 def create_app():
     app = Flask(__name__)
+    if Config.PROXY_COUNT:
+        # request.remote_addr pasa a ser la IP real del cliente (lo usa app/rate_limit.py).
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.PROXY_COUNT)
+    if Config.JSON_PROVIDER == "fast":
+        app.json = FastJSONProvider(app)
     CORS(app)
+    instrumentation.init_app(app)
+    compression.init_app(app)
 
     # Registrar blueprints
 
     app.register_blueprint(newsletter_bp)
     app.register_blueprint(posts_bp)
     app.register_blueprint(categories_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(feeds_bp)
+    app.register_blueprint(changes_bp)
+    syndication.init_app(app)
+
+    # Con PRELOAD_APP la app se crea en el proceso maestro de gunicorn; los hilos
+    # de los workers no sobrevivirían al fork, así que los arranca warm_up() en cada hijo.
+    if not Config.PRELOAD_APP:
+        start_background_worker()
+        start_background_scheduler()
+        start_background_dispatcher()
+        change_stream.start_listener()
 
     return app
+
+
+def warm_up():
+    """
+    Prepara el proceso actual antes de su primera petición: abre el pool de
+    conexiones (DB_POOL_MIN) si DB_POOL_PREWARM está activo y arranca el worker
+    embebido de la newsletter, el programador del feed, el dispatcher del
+    outbox de cambios y la escucha de /changes. Se llama desde el hook
+    post_fork de gunicorn.conf.py.
+    """
+    if Config.DB_POOL_PREWARM:
+        from app.db import init_pool
+        try:
+            init_pool()
+        except Exception as e:
+            # Sin base de datos el worker arranca igual; el pool se creará en la primera petición.
+            print(f"No se pudo precalentar el pool: {e}")
+    start_background_worker()
+    start_background_scheduler()
+    start_background_dispatcher()
+    change_stream.start_listener()
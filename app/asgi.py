@@ -0,0 +1,275 @@
+"""
+Modo de servicio ASGI.
+
+Las lecturas más frecuentes (/posts, /posts/search, /posts/<id> y /categories)
+se atienden de forma nativa con un pool asíncrono de psycopg; el resto de rutas
+de los blueprints se delegan a la app Flask a través de WsgiToAsgi.
+"""
+import functools
+import time
+from contextlib import asynccontextmanager
+from asgiref.wsgi import WsgiToAsgi
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.http import http_date, parse_date, parse_etags
+from app import create_app
+from app.auth import ADMIN_REQUIRED_MESSAGE, is_admin_token
+from app.async_db import open_async_pool, close_async_pool
+from app.cache import request_versions
+from app.compression import is_compressible, negotiate, compress_cached
+from app.http_cache import make_etag, combine_versions
+from app.instrumentation import http_request_duration
+from app.rate_limit import check_rate_limit, client_ip, parse_limit
+from app.routes.posts import parse_bool
+from app.services.async_reads import AsyncReadsService
+from app.services.posts_service import DEFAULT_PAGE_SIZE
+from config import Config
+
+
+def _int_arg(request, name, default):
+    # Mismo comportamiento que request.args.get(name, default, type=int) en Flask.
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def create_asgi_app():
+    flask_app = create_app()
+
+    def json_response(payload, status=200):
+        # Se serializa con el proveedor JSON de Flask para que la salida sea idéntica al modo WSGI.
+        body = flask_app.json.response(payload).get_data()
+        return Response(body, status_code=status, media_type="application/json",
+                        headers={"Access-Control-Allow-Origin": "*"})
+
+    def cache_headers(response, etag, last_modified):
+        response.headers["ETag"] = f'W/"{etag}"' if Config.COMPRESS_ENABLED else f'"{etag}"'
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        response.headers["Cache-Control"] = f"public, max-age={Config.HTTP_CACHE_MAX_AGE}, must-revalidate"
+        return response
+
+    def conditional(*table_names):
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(request):
+                if "authorization" in request.headers:
+                    # Como en app/http_cache.py: las lecturas de administración no se cachean.
+                    response = await handler(request)
+                    response.headers["Cache-Control"] = "private, no-store"
+                    return response
+                try:
+                    version = combine_versions({
+                        name: await AsyncReadsService.get_version(name) for name in table_names
+                    })
+                except Exception as e:
+                    print(f"No se pudo obtener la versión de {', '.join(table_names)}: {e}")
+                    version = None
+                if version is None:
+                    return await handler(request)
+
+                numbers, last_modified = version
+                etag = make_etag(numbers, f"{request.url.path}?{request.url.query}")
+
+                if_none_match = request.headers.get("if-none-match")
+                if_modified_since = parse_date(request.headers.get("if-modified-since"))
+                if if_none_match:
+                    not_modified = parse_etags(if_none_match).contains_weak(etag)
+                else:
+                    not_modified = bool(if_modified_since and last_modified
+                                        and last_modified.replace(microsecond=0) <= if_modified_since)
+                if not_modified:
+                    response = Response(status_code=304, headers={"Access-Control-Allow-Origin": "*"})
+                    return cache_headers(response, etag, last_modified)
+
+                token = request_versions.set(numbers)
+                try:
+                    response = await handler(request)
+                finally:
+                    request_versions.reset(token)
+                if response.status_code == 200:
+                    cache_headers(response, etag, last_modified)
+                return response
+            return wrapper
+        return decorator
+
+    def compressed(handler):
+        # Equivalente a app/compression.py para las respuestas nativas.
+        @functools.wraps(handler)
+        async def wrapper(request):
+            response = await handler(request)
+            if not Config.COMPRESS_ENABLED:
+                return response
+            response.headers["Vary"] = "Accept-Encoding"
+            if not is_compressible(response.media_type, response.status_code, response.headers):
+                return response
+            encoding = negotiate(request.headers.get("accept-encoding"))
+            if encoding is None or len(response.body) < Config.COMPRESS_MIN_SIZE:
+                return response
+            response.body = compress_cached(response.body, encoding, cacheable="etag" in response.headers)
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Content-Length"] = str(len(response.body))
+            return response
+        return wrapper
+
+    def rate_limited(endpoint, limit):
+        # Mismo límite y mismo almacén que el decorador de app/rate_limit.py.
+        limit = parse_limit(limit)
+
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(request):
+                ip = client_ip(request.client.host if request.client else None,
+                               request.headers.get("x-forwarded-for"))
+                if Config.RATE_LIMIT_BACKEND == "postgres":
+                    retry_after = await run_in_threadpool(check_rate_limit, endpoint, ip, limit)
+                else:
+                    retry_after = check_rate_limit(endpoint, ip, limit)
+                if retry_after:
+                    response = json_response(
+                        {"status": "error", "message": "Demasiadas peticiones, inténtalo más tarde"}, 429
+                    )
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response
+                return await handler(request)
+            return wrapper
+        return decorator
+
+    def timed(route):
+        # Mismas etiquetas que el middleware de Flask (app/instrumentation.py).
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(request):
+                started = time.perf_counter()
+                response = await handler(request)
+                http_request_duration.observe(
+                    time.perf_counter() - started,
+                    method=request.method, route=route, status=str(response.status_code)
+                )
+                return response
+            return wrapper
+        return decorator
+
+    @timed('/posts')
+    @compressed
+    @conditional('posts')
+    async def get_posts(request):
+        try:
+            limit = _int_arg(request, 'limit', DEFAULT_PAGE_SIZE)
+            fields = request.query_params.get('fields')
+            fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+            is_published = parse_bool(request.query_params.get('published'))
+        except ValueError as e:
+            return json_response({"status": "error", "message": str(e)}, 400)
+        if is_published is False and not is_admin_token(request.headers.get("authorization")):
+            return json_response({"status": "error", "message": ADMIN_REQUIRED_MESSAGE}, 401)
+
+        try:
+            page = await AsyncReadsService.get_index_page(
+                limit=limit,
+                cursor=request.query_params.get('cursor'),
+                fields=fields,
+                category=request.query_params.get('category'),
+                is_published=is_published
+            )
+            return json_response({
+                "status": "success",
+                "data": page["data"],
+                "count": len(page["data"]),
+                "next_cursor": page["next_cursor"]
+            })
+        except ValueError as e:
+            return json_response({"status": "error", "message": str(e)}, 400)
+        except Exception as e:
+            return json_response({"status": "error", "message": str(e)}, 500)
+
+    @timed('/posts/search')
+    @rate_limited('search', Config.RATE_LIMIT_SEARCH)
+    @compressed
+    @conditional('posts')
+    async def search_posts(request):
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return json_response({"message": "El parámetro 'q' es obligatorio"}, 400)
+        try:
+            results = await AsyncReadsService.search_posts(
+                q, limit=_int_arg(request, 'limit', DEFAULT_PAGE_SIZE), offset=_int_arg(request, 'offset', 0)
+            )
+            return json_response({
+                "status": "success",
+                "data": results["data"],
+                "count": len(results["data"]),
+                "next_offset": results["next_offset"]
+            })
+        except ValueError as e:
+            return json_response({"status": "error", "message": str(e)}, 400)
+        except Exception as e:
+            return json_response({"status": "error", "message": str(e)}, 500)
+
+    @timed('/posts/<post_id>')
+    @compressed
+    @conditional('posts')
+    async def get_post(request):
+        try:
+            include_content = parse_bool(request.query_params.get('content'))
+        except ValueError as e:
+            return json_response({"status": "error", "message": str(e)}, 400)
+
+        try:
+            if include_content is False:
+                post = await AsyncReadsService.get_post_summary(request.path_params['post_id'])
+            else:
+                post = await AsyncReadsService.get_post_by_id(request.path_params['post_id'])
+            if post is None:
+                return json_response({"status": "error", "message": "Post no encontrado"}, 404)
+            return json_response({"status": "success", "data": post})
+        except Exception as e:
+            return json_response({"status": "error", "message": str(e)}, 500)
+
+    @timed('/categories')
+    @compressed
+    @conditional('categories')
+    async def get_categories(request):
+        try:
+            with_counts = parse_bool(request.query_params.get('with_counts'))
+        except ValueError as e:
+            return json_response({"status": "error", "message": str(e)}, 400)
+
+        try:
+            if with_counts:
+                categories = await AsyncReadsService.get_categories_with_counts()
+            else:
+                categories = await AsyncReadsService.get_all_categories()
+            return json_response({
+                "status": "success",
+                "data": categories,
+                "count": len(categories)
+            })
+        except Exception as e:
+            return json_response({"status": "error", "message": str(e)}, 500)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await open_async_pool()
+        yield
+        await close_async_pool()
+
+    flask_asgi = WsgiToAsgi(flask_app)
+
+    return Starlette(
+        routes=[
+            Route('/posts', get_posts, methods=['GET']),
+            Route('/posts/search', search_posts, methods=['GET']),
+            # Rutas fijas de Flask bajo /posts que si no capturaría /posts/{post_id}.
+            Route('/posts/batch', flask_asgi),
+            Route('/posts/export', flask_asgi),
+            Route('/posts/{post_id}', get_post, methods=['GET']),
+            Route('/categories', get_categories, methods=['GET']),
+            # Escrituras, newsletter, métricas y health siguen en Flask.
+            Mount('/', app=flask_asgi),
+        ],
+        lifespan=lifespan
+    )
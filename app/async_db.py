@@ -0,0 +1,100 @@
+import contextvars
+from contextlib import asynccontextmanager
+import psycopg
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from app.db import prefer_primary, next_replica_index, mark_replica_unhealthy
+from config import Config
+
+_pool = None
+_replica_pools = []
+# Réplica usada por la tarea actual, para que todas sus lecturas vean el mismo estado.
+_pinned_replica = contextvars.ContextVar("pinned_replica", default=None)
+
+
+async def open_async_pool():
+    """Abre el pool asíncrono. Se llama en el arranque (lifespan) del modo ASGI."""
+    global _pool
+    if _pool is None:
+        _pool = AsyncConnectionPool(
+            Config.POSTGRES_URI,
+            min_size=Config.DB_POOL_MIN,
+            max_size=Config.DB_POOL_MAX,
+            timeout=Config.DB_POOL_TIMEOUT,
+            open=False
+        )
+        await _pool.open()
+        for uri in Config.POSTGRES_REPLICA_URIS:
+            replica = AsyncConnectionPool(
+                uri,
+                min_size=0,
+                max_size=Config.DB_REPLICA_POOL_MAX,
+                timeout=Config.DB_POOL_TIMEOUT,
+                open=False
+            )
+            # Sin esperar: una réplica caída no debe impedir el arranque.
+            await replica.open(wait=False)
+            _replica_pools.append(replica)
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    while _replica_pools:
+        await _replica_pools.pop().close()
+
+
+async def _replica_getconn():
+    """
+    Conexión de una réplica sana como (índice, conexión), o (None, None) si
+    ninguna responde. Como en db._replica_connection, una réplica llena no se aparta.
+    """
+    pinned = _pinned_replica.get()
+    for _ in range(len(_replica_pools)):
+        index = next_replica_index(pinned)
+        if index is None:
+            break
+        pool = _replica_pools[index]
+        try:
+            conn = await pool.getconn(timeout=Config.DB_REPLICA_CHECKOUT_TIMEOUT)
+        except PoolTimeout:
+            pinned = None
+            continue
+        except psycopg.OperationalError:
+            mark_replica_unhealthy(index)
+            pinned = None
+            continue
+        _pinned_replica.set(index)
+        return index, conn
+    return None, None
+
+
+@asynccontextmanager
+async def async_connection(readonly=False):
+    """
+    Context manager asíncrono para usar una conexión del pool:
+
+        async with async_connection() as conn:
+            ...
+
+    Con readonly=True usa una réplica de lectura si hay alguna sana y no hace
+    falta leer lo recién escrito (ver db.prefer_primary); si no, el primario.
+    """
+    primary = await open_async_pool()
+    index, conn = (None, None)
+    if readonly and _replica_pools and not prefer_primary():
+        index, conn = await _replica_getconn()
+    if conn is None:
+        async with primary.connection() as conn:
+            yield conn
+        return
+    try:
+        async with conn:
+            yield conn
+    except psycopg.OperationalError:
+        mark_replica_unhealthy(index)
+        raise
+    finally:
+        await _replica_pools[index].putconn(conn)
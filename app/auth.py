@@ -0,0 +1,25 @@
+"""
+Acceso de administración a las lecturas que incluyen borradores.
+
+Las lecturas públicas solo ven el feed publicado. Los borradores y los posts
+programados solo se listan o exportan con el token de ADMIN_TOKEN en la
+cabecera `Authorization: Bearer <token>`.
+"""
+import hmac
+from flask import request
+from config import Config
+
+ADMIN_REQUIRED_MESSAGE = "Se requiere el token de administración para ver borradores"
+
+
+def is_admin_token(authorization):
+    """Indica si el valor de la cabecera Authorization lleva el token de administración."""
+    if not Config.ADMIN_TOKEN or not authorization:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), Config.ADMIN_TOKEN.encode())
+
+
+def is_admin():
+    """Indica si la petición de Flask en curso viene con el token de administración."""
+    return is_admin_token(request.headers.get("Authorization"))
@@ -0,0 +1,214 @@
+import functools
+import threading
+from contextvars import ContextVar
+import time
+from collections import OrderedDict
+from app.instrumentation import coalesced_requests
+from config import Config
+
+_MISSING = object()
+
+
+class _Flight:
+    """Carga en curso de una clave: los demás llamantes esperan su resultado."""
+
+    def __init__(self, event):
+        self.event = event
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Caché en memoria con expiración (TTL) y desalojo LRU, segura entre hilos.
+    Las claves son tuplas cuyo primer elemento es el espacio de nombres
+    (p. ej. ("posts", "index", ...)), lo que permite invalidar por prefijo.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_async = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, loader, coalesce=False):
+        """
+        Devuelve el valor cacheado para `key` o lo calcula con `loader()` y lo guarda.
+        Con coalesce=True, si otro hilo ya está calculando la misma clave se espera
+        a su resultado en lugar de repetir la consulta (single-flight).
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if not coalesce:
+            value = loader()
+            self.set(key, value)
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight(threading.Event())
+        if not leader:
+            coalesced_requests.inc(namespace=key[0])
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.set(key, flight.value)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    async def get_or_set_async(self, key, loader, coalesce=False):
+        """Igual que `get_or_set`, pero `loader` es una corrutina."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if not coalesce:
+            value = await loader()
+            self.set(key, value)
+            return value
+
+        # Solo se accede desde el bucle de eventos, así que no hace falta el lock.
+        # asyncio se importa aquí para no cargarlo en los workers WSGI.
+        import asyncio
+        flight = self._inflight_async.get(key)
+        if flight is not None:
+            coalesced_requests.inc(namespace=key[0])
+            await flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        flight = self._inflight_async[key] = _Flight(asyncio.Event())
+        try:
+            flight.value = await loader()
+            self.set(key, flight.value)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            self._inflight_async.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def invalidate_prefix(self, *prefix):
+        """Elimina todas las claves que empiezan por la tupla `prefix`."""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._data if k[:n] == prefix]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+read_cache = TTLCache(maxsize=Config.CACHE_MAX_ENTRIES, ttl=Config.CACHE_TTL_SECONDS)
+
+
+# Las entradas de read_cache se guardan bajo la versión de contenido
+# (content_versions) de su tabla, que es el espacio de nombres de la clave
+# ("posts" o "categories"). Una escritura en cualquier proceso incrementa la
+# versión, así que ningún proceso vuelve a servir lo leído antes de ella; las
+# entradas antiguas caducan solas por TTL o LRU.
+#
+# Durante una petición con GET condicional, `request_versions` guarda las
+# versiones ({tabla: número}) con las que se ha calculado su ETag, y las
+# lecturas cacheadas usan esas mismas: el cuerpo siempre corresponde al ETag
+# con el que se sirve, aunque haya escrituras entre medias.
+request_versions = ContextVar("request_versions", default=None)
+
+
+def content_version(table_name):
+    """Número de versión actual de `table_name` (None si no está registrada)."""
+    versions = request_versions.get()
+    if versions and table_name in versions:
+        return versions[table_name]
+    from app.services.versions_service import VersionsService
+    version = VersionsService.get_version(table_name)
+    return version[0] if version else None
+
+
+async def content_version_async(table_name):
+    """Igual que content_version, con la conexión asíncrona del modo ASGI."""
+    versions = request_versions.get()
+    if versions and table_name in versions:
+        return versions[table_name]
+    from app.services.async_reads import AsyncReadsService
+    version = await AsyncReadsService.get_version(table_name)
+    return version[0] if version else None
+
+
+def versioned(key, version):
+    """Clave de `key` para la versión de contenido `version` de su tabla."""
+    return key + (version,)
+
+
+def cached(key_func, cache=read_cache, coalesce=False):
+    """
+    Decorador de lectura a través de la caché: `key_func` recibe los mismos
+    argumentos que la función decorada y devuelve la clave (tupla), que se
+    guarda bajo la versión de contenido actual de su tabla (key[0]).
+    Con coalesce=True las llamadas idénticas simultáneas comparten una sola ejecución.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs)
+            key = versioned(key, content_version(key[0]))
+            return cache.get_or_set(key, lambda: func(*args, **kwargs), coalesce=coalesce)
+        return wrapper
+    return decorator
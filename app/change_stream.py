@@ -0,0 +1,78 @@
+"""
+Espera de eventos para el long-poll de /changes.
+
+Cada proceso abre al arrancar (start_listener, desde create_app o warm_up)
+una conexión que escucha el canal de cambios del dispatcher y despierta a las
+peticiones en espera. Así las peticiones no consultan la base de datos
+mientras esperan: solo una vez al entrar y otra al despertar.
+
+Cada petición en espera ocupa un hilo del worker, así que como mucho
+CHANGES_MAX_WAITERS peticiones esperan a la vez en cada proceso; el resto
+responden en el acto con la página vacía y el cliente vuelve a preguntar.
+"""
+import os
+import threading
+from app.db import listen_connection, wait_for_notifies
+from app.services.changes_service import CHANGES_CHANNEL
+from app.workers import start_once
+from config import Config
+
+RECONNECT_SECONDS = 5
+
+_state = {"pid": None, "position": 0}
+_condition = threading.Condition()
+_waiters = threading.BoundedSemaphore(Config.CHANGES_MAX_WAITERS)
+
+
+def _publish(position):
+    with _condition:
+        if position > _state["position"]:
+            _state["position"] = position
+            _condition.notify_all()
+
+
+def _listen(stop_event):
+    conn = None
+    while not stop_event.is_set():
+        try:
+            if conn is None or conn.closed:
+                conn = listen_connection(CHANGES_CHANNEL)
+            for notify in wait_for_notifies(conn, Config.CHANGES_LONGPOLL_SECONDS):
+                _publish(int(notify.payload))
+        except Exception as e:
+            print(f"Change stream error: {e}")
+            if conn is not None:
+                conn.close()
+                conn = None
+            # Sin conexión las esperas terminan por tiempo y el cliente vuelve a consultar.
+            stop_event.wait(RECONNECT_SECONDS)
+    if conn is not None:
+        conn.close()
+
+
+def start_listener():
+    """Arranca la escucha del canal de cambios (CHANGES_LISTENER_EMBEDDED) en este proceso."""
+    with _condition:
+        if _state["pid"] != os.getpid():
+            # La posición heredada de otro proceso no vale en este.
+            _state.update(pid=os.getpid(), position=0)
+    return start_once("change-stream", _listen, Config.CHANGES_LISTENER_EMBEDDED)
+
+
+def wait_for_change(since, timeout):
+    """
+    Espera hasta `timeout` segundos a que se despache un evento posterior a `since`.
+    Al volver hay que leer de nuevo los eventos aunque no haya llegado el aviso:
+    un evento despachado antes de que escuchara el proceso no se avisa.
+    Returns:
+        bool: False si ya hay CHANGES_MAX_WAITERS peticiones esperando y no se ha esperado
+    """
+    if not _waiters.acquire(blocking=False):
+        return False
+    try:
+        start_listener()
+        with _condition:
+            _condition.wait_for(lambda: _state["position"] > since, timeout)
+        return True
+    finally:
+        _waiters.release()
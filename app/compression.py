@@ -0,0 +1,120 @@
+"""
+Compresión negociada (brotli o gzip) de las respuestas de la API.
+
+Las respuestas con ETag (lecturas bajo @conditional) se comprimen una sola vez
+por contenido: los bytes comprimidos se guardan bajo un hash del cuerpo sin
+comprimir, así que nunca se sirven para otro cuerpo y no hace falta
+invalidarlos. No se usa el ETag como clave: la versión y el cuerpo salen de
+cachés distintas y pueden no corresponderse. Las respuestas por trozos (stream_jsonify, NDJSON) se comprimen
+de forma incremental sin esperar al final.
+"""
+import gzip
+import hashlib
+import zlib
+from flask import request
+from werkzeug.http import parse_accept_header
+from app.cache import TTLCache
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "text/html",
+    "text/plain",
+    "text/xml",
+}
+
+# Bytes comprimidos por (hash del cuerpo, codificación).
+compressed_cache = TTLCache(maxsize=Config.COMPRESS_CACHE_MAX_ENTRIES, ttl=Config.COMPRESS_CACHE_TTL_SECONDS)
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding):
+    """Elige 'br', 'gzip' o None según la cabecera Accept-Encoding del cliente."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(available_encodings())
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def compress_cached(body, encoding, cacheable=False):
+    """
+    Comprime `body`; con cacheable=True (respuestas con ETag) reutiliza el
+    resultado de una petición anterior con el mismo cuerpo.
+    """
+    if not cacheable:
+        return compress(body, encoding)
+    key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+    return compressed_cache.get_or_set(key, lambda: compress(body, encoding))
+
+
+def compress_stream(chunks, encoding):
+    """Comprime un iterable de bytes trozo a trozo, vaciando el compresor en cada uno."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=Config.COMPRESS_BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(Config.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def is_compressible(mimetype, status_code, headers):
+    return (
+        mimetype in COMPRESSIBLE_MIMETYPES
+        and 200 <= status_code < 300 and status_code != 204
+        and "Content-Encoding" not in headers
+    )
+
+
+def init_app(app):
+    """Registra la compresión de respuestas si COMPRESS_ENABLED está activo."""
+    if not Config.COMPRESS_ENABLED:
+        return
+
+    @app.after_request
+    def _compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES and response.status_code != 304:
+            return response
+        response.vary.add("Accept-Encoding")
+        if not is_compressible(response.mimetype, response.status_code, response.headers):
+            return response
+        encoding = negotiate(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < Config.COMPRESS_MIN_SIZE:
+                return response
+            etag, _ = response.get_etag()
+            response.set_data(compress_cached(body, encoding, cacheable=etag is not None))
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,111 @@
+"""
+Procesado del HTML de los posts al escribirlos.
+
+A partir de `content` se calculan una vez los campos derivados que se guardan
+junto al post (migrations/008_posts_derived_content.sql): texto plano, número
+de palabras, minutos de lectura, índice de encabezados y extracto. Así las
+lecturas y la búsqueda no vuelven a analizar el HTML en cada petición.
+"""
+import math
+from html.parser import HTMLParser
+from config import Config
+
+# Se incrementa al cambiar el cálculo, para que el backfill vuelva a procesar
+# los posts guardados con una versión anterior (ver app/workers/content_backfill.py).
+PROCESSING_VERSION = 1
+
+# Columnas de posts que se rellenan con process_content, en este orden.
+DERIVED_COLUMNS = ("content_text", "word_count", "reading_minutes", "toc", "excerpt", "content_version")
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Etiquetas que separan bloques de texto.
+BLOCK_TAGS = HEADING_TAGS | {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "header", "hr", "li", "main", "nav", "ol",
+    "p", "pre", "section", "table", "td", "th", "tr", "ul",
+}
+
+# Etiquetas cuyo contenido no es texto del post.
+SKIPPED_TAGS = {"script", "style", "template", "noscript", "iframe", "svg"}
+
+
+class _TextExtractor(HTMLParser):
+    """Recorre el HTML acumulando el texto por bloques y los encabezados."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = [[]]
+        self.toc = []
+        self._skipping = 0
+        self._heading = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in BLOCK_TAGS:
+            self.blocks.append([])
+        if tag in HEADING_TAGS and not self._skipping:
+            self._heading = {"level": int(tag[1]), "id": dict(attrs).get("id"), "text": []}
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in BLOCK_TAGS:
+            self.blocks.append([])
+        if tag in HEADING_TAGS and self._heading is not None:
+            text = " ".join("".join(self._heading["text"]).split())
+            if text:
+                self.toc.append({"level": self._heading["level"], "text": text, "id": self._heading["id"]})
+            self._heading = None
+
+    def handle_data(self, data):
+        if self._skipping:
+            return
+        self.blocks[-1].append(data)
+        if self._heading is not None:
+            self._heading["text"].append(data)
+
+
+def html_to_text(html):
+    """
+    Convierte el HTML de un post en texto plano: un bloque (párrafo,
+    encabezado, elemento de lista...) por línea y espacios normalizados.
+    Returns:
+        tuple: (texto: str, índice: lista de {"level", "text", "id"})
+    """
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    lines = (" ".join("".join(block).split()) for block in parser.blocks)
+    return "\n".join(line for line in lines if line), parser.toc
+
+
+def make_excerpt(text, max_chars):
+    """Primeros `max_chars` caracteres del texto, cortados en un límite de palabra."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars + 1]
+    cut = cut.rsplit(" ", 1)[0] if " " in cut else text[:max_chars]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def process_content(html):
+    """
+    Calcula los campos derivados del HTML de un post.
+    Args:
+        html (str): Contenido HTML del post
+    Returns:
+        dict: Un valor por cada columna de DERIVED_COLUMNS
+    """
+    text, toc = html_to_text(html)
+    word_count = len(text.split())
+    return {
+        "content_text": text,
+        "word_count": word_count,
+        "reading_minutes": math.ceil(word_count / Config.CONTENT_WORDS_PER_MINUTE),
+        "toc": toc,
+        "excerpt": make_excerpt(text, Config.CONTENT_EXCERPT_CHARS),
+        "content_version": PROCESSING_VERSION,
+    }
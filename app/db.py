@@ -1,21 +1,367 @@
+import itertools
+import os
+import select
+import threading
+import time
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
 import psycopg2.pool
+from flask import g, has_request_context
+from app.instrumentation import InstrumentedConnection, db_pool_wait
 from config import Config
 
-_pool = None
+
+class PoolExhaustedError(Exception):
+    """No se obtuvo una conexión libre antes de DB_POOL_TIMEOUT (o del timeout pedido)."""
+
+
+class _ProcessPool:
+    """
+    Pool de conexiones a un servidor, creado por proceso (tras el fork de cada
+    worker), con espera acotada por DB_POOL_TIMEOUT, validación de conexiones
+    inactivas y métricas.
+    """
+
+    def __init__(self, dsn, max_size, min_size):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.min_size = min_size
+        self.pool = None
+        self.pid = None
+        self.slots = None
+        self.lock = threading.Lock()
+        self.last_used = {}
+        # Pools heredados de otro proceso (p. ej. gunicorn con preload). Se conservan
+        # sin cerrarlos: cerrar sus sockets en el hijo cortaría las conexiones del padre.
+        self.inherited = []
+        # Pools sustituidos en este mismo proceso que aún tienen conexiones
+        # prestadas (pool -> cuántas); se cierran al volver la última.
+        self.retired = {}
+        self.metrics = {
+            "checkouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "in_use": 0,
+            "exhaustion_events": 0,
+            "discarded": 0,
+        }
+
+    def init(self):
+        with self.lock:
+            if self.pool is not None:
+                if self.pid != os.getpid():
+                    self.inherited.append(self.pool)
+                    self.inherited.extend(self.retired)
+                    self.retired.clear()
+                elif self.metrics["in_use"]:
+                    self.retired[self.pool] = self.metrics["in_use"]
+                else:
+                    self.pool.closeall()
+            self.pool = psycopg2.pool.ThreadedConnectionPool(
+                minconn=self.min_size,
+                maxconn=self.max_size,
+                dsn=self.dsn,
+                connection_factory=InstrumentedConnection
+            )
+            self.pid = os.getpid()
+            self.slots = threading.BoundedSemaphore(self.max_size)
+            self.last_used.clear()
+            self.metrics["in_use"] = 0
+        return self.pool
+
+    def get(self):
+        if self.pool is None or self.pid != os.getpid():
+            self.init()
+        return self.pool
+
+    def _is_usable(self, conn):
+        if conn.closed:
+            return False
+        idle = time.monotonic() - self.last_used.get(id(conn), 0.0)
+        if idle < Config.DB_POOL_VALIDATE_IDLE_SECONDS:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def checkout(self, timeout=None):
+        pool = self.get()
+        slots = self.slots
+        started = time.monotonic()
+        if not slots.acquire(timeout=Config.DB_POOL_TIMEOUT if timeout is None else timeout):
+            with self.lock:
+                self.metrics["exhaustion_events"] += 1
+            raise PoolExhaustedError("Pool de conexiones agotado")
+
+        try:
+            for _ in range(self.max_size + 1):
+                conn = pool.getconn()
+                if self._is_usable(conn):
+                    break
+                pool.putconn(conn, close=True)
+                with self.lock:
+                    self.metrics["discarded"] += 1
+            else:
+                raise psycopg2.OperationalError("No se pudo obtener una conexión válida")
+        except Exception:
+            slots.release()
+            raise
+
+        waited = time.monotonic() - started
+        db_pool_wait.observe(waited)
+        with self.lock:
+            self.metrics["checkouts"] += 1
+            self.metrics["wait_seconds_total"] += waited
+            self.metrics["wait_seconds_max"] = max(self.metrics["wait_seconds_max"], waited)
+            self.metrics["in_use"] += 1
+        conn.owner_pool = self
+        # La conexión vuelve siempre al pool del que salió, aunque entretanto
+        # se haya sustituido (init() de nuevo o fork).
+        conn.source_pool = pool
+        conn.source_slots = slots
+        return conn
+
+    def checkin(self, conn, discard=False):
+        pool, slots = conn.source_pool, conn.source_slots
+        if pool in self.inherited:
+            # Prestada antes del fork: su socket es del proceso padre.
+            return
+        current = pool is self.pool
+        broken = conn.closed or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+        discard = discard or broken or not current
+        close_pool = False
+        with self.lock:
+            if current:
+                self.metrics["in_use"] -= 1
+            elif pool in self.retired:
+                self.retired[pool] -= 1
+                close_pool = self.retired[pool] == 0
+                if close_pool:
+                    del self.retired[pool]
+            if discard:
+                self.metrics["discarded"] += 1
+                self.last_used.pop(id(conn), None)
+            else:
+                self.last_used[id(conn)] = time.monotonic()
+        try:
+            pool.putconn(conn, close=discard)
+            if close_pool:
+                pool.closeall()
+        finally:
+            slots.release()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.metrics)
+        stats["min_size"] = self.min_size
+        stats["max_size"] = self.max_size
+        stats["pid"] = self.pid
+        return stats
+
+
+class _Replica(_ProcessPool):
+    """Pool de una réplica de lectura; tras un fallo se aparta durante DB_REPLICA_RETRY_SECONDS."""
+
+    def __init__(self, index, dsn):
+        super().__init__(dsn, Config.DB_REPLICA_POOL_MAX, min_size=0)
+        self.index = index
+        self.unhealthy_until = 0.0
+        self.failures = 0
+
+    def healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def mark_unhealthy(self):
+        with self.lock:
+            self.failures += 1
+            self.unhealthy_until = time.monotonic() + Config.DB_REPLICA_RETRY_SECONDS
+
+    def stats(self):
+        stats = super().stats()
+        # Solo el índice en POSTGRES_REPLICA_URIS: /metrics/pool es público.
+        stats["index"] = self.index
+        stats["healthy"] = self.healthy()
+        stats["failures"] = self.failures
+        return stats
+
+
+_primary = _ProcessPool(Config.POSTGRES_URI, Config.DB_POOL_MAX, Config.DB_POOL_MIN)
+_replicas = [_Replica(i, dsn) for i, dsn in enumerate(Config.POSTGRES_REPLICA_URIS)]
+_round_robin = itertools.count()
+_last_write = {"at": float("-inf")}
+
+
+def init_pool():
+    """Crea el pool del proceso actual. Se llama tras el fork de cada worker."""
+    return _primary.init()
+
 
 def get_pool():
-    global _pool
-    if _pool is None:
-        _pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=1,
-            maxconn=10,
-            dsn=Config.POSTGRES_URI
-        )
-    return _pool
+    return _primary.get()
+
 
 def get_connection():
-    return get_pool().getconn()
+    """
+    Obtiene una conexión validada del pool, esperando hasta DB_POOL_TIMEOUT
+    segundos si todas están en uso.
+    Raises:
+        PoolExhaustedError: si no queda ninguna libre tras la espera
+    """
+    return _primary.checkout()
+
+
+def release_connection(conn, discard=False):
+    """
+    Devuelve la conexión a su pool. Las conexiones cerradas o en estado
+    desconocido se descartan en lugar de reutilizarse.
+    """
+    getattr(conn, "owner_pool", _primary).checkin(conn, discard)
+
+
+def note_write():
+    """
+    Registra que este proceso acaba de escribir. Durante DB_REPLICA_STICKY_SECONDS
+    las lecturas van al primario, para que el propio proceso (y su caché de
+    lecturas) no vea datos anteriores a la escritura por el retraso de las réplicas.
+    """
+    _last_write["at"] = time.monotonic()
+    if has_request_context():
+        g.db_wrote = True
+
+
+def prefer_primary():
+    """Indica si las lecturas deben ir al primario (sin réplicas o tras una escritura reciente)."""
+    if not _replicas:
+        return True
+    if has_request_context() and g.get("db_wrote"):
+        return True
+    return time.monotonic() - _last_write["at"] < Config.DB_REPLICA_STICKY_SECONDS
+
+
+def next_replica_index(pinned=None):
+    """
+    Elige la réplica sana siguiente en round-robin. `pinned` es la réplica ya
+    usada en la petición actual: se repite mientras siga sana, para que todas
+    las lecturas de una petición vean el mismo estado.
+    Returns:
+        int: Índice en la lista de réplicas, o None si no hay ninguna sana
+    """
+    if pinned is not None and _replicas[pinned].healthy():
+        return pinned
+    for _ in range(len(_replicas)):
+        index = next(_round_robin) % len(_replicas)
+        if _replicas[index].healthy():
+            return index
+    return None
+
+
+def mark_replica_unhealthy(index):
+    """Aparta la réplica `index` durante DB_REPLICA_RETRY_SECONDS (también la usa async_db)."""
+    _replicas[index].mark_unhealthy()
+
+
+def _replica_connection():
+    """
+    Conexión de una réplica sana, o None si ninguna responde. Una réplica sin
+    conexiones libres tras DB_REPLICA_CHECKOUT_TIMEOUT no se aparta: solo está
+    ocupada, así que se prueba la siguiente (o el primario).
+    """
+    pinned = g.get("db_replica") if has_request_context() else None
+    for _ in range(len(_replicas)):
+        index = next_replica_index(pinned)
+        if index is None:
+            return None
+        replica = _replicas[index]
+        try:
+            conn = replica.checkout(timeout=Config.DB_REPLICA_CHECKOUT_TIMEOUT)
+        except PoolExhaustedError:
+            pinned = None
+            continue
+        except psycopg2.OperationalError:
+            replica.mark_unhealthy()
+            pinned = None
+            continue
+        if has_request_context():
+            g.db_replica = index
+        return conn
+    return None
+
+
+@contextmanager
+def db_connection(readonly=False):
+    """
+    Context manager para usar una conexión del pool:
+
+        with db_connection() as conn:
+            ...
+
+    Con readonly=True la conexión sale de una réplica de lectura (si hay alguna
+    configurada y sana, y no hace falta leer lo recién escrito); si no, del primario.
+    Si hay un error se hace rollback, y las conexiones rotas se descartan.
+    """
+    conn = None
+    if readonly and not prefer_primary():
+        conn = _replica_connection()
+    if conn is None:
+        conn = get_connection()
+    discard = False
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        if isinstance(conn.owner_pool, _Replica):
+            conn.owner_pool.mark_unhealthy()
+        raise
+    except Exception:
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        raise
+    finally:
+        release_connection(conn, discard)
+
+
+def listen_connection(*channels):
+    """
+    Conexión propia (fuera del pool) al primario con LISTEN en `channels`.
+    Los NOTIFY no llegan a las réplicas, y la sesión tiene que quedarse
+    abierta mientras se escucha.
+    """
+    conn = psycopg2.connect(Config.POSTGRES_URI)
+    conn.autocommit = True
+    cur = conn.cursor()
+    for channel in channels:
+        cur.execute(f"LISTEN {channel};")
+    cur.close()
+    return conn
+
+
+def wait_for_notifies(conn, timeout):
+    """
+    Espera hasta `timeout` segundos a que llegue algún NOTIFY a `conn`.
+    Returns:
+        list: Notificaciones recibidas (psycopg2 Notify), vacía si no llegó ninguna
+    """
+    if not conn.notifies:
+        ready, _, _ = select.select([conn], [], [], timeout)
+        if ready:
+            conn.poll()
+    notifies = list(conn.notifies)
+    conn.notifies.clear()
+    return notifies
+
 
-def release_connection(conn):
-    get_pool().putconn(conn)
+def pool_stats():
+    """Métricas del pool del proceso actual."""
+    stats = _primary.stats()
+    if _replicas:
+        stats["replicas"] = [replica.stats() for replica in _replicas]
+    return stats
@@ -0,0 +1,91 @@
+import functools
+import hashlib
+from flask import request, make_response, current_app
+from app.cache import request_versions
+from app.services.versions_service import VersionsService
+from config import Config
+
+
+def make_etag(versions, full_path):
+    """
+    ETag fuerte a partir de las versiones de las tablas de las que depende la
+    respuesta ({tabla: número}) y de la URL pedida.
+    """
+    tables = ",".join(f"{name}:{number}" for name, number in sorted(versions.items()))
+    return hashlib.sha1(f"{tables}:{full_path}".encode()).hexdigest()
+
+
+def combine_versions(versions):
+    """
+    Junta las versiones ({tabla: (número, updated_at)}) de varias tablas.
+    Returns:
+        tuple: ({tabla: número}, updated_at más reciente), o None si falta alguna
+    """
+    if not versions or any(version is None for version in versions.values()):
+        return None
+    numbers = {name: version[0] for name, version in versions.items()}
+    dates = [version[1] for version in versions.values() if version[1] is not None]
+    return numbers, max(dates) if dates else None
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _set_cache_headers(response, etag, last_modified):
+    # Con compresión el cuerpo cambia según Accept-Encoding, así que el ETag es débil.
+    response.set_etag(etag, weak=Config.COMPRESS_ENABLED)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = Config.HTTP_CACHE_MAX_AGE
+    response.cache_control.must_revalidate = True
+    return response
+
+
+def conditional(*table_names):
+    """
+    Decorador de GET condicional para vistas de lectura.
+    Calcula un ETag fuerte a partir de la versión de cada tabla de
+    `table_names` y de la URL pedida, y responde 304 sin ejecutar la vista si
+    el cliente ya la tiene. La vista lee de la caché con esas mismas versiones
+    (ver app/cache.py), así que el cuerpo corresponde siempre al ETag.
+    Las peticiones con Authorization (lecturas de administración, que pueden
+    incluir borradores) no se validan ni se dejan guardar en cachés compartidas.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if "Authorization" in request.headers:
+                response = make_response(view(*args, **kwargs))
+                response.cache_control.private = True
+                response.cache_control.no_store = True
+                return response
+            try:
+                version = combine_versions({name: VersionsService.get_version(name) for name in table_names})
+            except Exception as e:
+                current_app.logger.warning("No se pudo obtener la versión de %s: %s", ", ".join(table_names), e)
+                version = None
+            if version is None:
+                return view(*args, **kwargs)
+
+            numbers, last_modified = version
+            etag = make_etag(numbers, request.full_path)
+
+            if _not_modified(etag, last_modified):
+                return _set_cache_headers(make_response("", 304), etag, last_modified)
+
+            token = request_versions.set(numbers)
+            try:
+                response = make_response(view(*args, **kwargs))
+            finally:
+                request_versions.reset(token)
+            if response.status_code == 200:
+                _set_cache_headers(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,198 @@
+"""
+Métricas de la app en formato Prometheus: latencia por ruta, espera del pool
+de conexiones y tiempo / filas de cada consulta, agrupadas por método de servicio.
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+from flask import g, request
+import psycopg2.extensions
+from config import Config
+
+slow_query_logger = logging.getLogger("pichon.slow_query")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current_method = contextvars.ContextVar("current_service_method", default="unknown")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labelnames, key, ("le", bound))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta.", ("method", "route", "status")
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds", "Tiempo de espera para obtener una conexión del pool."
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Tiempo de ejecución de cada consulta por método de servicio.", ("method",)
+)
+db_query_rows = Counter(
+    "db_query_rows_total", "Filas devueltas o afectadas por las consultas de cada método de servicio.", ("method",)
+)
+db_slow_queries = Counter(
+    "db_slow_queries_total", "Consultas que superaron SLOW_QUERY_MS.", ("method",)
+)
+
+rate_limited_requests = Counter(
+    "rate_limited_requests_total", "Peticiones rechazadas con 429 por endpoint.", ("endpoint",)
+)
+coalesced_requests = Counter(
+    "coalesced_requests_total", "Lecturas que esperaron el resultado de otra idéntica en curso.", ("namespace",)
+)
+
+METRICS = [
+    http_request_duration, db_pool_wait, db_query_duration, db_query_rows, db_slow_queries,
+    rate_limited_requests, coalesced_requests,
+]
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return lines
+
+
+def instrumented(func):
+    """
+    Etiqueta las consultas ejecutadas dentro de `func` con su nombre
+    (p. ej. 'PostsService.get_index_page') en las métricas de consultas.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_method.set(func.__qualname__)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_method.reset(token)
+    return wrapper
+
+
+def record_query(query, elapsed, rowcount):
+    method = _current_method.get()
+    db_query_duration.observe(elapsed, method=method)
+    if rowcount and rowcount > 0:
+        db_query_rows.inc(rowcount, method=method)
+    if elapsed * 1000 >= Config.SLOW_QUERY_MS:
+        db_slow_queries.inc(method=method)
+        if isinstance(query, bytes):
+            query = query.decode(errors="replace")
+        slow_query_logger.warning(
+            "Consulta lenta en %s: %.1f ms, %s filas: %s",
+            method, elapsed * 1000, rowcount, " ".join(str(query).split())[:500]
+        )
+
+
+class _TimedCursorMixin:
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query(query, time.perf_counter() - started, self.rowcount)
+
+
+_timed_cursor_classes = {}
+
+
+def _timed_cursor_class(base):
+    cls = _timed_cursor_classes.get(base)
+    if cls is None:
+        cls = type(f"Timed{base.__name__}", (_TimedCursorMixin, base), {})
+        _timed_cursor_classes[base] = cls
+    return cls
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """Conexión de psycopg2 cuyos cursores registran tiempo y filas de cada consulta."""
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _timed_cursor_class(base)
+        return super().cursor(*args, **kwargs)
+
+
+def init_app(app):
+    """Registra el middleware que mide la latencia de cada ruta."""
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=request.method, route=route, status=str(response.status_code)
+            )
+        return response
@@ -0,0 +1,148 @@
+"""
+Serialización JSON rápida para las respuestas de la API.
+
+FastJSONProvider usa orjson si está instalado y produce exactamente los mismos
+bytes que el proveedor por defecto de Flask (claves ordenadas, escapes ASCII y
+fechas en formato HTTP). stream_jsonify envía por trozos la lista de un payload
+con la misma salida que jsonify; las páginas de la API (como mucho
+MAX_PAGE_SIZE filas) se sirven con jsonify, que conserva Content-Length
+y la caché de respuestas comprimidas.
+"""
+import codecs
+import re
+from datetime import datetime, timezone
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_COMPACT = {"separators": (",", ":")}
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Número con exponente fuera de una cadena JSON (p. ej. ':1e-5,').
+_EXPONENT_FLOAT = re.compile(r"[:\[,]-?\d+(?:\.\d+)?e[-+]?\d+[,\]}]")
+_escape_cache = {}
+
+
+def _json_ascii_escape(error):
+    # Manejador de codecs: escribe los caracteres no ASCII como \uXXXX, igual que json con ensure_ascii.
+    chunk = error.object[error.start:error.end]
+    escaped = _escape_cache.get(chunk)
+    if escaped is None:
+        parts = []
+        for char in chunk:
+            code = ord(char)
+            if code > 0xFFFF:
+                code -= 0x10000
+                parts.append("\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF)))
+            else:
+                parts.append("\\u%04x" % code)
+        escaped = "".join(parts)
+        if len(_escape_cache) < 4096:
+            _escape_cache[chunk] = escaped
+    return escaped, error.end
+
+
+codecs.register_error("pichon_json_ascii", _json_ascii_escape)
+
+
+def _http_date(value):
+    """Equivalente rápido de werkzeug.http.http_date para datetimes."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+        _WEEKDAYS[value.weekday()], value.day, _MONTHS[value.month - 1],
+        value.year, value.hour, value.minute, value.second
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask compatible byte a byte con DefaultJSONProvider."""
+
+    def _orjson_default(self, obj):
+        if isinstance(obj, datetime):
+            return _http_date(obj)
+        return self.default(obj)
+
+    def dumps(self, obj, **kwargs):
+        # Solo la salida compacta (la de las respuestas) va por orjson.
+        if orjson is None or kwargs != _COMPACT:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            out = orjson.dumps(obj, default=self._orjson_default, option=option).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+        # orjson escribe los floats con exponente de otra forma que json ('1e-5'
+        # frente a '1e-05'); en ese caso, poco habitual, se usa el codificador estándar.
+        if _EXPONENT_FLOAT.search(out):
+            return super().dumps(obj, **kwargs)
+        if self.ensure_ascii:
+            if not out.isascii():
+                out = out.encode("ascii", "pichon_json_ascii").decode("ascii")
+            if "\x7f" in out:
+                out = out.replace("\x7f", "\\u007f")
+        return out
+
+
+def stream_jsonify(payload, key="data", status=200, chunk_size=None):
+    """
+    Igual que jsonify(payload), pero la lista `payload[key]` se codifica y se
+    envía en trozos de `chunk_size` elementos. En modo debug (salida indentada)
+    se usa jsonify normal.
+    """
+    app = current_app._get_current_object()
+    provider = app.json
+    if (provider.compact is None and app.debug) or provider.compact is False:
+        response = provider.response(payload)
+        response.status_code = status
+        return response
+
+    chunk_size = chunk_size or Config.JSON_STREAM_CHUNK_ROWS
+    rows = payload[key]
+    keys = sorted(payload) if provider.sort_keys else list(payload)
+
+    def generate():
+        parts = []
+        for name in keys:
+            prefix = "{" if not parts else ","
+            parts.append(name)
+            if name != key:
+                yield f"{prefix}{provider.dumps(name, **_COMPACT)}:{provider.dumps(payload[name], **_COMPACT)}"
+                continue
+            yield f"{prefix}{provider.dumps(name, **_COMPACT)}:["
+            for start in range(0, len(rows), chunk_size):
+                chunk = provider.dumps(rows[start:start + chunk_size], **_COMPACT)[1:-1]
+                yield ("," if start else "") + chunk
+            yield "]"
+        yield "}\n"
+
+    return app.response_class(generate(), status=status, mimetype=provider.mimetype)
+
+
+def ndjson_response(rows, chunk_size=None):
+    """
+    Respuesta NDJSON (un objeto JSON por línea) que consume `rows` a medida que
+    se envía, agrupando `chunk_size` líneas en cada escritura.
+    """
+    app = current_app._get_current_object()
+    provider = app.json
+    chunk_size = chunk_size or Config.JSON_STREAM_CHUNK_ROWS
+
+    def generate():
+        lines = []
+        for row in rows:
+            lines.append(provider.dumps(row, **_COMPACT))
+            if len(lines) >= chunk_size:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    return app.response_class(generate(), mimetype="application/x-ndjson")
@@ -0,0 +1,195 @@
+"""
+Limitación de peticiones por IP y endpoint con token bucket.
+
+Cada cliente dispone de `burst` peticiones que se recargan a razón de
+burst / period por segundo. El estado vive en memoria del proceso
+(RATE_LIMIT_BACKEND=memory) o en PostgreSQL (RATE_LIMIT_BACKEND=postgres,
+ver migrations/006_rate_limits.sql) para compartirlo entre workers.
+"""
+import functools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import request, jsonify
+from app.db import db_connection
+from app.instrumentation import rate_limited_requests
+from config import Config
+
+logger = logging.getLogger("pichon.rate_limit")
+
+
+def parse_limit(value):
+    """
+    Convierte "peticiones/segundos" (p. ej. "5/60") en (burst, tokens por segundo).
+    Raises:
+        ValueError: si el formato no es válido
+    """
+    try:
+        count, period = value.split("/")
+        burst, period = int(count), float(period)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Límite no válido: '{value}' (formato: peticiones/segundos)")
+    if burst < 1 or period <= 0:
+        raise ValueError(f"Límite no válido: '{value}' (formato: peticiones/segundos)")
+    return burst, burst / period
+
+
+class MemoryRateLimitStore:
+    """Buckets en memoria del proceso, con desalojo LRU por encima de `max_keys`."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, burst, rate):
+        """
+        Intenta gastar un token del bucket `key`.
+        Returns:
+            tuple: (permitido: bool, segundos hasta el siguiente token: float)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+# En el SET, r.tokens y r.updated_at son los valores anteriores de la fila.
+_REFILLED = "LEAST(%(burst)s, r.tokens + EXTRACT(EPOCH FROM now() - r.updated_at)::float8 * %(rate)s)"
+
+CONSUME_QUERY = f"""
+    INSERT INTO rate_limits AS r (key, tokens, allowed, updated_at)
+    VALUES (%(key)s, %(burst)s - 1, TRUE, now())
+    ON CONFLICT (key) DO UPDATE SET
+        allowed = {_REFILLED} >= 1,
+        tokens = {_REFILLED} - CASE WHEN {_REFILLED} >= 1 THEN 1 ELSE 0 END,
+        updated_at = now()
+    RETURNING r.allowed, r.tokens;
+"""
+
+PRUNE_QUERY = "DELETE FROM rate_limits WHERE updated_at < now() - make_interval(secs => %s);"
+
+
+class PostgresRateLimitStore:
+    """
+    Buckets en la tabla rate_limits, compartidos entre procesos y máquinas.
+    Cada consulta es un único UPSERT atómico. Si la base de datos falla, la
+    petición se deja pasar (fail-open) para no tumbar el endpoint.
+    """
+
+    def __init__(self, prune_seconds):
+        self.prune_seconds = prune_seconds
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, key, burst, rate):
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(CONSUME_QUERY, {"key": key, "burst": burst, "rate": rate})
+                allowed, tokens = cur.fetchone()
+                if self._should_prune():
+                    # Un bucket sin uso durante este tiempo estaría lleno: equivale a no tenerlo.
+                    cur.execute(PRUNE_QUERY, (self.prune_seconds,))
+                conn.commit()
+                cur.close()
+        except Exception as e:
+            logger.warning("No se pudo consultar el límite de %s: %s", key, e)
+            return True, 0.0
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _should_prune(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_prune < self.prune_seconds:
+                return False
+            self._last_prune = now
+            return True
+
+
+def _build_store():
+    if Config.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresRateLimitStore(prune_seconds=Config.RATE_LIMIT_PRUNE_SECONDS)
+    return MemoryRateLimitStore(max_keys=Config.RATE_LIMIT_MAX_KEYS)
+
+
+store = _build_store()
+
+
+def check_rate_limit(endpoint, client_ip, limit):
+    """
+    Aplica el límite `limit` (resultado de parse_limit) al cliente en `endpoint`.
+    Returns:
+        int: 0 si se permite, o los segundos que debe esperar el cliente (Retry-After)
+    """
+    if not Config.RATE_LIMIT_ENABLED:
+        return 0
+    burst, rate = limit
+    allowed, wait = store.consume(f"{endpoint}:{client_ip}", burst, rate)
+    if allowed:
+        return 0
+    rate_limited_requests.inc(endpoint=endpoint)
+    return max(1, math.ceil(wait))
+
+
+_proxy_warning_logged = False
+
+
+def client_ip(remote_addr, forwarded_for):
+    """
+    IP del cliente con la misma regla que ProxyFix(x_for=PROXY_COUNT): la
+    entrada PROXY_COUNT-ésima empezando por la derecha de X-Forwarded-For (las
+    anteriores las escribe el cliente y no son de fiar). Si la cabecera tiene
+    menos entradas que proxies, se usa la dirección de la conexión.
+    """
+    if not Config.PROXY_COUNT:
+        _warn_unconfigured_proxy(forwarded_for)
+        return remote_addr
+    values = [value.strip() for value in (forwarded_for or "").split(",") if value.strip()]
+    if len(values) < Config.PROXY_COUNT:
+        return remote_addr
+    return values[-Config.PROXY_COUNT]
+
+
+def _warn_unconfigured_proxy(forwarded_for):
+    # Detrás de un proxy sin PROXY_COUNT todos los clientes comparten la IP del
+    # proxy y, con ella, el mismo bucket.
+    global _proxy_warning_logged
+    if forwarded_for and not _proxy_warning_logged and Config.RATE_LIMIT_ENABLED:
+        _proxy_warning_logged = True
+        logger.warning("Llegan peticiones con X-Forwarded-For pero PROXY_COUNT=0: "
+                       "el límite por IP se aplica a la IP del proxy")
+
+
+def rate_limited(endpoint, limit):
+    """
+    Decorador para vistas de Flask: responde 429 con Retry-After cuando el
+    cliente supera `limit` ("peticiones/segundos"). La IP es request.remote_addr,
+    que ProxyFix (app/__init__.py) ya resuelve con la misma regla que client_ip.
+    """
+    limit = parse_limit(limit)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not Config.PROXY_COUNT:
+                _warn_unconfigured_proxy(request.headers.get("X-Forwarded-For"))
+            retry_after = check_rate_limit(endpoint, request.remote_addr, limit)
+            if retry_after:
+                response = jsonify({"status": "error", "message": "Demasiadas peticiones, inténtalo más tarde"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(retry_after)
+                return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
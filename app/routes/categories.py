@@ -1,15 +1,30 @@
 from flask import Blueprint, request, jsonify
 from app.services.categories_service import CategoriesService
+from app.services.posts_service import PostsService, DEFAULT_PAGE_SIZE
+from app.auth import ADMIN_REQUIRED_MESSAGE, is_admin
+from app.http_cache import conditional
+from app.routes.posts import parse_bool
+from app.slugs import slugify
 
 categories_bp = Blueprint('categories', __name__, url_prefix='/categories')
 
 @categories_bp.route('', methods=['GET'])
+@conditional('categories')
 def get_categories():
     """
     Obtiene todas las categorías de la base de datos.
+    Con with_counts=1 incluye post_count y published_count de cada una.
     """
     try:
-        categories = CategoriesService.get_all_categories()
+        with_counts = parse_bool(request.args.get('with_counts'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        if with_counts:
+            categories = CategoriesService.get_categories_with_counts()
+        else:
+            categories = CategoriesService.get_all_categories()
         return jsonify({
             "status": "success",
             "data": categories,
@@ -18,6 +33,46 @@ def get_categories():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@categories_bp.route('/<slug>/posts', methods=['GET'])
+@conditional('posts', 'categories')
+def get_category_posts(slug):
+    """
+    Obtiene una página de los posts de una categoría.
+    Parámetros: limit, cursor, fields (separados por comas), published
+    (published=0 requiere el token de administración)
+    """
+    try:
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        fields = request.args.get('fields')
+        fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        is_published = parse_bool(request.args.get('published'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if is_published is False and not is_admin():
+        return jsonify({"status": "error", "message": ADMIN_REQUIRED_MESSAGE}), 401
+
+    try:
+        category = CategoriesService.get_category_by_slug(slug)
+        if category is None:
+            return jsonify({"status": "error", "message": "Categoría no encontrada"}), 404
+        page = PostsService.get_index_page(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=fields,
+            category=category["name"],
+            is_published=is_published
+        )
+        return jsonify({
+            "status": "success",
+            "data": page["data"],
+            "count": len(page["data"]),
+            "next_cursor": page["next_cursor"]
+        }), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @categories_bp.route('', methods=['POST'])
 def create_category():
     """
@@ -34,7 +89,7 @@ def create_category():
 
     title = data['title']
     order = data['order']
-    slug = title.lower().replace(' ', '_')
+    slug = slugify(title, separator='_')
 
     try:
         category_id = CategoriesService.create_category(name=title, slug=slug, order=order)
@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify
+from app.services.changes_service import ChangesService
+from app import change_stream
+from app.rate_limit import rate_limited
+from config import Config
+
+changes_bp = Blueprint('changes', __name__, url_prefix='/changes')
+
+def parse_position(value):
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Valor de 'since' no válido: '{value}'")
+
+def changes_response(page):
+    response = jsonify({
+        "status": "success",
+        "data": page["data"],
+        "count": len(page["data"]),
+        "next_since": page["next_since"]
+    })
+    response.cache_control.no_store = True
+    return response, 200
+
+@changes_bp.route('', methods=['GET'])
+@rate_limited('changes', Config.RATE_LIMIT_CHANGES)
+def get_changes():
+    """
+    Eventos de cambio de posts y categorías posteriores a `since` (long-poll).
+    Parámetros: since, limit, timeout (segundos de espera si no hay eventos;
+    como máximo CHANGES_LONGPOLL_SECONDS).
+    Si el proceso ya tiene CHANGES_MAX_WAITERS peticiones esperando, responde en
+    el acto con la página vacía.
+    Sin `since` devuelve solo la posición actual, desde la que empezar a seguir
+    los cambios. Responde 410 si los eventos siguientes a `since` ya se han
+    purgado: el cliente debe volver a leer el índice completo.
+    """
+    try:
+        since = parse_position(request.args.get('since'))
+        limit = request.args.get('limit', Config.CHANGES_PAGE_SIZE, type=int)
+        timeout = request.args.get('timeout', Config.CHANGES_LONGPOLL_SECONDS, type=float)
+        timeout = min(max(timeout, 0.0), Config.CHANGES_LONGPOLL_SECONDS)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        if since is None:
+            last, _ = ChangesService.get_head()
+            return changes_response({"data": [], "next_since": last})
+
+        page = ChangesService.get_changes(since, limit)
+        if page is not None and not page["data"] and timeout > 0:
+            if change_stream.wait_for_change(since, timeout):
+                page = ChangesService.get_changes(since, limit)
+        if page is None:
+            return jsonify({
+                "status": "error",
+                "message": "Los eventos posteriores a 'since' ya no están disponibles"
+            }), 410
+        return changes_response(page)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
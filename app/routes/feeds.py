@@ -0,0 +1,37 @@
+from flask import Blueprint, Response, jsonify
+from app.http_cache import conditional
+from app import syndication
+
+feeds_bp = Blueprint('feeds', __name__, url_prefix='')
+
+def snapshot_response(name):
+    """Sirve la instantánea `name` de la versión actual de los posts."""
+    try:
+        body, mimetype = syndication.store.get(name)
+        return Response(body, mimetype=mimetype)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@feeds_bp.route('/feed.xml', methods=['GET'])
+@conditional('posts')
+def get_rss():
+    """
+    Feed RSS 2.0 con los últimos FEED_ITEMS posts publicados.
+    """
+    return snapshot_response('feed.xml')
+
+@feeds_bp.route('/atom.xml', methods=['GET'])
+@conditional('posts')
+def get_atom():
+    """
+    Feed Atom con los últimos FEED_ITEMS posts publicados.
+    """
+    return snapshot_response('atom.xml')
+
+@feeds_bp.route('/sitemap.xml', methods=['GET'])
+@conditional('posts')
+def get_sitemap():
+    """
+    Sitemap con todos los posts publicados.
+    """
+    return snapshot_response('sitemap.xml')
@@ -0,0 +1,42 @@
+from flask import Blueprint, jsonify
+from app.circuit_breaker import OPEN
+from app.services.mailchimp_service import MailchimpService, mailchimp_breaker
+
+health_bp = Blueprint('health', __name__, url_prefix='')
+
+
+@health_bp.route('/health', methods=['GET'])
+def health():
+    """
+    Estado del servicio (liveness) y del circuit breaker de Mailchimp.
+    No llama a Mailchimp: una caída de Mailchimp no debe sacar la instancia
+    del balanceador. Para comprobarlo está /health/mailchimp.
+    """
+    return jsonify({"status": "success", "mailchimp": mailchimp_breaker.stats()}), 200
+
+
+@health_bp.route('/health/mailchimp', methods=['GET'])
+def health_mailchimp():
+    """
+    Comprueba Mailchimp con ping() si el circuito no está abierto.
+    Responde 503 si no se puede alcanzar.
+    """
+    error = None
+    if mailchimp_breaker.state == OPEN:
+        reachable = False
+    else:
+        try:
+            MailchimpService().ping()
+            reachable = True
+        except Exception as e:
+            reachable = False
+            error = str(getattr(e, "text", e))
+
+    mailchimp = mailchimp_breaker.stats()
+    mailchimp["reachable"] = reachable
+    if error:
+        mailchimp["error"] = error
+
+    if reachable:
+        return jsonify({"status": "success", "mailchimp": mailchimp}), 200
+    return jsonify({"status": "degraded", "mailchimp": mailchimp}), 503
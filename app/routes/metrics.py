@@ -0,0 +1,66 @@
+from flask import Blueprint, jsonify, Response
+from app.cache import read_cache
+from app.compression import compressed_cache
+from app.db import pool_stats
+from app.instrumentation import render_metrics
+from app.services.newsletter_queue_service import NewsletterQueueService
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+
+def _gauge(name, help, value, metric_type="gauge"):
+    return [f"# HELP {name} {help}", f"# TYPE {name} {metric_type}", f"{name} {value}"]
+
+
+@metrics_bp.route('', methods=['GET'])
+def prometheus_metrics():
+    """
+    Expone las métricas en formato de texto de Prometheus.
+    """
+    lines = render_metrics()
+    pool = pool_stats()
+    lines += _gauge("db_pool_in_use", "Conexiones del pool en uso.", pool["in_use"])
+    lines += _gauge("db_pool_max_size", "Tamaño máximo del pool.", pool["max_size"])
+    lines += _gauge("db_pool_exhaustion_total", "Esperas de conexión que agotaron DB_POOL_TIMEOUT.",
+                    pool["exhaustion_events"], "counter")
+    lines += _gauge("db_pool_discarded_total", "Conexiones rotas descartadas.", pool["discarded"], "counter")
+    if "replicas" in pool:
+        lines += _gauge("db_replicas_healthy", "Réplicas de lectura disponibles.",
+                        sum(replica["healthy"] for replica in pool["replicas"]))
+    cache = read_cache.stats()
+    lines += _gauge("read_cache_entries", "Entradas en la caché de lecturas.", cache["size"])
+    lines += _gauge("read_cache_hits_total", "Aciertos de la caché de lecturas.", cache["hits"], "counter")
+    lines += _gauge("read_cache_misses_total", "Fallos de la caché de lecturas.", cache["misses"], "counter")
+    lines += _gauge("read_cache_evictions_total", "Entradas desalojadas por LRU.", cache["evictions"], "counter")
+    compressed = compressed_cache.stats()
+    lines += _gauge("compressed_cache_entries", "Respuestas comprimidas guardadas.", compressed["size"])
+    lines += _gauge("compressed_cache_hits_total", "Respuestas servidas sin volver a comprimir.",
+                    compressed["hits"], "counter")
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    """
+    Devuelve los contadores de la caché de lecturas.
+    """
+    return jsonify({"status": "success", "data": read_cache.stats()}), 200
+
+
+@metrics_bp.route('/pool', methods=['GET'])
+def pool_metrics():
+    """
+    Devuelve las métricas del pool de conexiones de este worker.
+    """
+    return jsonify({"status": "success", "data": pool_stats()}), 200
+
+
+@metrics_bp.route('/newsletter', methods=['GET'])
+def newsletter_stats():
+    """
+    Devuelve la profundidad y latencia de la cola de Mailchimp.
+    """
+    try:
+        return jsonify({"status": "success", "data": NewsletterQueueService.stats()}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -1,13 +1,17 @@
 from flask import Blueprint, request, jsonify
-from app.services.mailchimp_service import MailchimpService
+from app.services.newsletter_queue_service import NewsletterQueueService, SUBSCRIBE, INFO_EMAIL
+from app.services.subscriber_ledger_service import SubscriberLedgerService
+from app.rate_limit import rate_limited
+from config import Config
 
 newsletter_bp = Blueprint('newsletter', __name__, url_prefix='')
 
 
 @newsletter_bp.route("/send_info_email", methods=["POST"])
+@rate_limited("send_info_email", Config.RATE_LIMIT_NEWSLETTER)
 def send_info_email():
     """
-    Triggers a Mailchimp Customer Journey to send an info email.
+    Queues a Mailchimp Customer Journey trigger to send an info email.
     Recibe: email (requerido), fname (requerido), journey_id (requerido), step_id (requerido)
     """
     if not request.is_json:
@@ -26,19 +30,25 @@ def send_info_email():
     if not journey_id or not step_id:
         return jsonify({"message": "Los campos 'journey_id' y 'step_id' son obligatorios"}), 400
 
-    mailchimp_service = MailchimpService()
-    success, message = mailchimp_service.trigger_info_email(email, fname, journey_id, step_id)
+    try:
+        job_id = NewsletterQueueService.enqueue(INFO_EMAIL, {
+            "email": email,
+            "fname": fname,
+            "journey_id": journey_id,
+            "step_id": step_id
+        })
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-    if success:
-        return jsonify({"status": "success", "message": message}), 200
-    else:
-        return jsonify({"status": "error", "message": message}), 400
+    return jsonify({"status": "accepted", "message": "Envío del email encolado", "job_id": job_id}), 202
 
 
 @newsletter_bp.route("/subscribe_newsletter", methods=["POST"])
+@rate_limited("subscribe_newsletter", Config.RATE_LIMIT_NEWSLETTER)
 def subscribe_newsletter():
     """
     Endpoint para suscribir un usuario a la newsletter de Mailchimp.
+    La suscripción se encola y se envía a Mailchimp en segundo plano.
     Recibe: email (requerido), fname (nombre), lname (apellido, opcional)
     """
 
@@ -53,11 +63,11 @@ def subscribe_newsletter():
     if not email:
         return jsonify({"message": "El campo 'email' es obligatorio"}), 400
 
-    mailchimp_service = MailchimpService()
-    success, message = mailchimp_service.subscribe_user(email, fname, lname)
+    try:
+        if SubscriberLedgerService.is_subscribed(email, fname, lname):
+            return jsonify({"status": "success", "message": "El usuario ya está suscrito", "job_id": None}), 200
+        job_id = NewsletterQueueService.enqueue(SUBSCRIBE, {"email": email, "fname": fname, "lname": lname})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-    if success:
-        return jsonify({"status": "success", "message": message}), 200
-    else:
-        status_code = 409 if "suscrito" in message else 400
-        return jsonify({"status": "error", "message": message}), status_code
+    return jsonify({"status": "accepted", "message": "Suscripción encolada", "job_id": job_id}), 202
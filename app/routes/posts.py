@@ -1,22 +1,76 @@
+import itertools
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from flask import Blueprint, request, jsonify
-from app.services.posts_service import PostsService
+from app.services.posts_service import PostsService, DEFAULT_PAGE_SIZE
+from app.auth import ADMIN_REQUIRED_MESSAGE, is_admin
+from app.http_cache import conditional
+from app.rate_limit import rate_limited
+from app.json_provider import ndjson_response
+from config import Config
 
 posts_bp = Blueprint('posts', __name__, url_prefix='/posts')
 
 
+def parse_since(value):
+    """Acepta una fecha ISO 8601 o en formato HTTP (el que devuelve la API en updated_at)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Fecha no válida: '{value}'")
+
+
+def parse_bool(value):
+    if value is None:
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Valor booleano no válido: '{value}'")
+
+
 @posts_bp.route('', methods=['GET'])
+@conditional('posts')
 def get_posts():
     """
-    Obtiene todos los registros de la tabla index en PostgreSQL.
+    Obtiene una página del índice de posts publicados.
+    Parámetros: limit, cursor, fields (separados por comas), category,
+    published (published=0 lista los borradores; requiere el token de administración)
     """
     try:
-        data = PostsService.get_all_index()
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        fields = request.args.get('fields')
+        fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        is_published = parse_bool(request.args.get('published'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if is_published is False and not is_admin():
+        return jsonify({"status": "error", "message": ADMIN_REQUIRED_MESSAGE}), 401
+
+    try:
+        page = PostsService.get_index_page(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=fields,
+            category=request.args.get('category'),
+            is_published=is_published
+        )
         return jsonify({
             "status": "success",
-            "data": data,
-            "count": len(data)
+            "data": page["data"],
+            "count": len(page["data"]),
+            "next_cursor": page["next_cursor"]
         }), 200
 
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -25,7 +79,8 @@ def get_posts():
 def create_post():
     """
     Crea un nuevo post (artículo) en la base de datos.
-    Recibe: title, abstract, img, categories, prod, content
+    Recibe: title, abstract, img, categories, prod, content y, opcionalmente,
+    published_at (ISO 8601; una fecha futura lo programa)
     """
     if not request.is_json:
         return jsonify({"message": "Falta el content en formato JSON"}), 400
@@ -43,39 +98,206 @@ def create_post():
             img=data['img'],
             categories=data['categories'],
             prod=data['prod'],
-            content=data['content']
+            content=data['content'],
+            published_at=data.get('published_at')
         )
         return jsonify({
             "status": "success",
             "message": "Post creado correctamente",
             "id": post_id
         }), 201
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+def _bulk_items():
+    data = request.get_json()
+    return data.get("posts") if isinstance(data, dict) else data
+
+
+def _bulk_response(results, ok_status, ok_code):
+    # 207 si algún post no se pudo procesar; el detalle va en `results`.
+    done = sum(1 for r in results if r["status"] == ok_status)
+    code = ok_code if done == len(results) else 207
+    return jsonify({"status": "success", "processed": done, "count": len(results), "results": results}), code
+
+
+@posts_bp.route('/bulk', methods=['POST'])
+def bulk_create_posts():
+    """
+    Crea varios posts en una sola transacción.
+    Recibe: {"posts": [...]} (o directamente la lista) con los campos de POST /posts
+    """
+    if not request.is_json:
+        return jsonify({"message": "Falta el content en formato JSON"}), 400
+
+    try:
+        results = PostsService.bulk_create_posts(_bulk_items())
+        return _bulk_response(results, "created", 201)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@posts_bp.route('/bulk', methods=['PATCH'])
+def bulk_update_posts():
+    """
+    Actualiza parcialmente varios posts en una sola transacción.
+    Recibe: {"posts": [{"id": ..., <campos a modificar>}, ...]}
+    """
+    if not request.is_json:
+        return jsonify({"message": "Se requiere content en formato JSON"}), 400
+
+    try:
+        results = PostsService.bulk_update_posts(_bulk_items())
+        return _bulk_response(results, "updated", 200)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
 @posts_bp.route('/search', methods=['GET'])
+@rate_limited('search', Config.RATE_LIMIT_SEARCH)
+@conditional('posts')
 def search_posts():
+    """
+    Busca posts por texto. Parámetros: q (obligatorio), limit, offset
+    """
     q = request.args.get('q', '').strip()
     if not q:
         return jsonify({"message": "El parámetro 'q' es obligatorio"}), 400
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    offset = request.args.get('offset', 0, type=int)
     try:
-        results = PostsService.search_posts(q)
-        return jsonify({"status": "success", "data": results, "count": len(results)}), 200
+        results = PostsService.search_posts(q, limit=limit, offset=offset)
+        return jsonify({
+            "status": "success",
+            "data": results["data"],
+            "count": len(results["data"]),
+            "next_offset": results["next_offset"]
+        }), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@posts_bp.route('/batch', methods=['GET'])
+@conditional('posts')
+def get_posts_batch():
+    """
+    Obtiene los metadatos (sin content) de varios posts.
+    Parámetros: ids (separados por comas)
+    """
+    ids = [i.strip() for i in request.args.get('ids', '').split(',') if i.strip()]
+    try:
+        posts = PostsService.get_post_summaries(ids)
+        return jsonify({"status": "success", "data": posts, "count": len(posts)}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@posts_bp.route('/export', methods=['GET'])
+@conditional('posts')
+def export_posts():
+    """
+    Exporta los posts publicados, con su content, en formato NDJSON (un post por línea).
+    Con el token de administración incluye también borradores y posts programados.
+    Parámetros: since (fecha ISO 8601 o HTTP; solo posts modificados después), published
+    Para una exportación incremental, usar como `since` el updated_at de la última línea recibida.
+    """
+    try:
+        since = parse_since(request.args.get('since'))
+        is_published = parse_bool(request.args.get('published'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    include_drafts = is_admin()
+    if is_published is False and not include_drafts:
+        return jsonify({"status": "error", "message": ADMIN_REQUIRED_MESSAGE}), 401
+
+    try:
+        # Se pide la primera fila aquí para que un error de base de datos llegue como 500.
+        rows = PostsService.export_posts(since=since, is_published=is_published, include_drafts=include_drafts)
+        first = next(rows, None)
+        if first is None:
+            return ndjson_response([])
+        return ndjson_response(itertools.chain([first], rows))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
 @posts_bp.route('/<post_id>', methods=['GET'])
+@conditional('posts')
 def get_post(post_id):
     """
-    Obtiene un post específico por su ID.
+    Obtiene un post publicado por su ID (los borradores y programados dan 404).
+    Con content=0 se omite el HTML del post (ver /posts/<id>/content).
+    """
+    try:
+        include_content = parse_bool(request.args.get('content'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        if include_content is False:
+            post = PostsService.get_post_summary(post_id)
+        else:
+            post = PostsService.get_post_by_id(post_id)
+        if post is None:
+            return jsonify({"status": "error", "message": "Post no encontrado"}), 404
+        return jsonify({"status": "success", "data": post}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@posts_bp.route('/by-slug/<slug>', methods=['GET'])
+@conditional('posts')
+def get_post_by_slug(slug):
+    """
+    Obtiene un post por su slug. Los slugs anteriores de un post renombrado
+    también lo encuentran; `data.slug` es siempre el actual (canónico).
+    Con content=0 se omite el HTML del post.
+    """
+    try:
+        include_content = parse_bool(request.args.get('content'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        resolved = PostsService.resolve_slug(slug)
+        post = None
+        if resolved is not None:
+            if include_content is False:
+                post = PostsService.get_post_summary(str(resolved["id"]))
+            else:
+                post = PostsService.get_post_by_id(str(resolved["id"]))
+        if post is None:
+            return jsonify({"status": "error", "message": "Post no encontrado"}), 404
+        return jsonify({"status": "success", "data": post}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@posts_bp.route('/<post_id>/content', methods=['GET'])
+@conditional('posts')
+def get_post_content(post_id):
+    """
+    Obtiene solo el contenido HTML de un post.
+    Con format=text devuelve el texto plano precalculado (content_text).
     """
     try:
-        post = PostsService.get_post_by_id(post_id)
+        post = PostsService.get_post_content(post_id, format=request.args.get('format', 'html'))
         if post is None:
             return jsonify({"status": "error", "message": "Post no encontrado"}), 404
         return jsonify({"status": "success", "data": post}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -90,7 +312,7 @@ def update_post(post_id):
         return jsonify({"message": "Se requiere content en formato JSON"}), 400
 
     data = request.get_json()
-    allowed_fields = {"title", "abstract", "img", "categories", "prod", "content"}
+    allowed_fields = {"title", "abstract", "img", "categories", "prod", "content", "published_at"}
     fields = {k: v for k, v in data.items() if k in allowed_fields}
 
     if not fields:
@@ -101,6 +323,8 @@ def update_post(post_id):
         if not updated:
             return jsonify({"status": "error", "message": "Post no encontrado"}), 404
         return jsonify({"status": "success", "message": "Post actualizado correctamente", "id": post_id}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -0,0 +1,81 @@
+import psycopg
+from psycopg.rows import dict_row
+from app.async_db import async_connection
+from app.cache import read_cache, content_version_async, versioned
+from app.services.categories_service import CATEGORIES_QUERY, CATEGORIES_WITH_COUNTS_QUERY
+from app.services.posts_service import (
+    DEFAULT_PAGE_SIZE, POST_BY_ID_QUERY, POST_SUMMARY_QUERY, SEARCH_QUERY,
+    build_index_query, finish_index_page, validate_search_page, finish_search_page,
+    index_cache_key, post_cache_key, summary_cache_key, search_cache_key,
+)
+from app.services.versions_service import VERSION_QUERY
+
+
+async def _cached(key, load, coalesce=False):
+    # Misma clave versionada que el decorador cached de app/cache.py.
+    key = versioned(key, await content_version_async(key[0]))
+    return await read_cache.get_or_set_async(key, load, coalesce=coalesce)
+
+
+async def _fetch(query, values=None, one=False):
+    try:
+        async with async_connection(readonly=True) as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(query, values)
+                return await cur.fetchone() if one else await cur.fetchall()
+    except psycopg.Error as e:
+        print(f"Database error: {e}")
+        raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+
+
+class AsyncReadsService:
+    """
+    Lecturas de posts y categorías para el modo ASGI. Usan las mismas consultas
+    y las mismas claves de caché que PostsService y CategoriesService.
+    """
+
+    @staticmethod
+    async def get_index_page(limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None, category=None, is_published=None):
+        async def load():
+            query, values, selected = build_index_query(limit, cursor, fields, category, is_published)
+            return finish_index_page(await _fetch(query, values), limit, selected)
+        key = index_cache_key(limit, cursor, fields, category, is_published)
+        return await _cached(key, load)
+
+    @staticmethod
+    async def get_post_by_id(post_id):
+        async def load():
+            return await _fetch(POST_BY_ID_QUERY, (post_id,), one=True)
+        return await _cached(post_cache_key(post_id), load)
+
+    @staticmethod
+    async def get_post_summary(post_id):
+        async def load():
+            return await _fetch(POST_SUMMARY_QUERY, (post_id,), one=True)
+        return await _cached(summary_cache_key(post_id), load)
+
+    @staticmethod
+    async def search_posts(query, limit=DEFAULT_PAGE_SIZE, offset=0):
+        async def load():
+            validate_search_page(limit, offset)
+            records = await _fetch(SEARCH_QUERY, (query, limit + 1, offset))
+            return finish_search_page(records, limit, offset)
+        return await _cached(search_cache_key(query, limit, offset), load, coalesce=True)
+
+    @staticmethod
+    async def get_all_categories():
+        async def load():
+            return await _fetch(CATEGORIES_QUERY)
+        return await _cached(("categories", "all"), load)
+
+    @staticmethod
+    async def get_categories_with_counts():
+        async def load():
+            return await _fetch(CATEGORIES_WITH_COUNTS_QUERY)
+        return await _cached(("categories", "with_counts"), load)
+
+    @staticmethod
+    async def get_version(table_name):
+        # Sin caché, como VersionsService.get_version.
+        row = await _fetch(VERSION_QUERY, (table_name,), one=True)
+        return (row["version"], row["updated_at"]) if row else None
@@ -1,49 +1,100 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from app.db import get_connection, release_connection
+from app.db import db_connection, note_write
+from app.instrumentation import instrumented
+from app.cache import read_cache, cached
+
+CATEGORIES_QUERY = "SELECT id, name, slug, \"order\" FROM categories ORDER BY \"order\" ASC, id ASC;"
+
+# Recuentos mantenidos por triggers en category_counts (migrations/005_category_counts.sql;
+# published_count cuenta los posts del feed desde migrations/012_category_published_counts.sql).
+CATEGORIES_WITH_COUNTS_QUERY = """
+    SELECT
+        c.id,
+        c.name,
+        c.slug,
+        c."order",
+        COALESCE(cc.post_count, 0) AS post_count,
+        COALESCE(cc.published_count, 0) AS published_count
+    FROM categories c
+    LEFT JOIN category_counts cc ON cc.name = c.name
+    ORDER BY c."order" ASC, c.id ASC;
+"""
+
 
 class CategoriesService:
     """Servicio para manejar operaciones de categorías en la base de datos PostgreSQL."""
 
 
     @staticmethod
+    @cached(lambda: ("categories", "all"))
+    @instrumented
     def get_all_categories():
-        conn = get_connection()
         try:
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            select_query = "SELECT id, name, slug, \"order\" FROM categories ORDER BY \"order\" ASC, id ASC;"
-            cur.execute(select_query)
-            categories = cur.fetchall()
-            cur.close()
-            return categories
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(CATEGORIES_QUERY)
+                categories = cur.fetchall()
+                cur.close()
+                return categories
         except psycopg2.Error as e:
             raise Exception(f"Error en la base de datos: {str(e)}")
-        finally:
-            release_connection(conn)
 
     @staticmethod
+    @cached(lambda: ("categories", "with_counts"))
+    @instrumented
+    def get_categories_with_counts():
+        """
+        Obtiene todas las categorías con su número de posts (post_count) y de
+        posts publicados (published_count).
+        """
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(CATEGORIES_WITH_COUNTS_QUERY)
+                categories = cur.fetchall()
+                cur.close()
+                return categories
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
+
+    @staticmethod
+    def get_category_by_slug(slug):
+        """
+        Busca una categoría por su slug en la lista (cacheada) de categorías.
+        Returns:
+            dict: Registro de la categoría o None si no existe
+        """
+        for category in CategoriesService.get_all_categories():
+            if category["slug"] == slug:
+                return category
+        return None
+
+    @staticmethod
+    @instrumented
     def create_category(name, slug, order):
-        conn = get_connection()
         try:
-            cur = conn.cursor()
-            insert_query = """
-                INSERT INTO categories (name, slug, "order")
-                VALUES (%s, %s, %s)
-                RETURNING id;
-            """
-            cur.execute(insert_query, (name, slug, order))
-            category_id = cur.fetchone()[0]
-            conn.commit()
-            cur.close()
-            return category_id
+            with db_connection() as conn:
+                cur = conn.cursor()
+                insert_query = """
+                    INSERT INTO categories (name, slug, "order")
+                    VALUES (%s, %s, %s)
+                    RETURNING id;
+                """
+                cur.execute(insert_query, (name, slug, order))
+                category_id = cur.fetchone()[0]
+                conn.commit()
+                cur.close()
+                note_write()
+                read_cache.invalidate_prefix("categories")
+                return category_id
         except psycopg2.IntegrityError as _e:
             raise Exception("El nombre o slug ya existe")
         except psycopg2.Error as e:
             raise Exception(f"Error en la base de datos: {str(e)}")
-        finally:
-            release_connection(conn)
 
     @staticmethod
+    @instrumented
     def delete_category(category_id):
         """
         Elimina una categoría por su ID.
@@ -52,16 +103,17 @@ class CategoriesService:
         Returns:
             bool: True si se eliminó, False si no existía
         """
-        conn = get_connection()
         try:
-            cur = conn.cursor()
-            delete_query = "DELETE FROM categories WHERE id = %s"
-            cur.execute(delete_query, (category_id,))
-            deleted = cur.rowcount > 0
-            conn.commit()
-            cur.close()
-            return deleted
+            with db_connection() as conn:
+                cur = conn.cursor()
+                delete_query = "DELETE FROM categories WHERE id = %s"
+                cur.execute(delete_query, (category_id,))
+                deleted = cur.rowcount > 0
+                conn.commit()
+                cur.close()
+                if deleted:
+                    note_write()
+                    read_cache.invalidate_prefix("categories")
+                return deleted
         except psycopg2.Error as e:
             raise Exception(f"Error al eliminar la categoría: {str(e)}")
-        finally:
-            release_connection(conn)
@@ -0,0 +1,155 @@
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from app.db import db_connection
+from app.instrumentation import instrumented
+from config import Config
+
+# Canal por el que el dispatcher avisa de los eventos nuevos (payload: última position).
+CHANGES_CHANNEL = "changes"
+# Canal por el que los triggers avisan al dispatcher de que hay eventos pendientes.
+OUTBOX_CHANNEL = "change_outbox"
+
+# Clave de bloqueo para que solo un proceso numere eventos a la vez: con dos a
+# la vez, uno podría confirmar posiciones más altas antes que el otro las bajas.
+DISPATCH_LOCK_ID = 7_018_002
+# Clave del bloqueo de sesión que elige la única instancia del dispatcher activa.
+DISPATCHER_LEADER_LOCK_ID = 7_018_003
+
+# Numera los eventos confirmados y aún sin position, a continuación de la última.
+DISPATCH_QUERY = """
+    WITH head AS (
+        SELECT COALESCE(max(position), 0) AS position FROM change_outbox
+    ), pending AS (
+        SELECT id, row_number() OVER (ORDER BY id) AS n
+        FROM change_outbox
+        WHERE position IS NULL
+        ORDER BY id
+        LIMIT %s
+    )
+    UPDATE change_outbox c
+    SET position = head.position + pending.n, dispatched_at = now()
+    FROM pending, head
+    WHERE c.id = pending.id
+    RETURNING c.position;
+"""
+
+CHANGES_QUERY = """
+    SELECT position, entity, entity_id, op, payload, created_at
+    FROM change_outbox
+    WHERE position > %s
+    ORDER BY position
+    LIMIT %s;
+"""
+
+HEAD_QUERY = "SELECT COALESCE(max(position), 0), min(position) FROM change_outbox;"
+
+
+class ChangesService:
+    """Servicio para el outbox de cambios de posts y categorías (ver migrations/011_change_outbox.sql)."""
+
+    @staticmethod
+    @instrumented
+    def dispatch_pending(limit=None):
+        """
+        Asigna position a hasta `limit` eventos pendientes y avisa por NOTIFY
+        en CHANGES_CHANNEL al confirmar.
+        Returns:
+            int: Eventos despachados, o None si otro proceso está despachando
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s);", (DISPATCH_LOCK_ID,))
+                if not cur.fetchone()[0]:
+                    conn.rollback()
+                    cur.close()
+                    return None
+                cur.execute(DISPATCH_QUERY, (limit or Config.OUTBOX_DISPATCH_BATCH_SIZE,))
+                positions = [row[0] for row in cur.fetchall()]
+                if positions:
+                    cur.execute("SELECT pg_notify(%s, %s);", (CHANGES_CHANNEL, str(max(positions))))
+                conn.commit()
+                cur.close()
+                return len(positions)
+        except psycopg2.Error as e:
+            raise Exception(f"Error al despachar eventos: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def purge_dispatched(retention_days=None):
+        """
+        Borra los eventos despachados hace más de `retention_days` días
+        (por defecto OUTBOX_RETENTION_DAYS). El último se conserva siempre:
+        la numeración continúa a partir de él.
+        Returns:
+            int: Eventos borrados
+        """
+        days = retention_days if retention_days is not None else Config.OUTBOX_RETENTION_DAYS
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    DELETE FROM change_outbox
+                    WHERE dispatched_at < now() - make_interval(days => %s)
+                      AND position < (SELECT max(position) FROM change_outbox);
+                """, (days,))
+                deleted = cur.rowcount
+                conn.commit()
+                cur.close()
+                return deleted
+        except psycopg2.Error as e:
+            raise Exception(f"Error al purgar eventos: {str(e)}")
+
+    # Las lecturas van al primario: el NOTIFY que despierta a /changes sale del
+    # primario y una réplica podría no tener aún los eventos que anuncia.
+
+    @staticmethod
+    @instrumented
+    def get_head():
+        """
+        Returns:
+            tuple: (última position despachada (0 si no hay ninguna),
+                    position más antigua conservada o None)
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(HEAD_QUERY)
+                head = tuple(cur.fetchone())
+                cur.close()
+                return head
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def get_changes(since, limit=None):
+        """
+        Obtiene los eventos posteriores a `since`, en orden.
+        Args:
+            since (int): Última position que ya tiene el cliente
+            limit (int): Número máximo de eventos (por defecto CHANGES_PAGE_SIZE)
+        Returns:
+            dict: {"data": eventos, "next_since": position del último evento (o `since`)},
+                  o None si los eventos siguientes a `since` ya se han purgado
+        """
+        limit = limit or Config.CHANGES_PAGE_SIZE
+        if since < 0:
+            raise ValueError("'since' no puede ser negativo")
+        if limit < 1 or limit > Config.CHANGES_MAX_PAGE_SIZE:
+            raise ValueError(f"'limit' debe estar entre 1 y {Config.CHANGES_MAX_PAGE_SIZE}")
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(CHANGES_QUERY, (since, limit))
+                records = cur.fetchall()
+                if not records or records[0]["position"] != since + 1:
+                    cur.execute("SELECT min(position) AS oldest FROM change_outbox;")
+                    oldest = cur.fetchone()["oldest"]
+                    if oldest is not None and oldest > since + 1:
+                        cur.close()
+                        return None
+                cur.close()
+                return {"data": records, "next_since": records[-1]["position"] if records else since}
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
@@ -1,17 +1,106 @@
-from mailchimp_marketing import Client
-from mailchimp_marketing.api_client import ApiClientError
-import requests
-import hashlib
+import json
+import os
+import threading
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.subscriber_ledger_service import SubscriberLedgerService, subscriber_hash
 from config import Config
 
+mailchimp_breaker = CircuitBreaker(
+    failure_threshold=Config.MAILCHIMP_BREAKER_THRESHOLD,
+    reset_timeout=Config.MAILCHIMP_BREAKER_RESET_SECONDS
+)
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+# mailchimp_marketing (and requests) are imported on first use: the generated
+# SDK is the most expensive import of the app and many workers never need it.
+
+
+def _build_client():
+    from mailchimp_marketing import Client
+    from mailchimp_marketing.api_client import ApiClient
+    from requests.adapters import HTTPAdapter
+    import requests
+
+    class _PooledApiClient(ApiClient):
+        """ApiClient that sends requests through a shared keep-alive requests.Session."""
+
+        def __init__(self, config, session):
+            self.session = session
+            super().__init__(config)
+
+        def request(self, method, url, query_params=None, headers=None, body=None):
+            auth = ('user', self.api_key) if self.is_basic_auth else None
+            if self.is_oauth:
+                headers.update({'Authorization': 'Bearer ' + self.access_token})
+            data = json.dumps(body) if method in ("POST", "PUT", "PATCH") else None
+            return self.session.request(
+                method, url, params=query_params, data=data, headers=headers, auth=auth, timeout=self.timeout
+            )
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.MAILCHIMP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    api_client = _PooledApiClient({
+        "api_key": Config.MAILCHIMP_API_KEY,
+        "server": Config.MAILCHIMP_DC,
+        "timeout": (Config.MAILCHIMP_CONNECT_TIMEOUT, Config.MAILCHIMP_READ_TIMEOUT)
+    }, session)
+    if Config.MAILCHIMP_BASE_URL:
+        api_client.host = Config.MAILCHIMP_BASE_URL
+    client = Client()
+    client.api_client = api_client
+    for api in vars(client).values():
+        if hasattr(api, "api_client"):
+            api.api_client = api_client
+    return client
+
+
+def get_client():
+    """
+    Returns the process-wide Mailchimp client, creating it on first use.
+    A new client is built after fork so workers never share sockets.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = _build_client()
+                _client_pid = os.getpid()
+    return _client
+
 
 class MailchimpService:
     def __init__(self):
-        self.mailchimp = Client()
-        self.mailchimp.set_config({
-            "api_key": Config.MAILCHIMP_API_KEY,
-            "server": Config.MAILCHIMP_DC
-        })
+        self.mailchimp = get_client()
+
+    def _call(self, func, *args, **kwargs):
+        """
+        Runs a Mailchimp API call through the circuit breaker. Connection errors,
+        timeouts, 429 and 5xx responses count as failures; other API errors do not.
+        Every outcome is recorded, so a half-open probe is always released.
+        """
+        from mailchimp_marketing.api_client import ApiClientError
+
+        if not mailchimp_breaker.allow():
+            raise CircuitOpenError("Mailchimp circuit breaker is open")
+        try:
+            result = func(*args, **kwargs)
+        except ApiClientError as error:
+            if error.status_code is None or error.status_code == 429 or error.status_code >= 500:
+                mailchimp_breaker.record_failure()
+            else:
+                mailchimp_breaker.record_success()
+            raise
+        except Exception:
+            mailchimp_breaker.record_failure()
+            raise
+        mailchimp_breaker.record_success()
+        return result
 
     def trigger_info_email(self, email_address, first_name, journey_id, step_id):
         """
@@ -26,6 +115,9 @@ class MailchimpService:
         Returns:
             tuple: (success: bool, message: str)
         """
+        from mailchimp_marketing.api_client import ApiClientError
+        import requests
+
         payload = {
             "email_address": email_address,
             "merge_fields": {
@@ -34,9 +126,12 @@ class MailchimpService:
         }
 
         try:
-            self.mailchimp.customerJourneys.trigger(journey_id, step_id, payload)
+            self._call(self.mailchimp.customerJourneys.trigger, journey_id, step_id, payload)
             return True, "Info email triggered successfully."
 
+        except CircuitOpenError:
+            return False, "Mailchimp no está disponible en este momento."
+
         except ApiClientError as error:
             return False, f"An exception occurred: {error.text}"
 
@@ -48,7 +143,8 @@ class MailchimpService:
         """
         Suscribe (o reactiva) un usuario en la lista de Mailchimp.
         Usa el endpoint PUT (upsert) para manejar contactos nuevos, existentes
-        y aquellos que fueron eliminados permanentemente.
+        y aquellos que fueron eliminados permanentemente. Si el registro local
+        indica que ya está suscrito con los mismos datos, no se llama a Mailchimp.
 
         Args:
             email_address (str): Email del usuario
@@ -58,7 +154,11 @@ class MailchimpService:
         Returns:
             tuple: (success: bool, message: str)
         """
-        subscriber_hash = hashlib.md5(email_address.lower().encode()).hexdigest()
+        from mailchimp_marketing.api_client import ApiClientError
+        import requests
+
+        if SubscriberLedgerService.is_subscribed(email_address, first_name, last_name):
+            return True, "Usuario suscrito correctamente"
 
         payload = {
             "email_address": email_address,
@@ -71,11 +171,16 @@ class MailchimpService:
         }
 
         try:
-            response = self.mailchimp.lists.set_list_member(
-                Config.MAILCHIMP_LIST_ID, subscriber_hash, payload
+            response = self._call(
+                self.mailchimp.lists.set_list_member, Config.MAILCHIMP_LIST_ID,
+                subscriber_hash(email_address), payload
             )
+            SubscriberLedgerService.record([{"email": email_address, "fname": first_name, "lname": last_name}])
             return True, "Usuario suscrito correctamente"
 
+        except CircuitOpenError:
+            return False, "Mailchimp no está disponible en este momento."
+
         except ApiClientError as error:
             return False, f"An exception occurred: {error.text}"
 
@@ -83,6 +188,77 @@ class MailchimpService:
             print(f"Error de conexión: {e}")
             return False, "No se pudo conectar con el servidor de Mailchimp."
 
+    def batch_subscribe(self, members):
+        """
+        Subscribes (or updates) many users in a single Mailchimp batch call.
+
+        Args:
+            members (list): Dicts with email, fname and lname
+
+        Returns:
+            tuple: (success: bool, errors: dict mapping lowercased email to error message,
+                    or a str with the error if the whole request failed)
+        """
+        from mailchimp_marketing.api_client import ApiClientError
+
+        body = {
+            "members": [
+                {
+                    "email_address": member["email"],
+                    "status": "subscribed",
+                    "merge_fields": {
+                        "FNAME": member.get("fname") or "",
+                        "LNAME": member.get("lname") or ""
+                    }
+                }
+                for member in members
+            ],
+            "update_existing": True
+        }
+
+        try:
+            response = self._call(self.mailchimp.lists.batch_list_members, Config.MAILCHIMP_LIST_ID, body)
+        except CircuitOpenError:
+            return False, "Mailchimp no está disponible en este momento."
+        except ApiClientError as error:
+            return False, f"An exception occurred: {error.text}"
+
+        errors = {
+            error["email_address"].lower(): error.get("error", "Unknown error")
+            for error in response.get("errors", [])
+        }
+        return True, errors
+
+    def export_members(self, offset, count):
+        """
+        Fetches one page of the list members for reconciliation.
+
+        Args:
+            offset (int): Number of members to skip
+            count (int): Page size (Mailchimp allows up to 1000)
+
+        Returns:
+            tuple: (members: list of dicts with email, fname, lname and status, total_items: int)
+
+        Raises:
+            CircuitOpenError, ApiClientError: if the page could not be fetched
+        """
+        response = self._call(
+            self.mailchimp.lists.get_list_members_info, Config.MAILCHIMP_LIST_ID,
+            count=count, offset=offset, sort_field="timestamp_signup", sort_dir="ASC",
+            fields=["members.email_address", "members.status", "members.merge_fields", "total_items"]
+        )
+        members = [
+            {
+                "email": member["email_address"],
+                "status": member["status"],
+                "fname": member.get("merge_fields", {}).get("FNAME") or "",
+                "lname": member.get("merge_fields", {}).get("LNAME") or ""
+            }
+            for member in response.get("members", [])
+        ]
+        return members, response.get("total_items", 0)
+
     def ping(self):
         """Verifica la conexión con Mailchimp."""
-        return self.mailchimp.ping.get()
+        return self._call(self.mailchimp.ping.get)
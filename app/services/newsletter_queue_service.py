@@ -0,0 +1,154 @@
+import psycopg2
+from psycopg2.extras import RealDictCursor, Json
+from app.db import db_connection
+from app.instrumentation import instrumented
+from config import Config
+
+SUBSCRIBE = "subscribe"
+INFO_EMAIL = "info_email"
+
+
+class NewsletterQueueService:
+    """Servicio para la cola de trabajos de Mailchimp (tabla newsletter_jobs)."""
+
+    @staticmethod
+    @instrumented
+    def enqueue(kind, payload):
+        """
+        Añade un trabajo a la cola.
+        Args:
+            kind (str): SUBSCRIBE o INFO_EMAIL
+            payload (dict): Datos del trabajo
+        Returns:
+            int: ID del trabajo creado
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "INSERT INTO newsletter_jobs (kind, payload) VALUES (%s, %s) RETURNING id;",
+                    (kind, Json(payload))
+                )
+                job_id = cur.fetchone()[0]
+                conn.commit()
+                cur.close()
+                return job_id
+        except psycopg2.Error as e:
+            raise Exception(f"Error al encolar el trabajo: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def claim_batch(limit):
+        """
+        Reserva hasta `limit` trabajos listos para ejecutarse. Los trabajos
+        bloqueados por un worker que murió hace más de NEWSLETTER_LOCK_TIMEOUT
+        segundos vuelven a estar disponibles.
+        Returns:
+            list: Trabajos reservados (diccionarios)
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute("""
+                    UPDATE newsletter_jobs
+                    SET status = 'processing', locked_at = now(), attempts = attempts + 1
+                    WHERE id IN (
+                        SELECT id FROM newsletter_jobs
+                        WHERE (status = 'pending' AND run_after <= now())
+                           OR (status = 'processing' AND locked_at < now() - make_interval(secs => %s))
+                        ORDER BY run_after
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, kind, payload, attempts;
+                """, (Config.NEWSLETTER_LOCK_TIMEOUT, limit))
+                jobs = cur.fetchall()
+                conn.commit()
+                cur.close()
+                return jobs
+        except psycopg2.Error as e:
+            raise Exception(f"Error al reservar trabajos: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def mark_done(job_ids):
+        if not job_ids:
+            return
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "UPDATE newsletter_jobs SET status = 'done', finished_at = now(), last_error = NULL "
+                    "WHERE id = ANY(%s);",
+                    (list(job_ids),)
+                )
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al completar trabajos: {str(e)}")
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Segundos hasta el siguiente intento tras `attempts` intentos fallidos (máximo una hora)."""
+        return min(Config.NEWSLETTER_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600)
+
+    @staticmethod
+    def is_final(attempts):
+        """Indica si tras `attempts` intentos el trabajo ya no se reintenta."""
+        return attempts >= Config.NEWSLETTER_MAX_ATTEMPTS
+
+    @staticmethod
+    @instrumented
+    def mark_failed(job, error):
+        """
+        Registra un fallo. El trabajo se reintenta con backoff exponencial
+        hasta NEWSLETTER_MAX_ATTEMPTS intentos; después queda como 'failed'.
+        """
+        final = NewsletterQueueService.is_final(job["attempts"])
+        delay = NewsletterQueueService.retry_delay(job["attempts"])
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    UPDATE newsletter_jobs
+                    SET status = %s,
+                        last_error = %s,
+                        locked_at = NULL,
+                        run_after = now() + make_interval(secs => %s),
+                        finished_at = CASE WHEN %s THEN now() END
+                    WHERE id = %s;
+                """, ("failed" if final else "pending", str(error), delay, final, job["id"]))
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al registrar el fallo: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def stats():
+        """
+        Métricas de la cola: profundidad por estado, antigüedad del trabajo
+        pendiente más viejo y latencia media (creación → fin) de la última hora.
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute("SELECT status, count(*) AS count FROM newsletter_jobs GROUP BY status;")
+                depth = {row["status"]: row["count"] for row in cur.fetchall()}
+                cur.execute("""
+                    SELECT
+                        (SELECT EXTRACT(EPOCH FROM now() - min(created_at))
+                         FROM newsletter_jobs WHERE status IN ('pending', 'processing')) AS oldest_pending_seconds,
+                        (SELECT EXTRACT(EPOCH FROM avg(finished_at - created_at))
+                         FROM newsletter_jobs
+                         WHERE status = 'done' AND finished_at > now() - interval '1 hour') AS avg_latency_seconds;
+                """)
+                ages = cur.fetchone()
+                cur.close()
+                return {
+                    "depth": depth,
+                    "oldest_pending_seconds": float(ages["oldest_pending_seconds"] or 0),
+                    "avg_latency_seconds": float(ages["avg_latency_seconds"] or 0),
+                }
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
@@ -1,81 +1,727 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, Json, execute_values
+import base64
+import json
 import uuid
-from datetime import datetime
-from app.db import get_connection, release_connection
+from datetime import datetime, timezone
+from app.db import db_connection, note_write
+from app.instrumentation import instrumented
+from app.cache import read_cache, cached, content_version, versioned
+from app.content_processing import DERIVED_COLUMNS, PROCESSING_VERSION, process_content
+from app.slugs import slugify, with_suffix
+from config import Config
+
+# Columnas que se pueden pedir con `fields=` en el índice paginado.
+INDEX_FIELDS = {
+    "id": "p.id",
+    "title": "p.title",
+    "slug": "p.slug",
+    "abstract": "p.abstract",
+    "thumbnail_url": "p.thumbnail_url",
+    "published_at": "p.published_at",
+    "category_name": "p.categories AS category_name",
+    "excerpt": "p.excerpt",
+    "word_count": "p.word_count",
+    "reading_minutes": "p.reading_minutes",
+}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(published_at, post_id):
+    """Codifica la posición (published_at, id) como un cursor opaco."""
+    raw = json.dumps([published_at.isoformat(), str(post_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+    Raises:
+        ValueError: si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # El id se valida aquí: un cursor manipulado no debe llegar a la consulta.
+        return datetime.fromisoformat(published_at), str(uuid.UUID(post_id))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Cursor no válido") from e
+
+
+# Las consultas de lectura y su post-procesado viven a nivel de módulo para que
+# los compartan PostsService y el modo ASGI (app/services/async_reads.py).
+
+def index_cache_key(limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None, category=None, is_published=None):
+    return ("posts", "index", limit, cursor, tuple(fields) if fields else None, category, is_published)
+
+
+def post_cache_key(post_id):
+    return ("posts", "post", str(post_id))
+
+
+def summary_cache_key(post_id):
+    return ("posts", "summary", str(post_id))
+
+
+def content_cache_key(post_id, format="html"):
+    return ("posts", "content", str(post_id), format)
+
+
+def slug_cache_key(slug):
+    return ("posts", "slug", slug)
+
+
+def search_cache_key(query, limit=DEFAULT_PAGE_SIZE, offset=0):
+    return ("posts", "search", query, limit, offset)
+
+
+def build_index_query(limit, cursor, fields, category, is_published):
+    """
+    Construye la consulta de una página del índice. Por defecto (y con
+    is_published=True) lee el feed publicado, sin borradores ni posts
+    programados; con is_published=False, los borradores de posts.
+    Returns:
+        tuple: (select_query, values, fields)
+    Raises:
+        ValueError: si el cursor, el límite o algún campo no son válidos
+    """
+    if fields:
+        unknown = [f for f in fields if f not in INDEX_FIELDS]
+        if unknown:
+            raise ValueError(f"Campos no permitidos: {', '.join(unknown)}")
+    else:
+        fields = list(INDEX_FIELDS)
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"'limit' debe estar entre 1 y {MAX_PAGE_SIZE}")
+
+    # id y published_at siempre se seleccionan para poder construir el cursor.
+    columns = [INDEX_FIELDS[f] for f in fields]
+    for key in ("id", "published_at"):
+        if key not in fields:
+            columns.append(INDEX_FIELDS[key])
+
+    where_clauses = []
+    values = []
+    if cursor:
+        cursor_published_at, cursor_id = decode_cursor(cursor)
+        where_clauses.append("(p.published_at, p.id) < (%s, %s)")
+        values.extend([cursor_published_at, cursor_id])
+    if category:
+        # @> puede usar los índices GIN de categories (migrations/005 y 010); ANY() no.
+        where_clauses.append("p.categories @> ARRAY[%s]::text[]")
+        values.append(category)
+    table = "posts_feed"
+    if is_published is False:
+        table = "posts"
+        where_clauses.append("p.is_published = FALSE")
+
+    where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    values.append(limit + 1)
+    select_query = f"""
+        SELECT {', '.join(columns)}
+        FROM {table} p
+        {where}
+        ORDER BY p.published_at DESC, p.id DESC
+        LIMIT %s;
+    """
+    return select_query, values, fields
+
+
+def finish_index_page(records, limit, fields):
+    """Recorta la página, calcula el siguiente cursor y quita las columnas no pedidas."""
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(last["published_at"], last["id"])
+
+    extra = {"id", "published_at"} - set(fields)
+    if extra:
+        for record in records:
+            for key in extra:
+                del record[key]
+
+    return {"data": records, "next_cursor": next_cursor}
+
+
+# Las lecturas públicas de posts sueltos solo ven lo que está en el feed
+# publicado: ni borradores ni posts programados que aún no han salido.
+PUBLISHED_FILTER = "EXISTS (SELECT 1 FROM posts_feed f WHERE f.id = p.id)"
+
+POST_BY_ID_QUERY = f"""
+    SELECT
+        p.id,
+        p.title,
+        p.slug,
+        p.abstract,
+        p.thumbnail_url,
+        p.published_at,
+        p.categories AS category_name,
+        p.excerpt,
+        p.word_count,
+        p.reading_minutes,
+        p.toc,
+        p.content
+    FROM posts p
+    WHERE p.id = %s AND {PUBLISHED_FILTER};
+"""
+
+# Metadatos de uno o varios posts, sin el HTML de `content`.
+SUMMARY_COLUMNS = """
+        p.id,
+        p.title,
+        p.slug,
+        p.abstract,
+        p.thumbnail_url,
+        p.published_at,
+        p.categories AS category_name,
+        p.excerpt,
+        p.word_count,
+        p.reading_minutes
+"""
+
+SUMMARIES_BY_IDS_QUERY = f"SELECT {SUMMARY_COLUMNS} FROM posts p WHERE p.id IN %s AND {PUBLISHED_FILTER};"
+
+POST_SUMMARY_QUERY = f"SELECT {SUMMARY_COLUMNS} FROM posts p WHERE p.id = %s AND {PUBLISHED_FILTER};"
+
+# Un slug actual o del historial (migrations/009_post_slugs.sql) -> id y slug actual del post.
+RESOLVE_SLUG_QUERY = f"""
+    SELECT p.id, p.slug FROM posts p WHERE p.slug = %(slug)s AND {PUBLISHED_FILTER}
+    UNION ALL
+    SELECT p.id, p.slug
+    FROM post_slug_history h
+    JOIN posts p ON p.id = h.post_id
+    WHERE h.slug = %(slug)s AND {PUBLISHED_FILTER}
+    LIMIT 1;
+"""
+
+# Posts publicados con su última modificación, para /sitemap.xml.
+SITEMAP_QUERY = """
+    SELECT f.id, f.slug, f.published_at, p.updated_at
+    FROM posts_feed f
+    JOIN posts p ON p.id = f.id
+    ORDER BY f.published_at DESC, f.id DESC;
+"""
+
+# Contenido de un post en cada formato de /posts/<id>/content.
+POST_CONTENT_QUERIES = {
+    "html": f"SELECT p.id, p.content FROM posts p WHERE p.id = %s AND {PUBLISHED_FILTER};",
+    "text": f"SELECT p.id, p.content_text FROM posts p WHERE p.id = %s AND {PUBLISHED_FILTER};",
+}
+
+# Exportación completa, ordenada por última modificación para poder reanudarla con `since`.
+EXPORT_COLUMNS = f"""{SUMMARY_COLUMNS.rstrip()},
+        p.is_published,
+        p.updated_at,
+        p.content
+"""
+
+
+# Campos de la API y su columna en la tabla posts.
+POST_COLUMN_MAP = {
+    "title": "title",
+    "abstract": "abstract",
+    "img": "thumbnail_url",
+    "categories": "categories",
+    "prod": "is_published",
+    "content": "content",
+    "published_at": "published_at",
+}
+
+# Tipo esperado de cada campo y el tipo SQL con el que se envía en las operaciones masivas.
+POST_FIELD_TYPES = {
+    "title": (str, "text"),
+    "abstract": (str, "text"),
+    "img": (str, "text"),
+    "categories": (list, "text[]"),
+    "prod": (bool, "boolean"),
+    "content": (str, "text"),
+    "published_at": (str, "timestamp"),
+}
+
+# Campos que se pueden omitir al crear un post.
+OPTIONAL_POST_FIELDS = {"published_at"}
+
+# Tipo SQL de cada columna derivada de `content` (ver app/content_processing.py).
+DERIVED_COLUMN_TYPES = {
+    "content_text": "text",
+    "word_count": "integer",
+    "reading_minutes": "integer",
+    "toc": "jsonb",
+    "excerpt": "text",
+    "content_version": "smallint",
+}
+
+MAX_BULK_ITEMS = 1000
+
+
+def make_slug(title):
+    return slugify(title)
+
+
+# Slugs ocupados (actuales o en el historial) por cada base y sus sufijos.
+TAKEN_SLUGS_QUERY = """
+    SELECT p.slug, p.id AS owner FROM posts p
+    WHERE p.slug = ANY(%(bases)s) OR p.slug LIKE ANY(%(patterns)s)
+    UNION ALL
+    SELECT h.slug, h.post_id AS owner FROM post_slug_history h
+    WHERE h.slug = ANY(%(bases)s) OR h.slug LIKE ANY(%(patterns)s);
+"""
+
+
+def assign_slugs(cur, items):
+    """
+    Elige un slug libre para cada post dentro de la transacción de `cur`:
+    el título normalizado o, si ya lo usa otro post (o está en su historial),
+    con el primer sufijo -2, -3... libre. Un bloqueo por slug base serializa
+    las escrituras concurrentes que compiten por el mismo; el índice único
+    posts_slug_key (migrations/009_post_slugs.sql) lo garantiza en cualquier caso.
+    Args:
+        cur: Cursor de la transacción de escritura
+        items (list): Tuplas (post_id, título)
+    Returns:
+        list: Slug asignado a cada post, en el mismo orden
+    """
+    if not items:
+        return []
+    bases = [make_slug(title) for _, title in items]
+    unique_bases = sorted(set(bases))
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(base)) FROM unnest(%s::text[]) AS base;", (unique_bases,))
+    cur.execute(TAKEN_SLUGS_QUERY, {"bases": unique_bases, "patterns": [f"{base}-%" for base in unique_bases]})
+    owners = {}
+    for slug, owner in cur.fetchall():
+        owners.setdefault(slug, set()).add(str(owner))
+
+    assigned = set()
+    slugs = []
+    for (post_id, _), base in zip(items, bases):
+        post_id = str(post_id)
+        taken = {slug for slug, slug_owners in owners.items() if slug_owners - {post_id}} | assigned
+        slug = with_suffix(base, taken)
+        assigned.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def derived_values(content, derived=None):
+    """
+    Campos derivados de `content`, en el orden de DERIVED_COLUMNS y listos para
+    psycopg2. `derived` permite pasar el resultado de process_content ya calculado.
+    """
+    derived = dict(derived or process_content(content))
+    derived["toc"] = Json(derived["toc"])
+    return [derived[column] for column in DERIVED_COLUMNS]
+
+
+def parse_publish_date(value):
+    """
+    Convierte la fecha de publicación recibida (ISO 8601) a UTC sin zona, como
+    se guarda published_at. Una fecha futura programa el post: no aparece en
+    el feed hasta entonces (ver migrations/010_posts_feed.sql).
+    Raises:
+        ValueError: si la fecha no es válida
+    """
+    try:
+        published_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Fecha de publicación no válida: '{value}'")
+    if published_at.tzinfo is not None:
+        published_at = published_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return published_at
+
+
+def validate_post_fields(data, partial=False):
+    """
+    Comprueba los campos de un post recibido por la API.
+    Con partial=True (actualizaciones) no hace falta que estén todos.
+    Returns:
+        list: Mensajes de error; vacía si el post es válido
+    """
+    if not isinstance(data, dict):
+        return ["Cada post debe ser un objeto JSON"]
+    errors = []
+    for field, (kind, _) in POST_FIELD_TYPES.items():
+        if field not in data:
+            if not partial and field not in OPTIONAL_POST_FIELDS:
+                errors.append(f"El campo '{field}' es obligatorio")
+            continue
+        value = data[field]
+        if not isinstance(value, kind):
+            errors.append(f"El campo '{field}' no es válido")
+        elif kind is list and not all(isinstance(item, str) for item in value):
+            errors.append(f"El campo '{field}' debe ser una lista de textos")
+    if isinstance(data.get("title"), str) and not data["title"].strip():
+        errors.append("El campo 'title' no puede estar vacío")
+    if isinstance(data.get("published_at"), str):
+        try:
+            parse_publish_date(data["published_at"])
+        except ValueError as e:
+            errors.append(str(e))
+    return errors
+
+
+def check_bulk_size(items):
+    if not isinstance(items, list) or not items:
+        raise ValueError("Se requiere una lista de posts no vacía")
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"Se admiten como máximo {MAX_BULK_ITEMS} posts por petición")
+
+
+def build_export_query(since, is_published, include_drafts=False):
+    # Sin include_drafts (lecturas públicas) solo se exporta el feed publicado.
+    conditions = [] if include_drafts else [PUBLISHED_FILTER]
+    values = []
+    if since is not None:
+        conditions.append("p.updated_at > %s")
+        values.append(since)
+    if is_published is not None:
+        conditions.append("p.is_published = %s")
+        values.append(is_published)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT {EXPORT_COLUMNS} FROM posts p {where} ORDER BY p.updated_at, p.id;"
+    return sql, values
+
+# La búsqueda recorre solo el feed publicado (posts_feed, migrations/010_posts_feed.sql).
+# ts_headline solo se calcula sobre la página devuelta, no sobre todas las coincidencias,
+# y usa el texto plano precalculado (el HTML solo para posts aún sin procesar).
+SEARCH_QUERY = """
+    WITH q AS (
+        SELECT plainto_tsquery('spanish', %s) AS query
+    ),
+    matches AS (
+        SELECT
+            f.id,
+            f.title,
+            f.slug,
+            f.abstract,
+            f.thumbnail_url,
+            f.published_at,
+            f.categories AS category_name,
+            ts_rank(f.search_vector, q.query) AS rank
+        FROM posts_feed f, q
+        WHERE f.search_vector @@ q.query
+        ORDER BY rank DESC, f.id DESC
+        LIMIT %s OFFSET %s
+    )
+    SELECT
+        m.id,
+        m.title,
+        m.slug,
+        m.abstract,
+        m.thumbnail_url,
+        m.published_at,
+        m.category_name,
+        m.rank,
+        ts_headline(
+            'spanish',
+            COALESCE(m.abstract, '') || ' ' ||
+                COALESCE(p.content_text, regexp_replace(COALESCE(p.content, ''), '<[^>]+>', ' ', 'g')),
+            q.query,
+            'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10'
+        ) AS snippet
+    FROM matches m
+    JOIN posts p ON p.id = m.id, q
+    ORDER BY m.rank DESC, m.id DESC;
+"""
+
+
+def validate_search_page(limit, offset):
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"'limit' debe estar entre 1 y {MAX_PAGE_SIZE}")
+    if offset < 0:
+        raise ValueError("'offset' no puede ser negativo")
+
+
+def finish_search_page(records, limit, offset):
+    next_offset = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_offset = offset + limit
+    return {"data": records, "next_offset": next_offset}
+
+
+# Funciones sin argumentos a las que se avisa tras cada escritura en posts
+# (p. ej. la regeneración de feeds de app/syndication.py).
+change_listeners = []
+
 
 class PostsService:
     """Servicio para manejar operaciones de posts en la base de datos PostgreSQL."""
 
     @staticmethod
+    def _invalidate_cache(*post_ids):
+        """
+        Libera las entradas de caché afectadas por una escritura en posts. No
+        hace falta para la coherencia (la escritura incrementa la versión de
+        'posts' y las claves de read_cache la incluyen, también en los demás
+        procesos), pero así no ocupan sitio hasta caducar.
+        """
+        note_write()
+        read_cache.invalidate_prefix("posts", "index")
+        read_cache.invalidate_prefix("posts", "search")
+        read_cache.invalidate_prefix("posts", "slug")
+        read_cache.invalidate_prefix("posts", "all_index")
+        # Los recuentos por categoría dependen de posts (ver migrations/005_category_counts.sql).
+        read_cache.invalidate_prefix("categories", "with_counts")
+        for post_id in post_ids:
+            if post_id is not None:
+                read_cache.invalidate_prefix(*post_cache_key(post_id))
+                read_cache.invalidate_prefix(*summary_cache_key(post_id))
+                read_cache.invalidate_prefix("posts", "content", str(post_id))
+        for listener in change_listeners:
+            listener()
+
+    @staticmethod
+    @cached(lambda: ("posts", "all_index"))
+    @instrumented
     def get_all_index():
         """
-        Obtiene todos los registros de la tabla index.
+        Obtiene todos los posts publicados (feed), del más reciente al más antiguo.
         Returns:
             list: Lista de registros (diccionarios)
         """
-        conn = get_connection()
-        try:
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            select_query = """
-            SELECT
-                p.id,
-                p.title,
-                p.slug,
-                p.abstract,
-                p.thumbnail_url,
-                p.published_at,
-                p.categories AS category_name
-            FROM posts p
-            ORDER BY p.published_at DESC;
-        """
-            cur.execute(select_query)
-            records = cur.fetchall()
-            cur.close()
-            return records
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                select_query = """
+                SELECT
+                    p.id,
+                    p.title,
+                    p.slug,
+                    p.abstract,
+                    p.thumbnail_url,
+                    p.published_at,
+                    p.categories AS category_name
+                FROM posts_feed p
+                ORDER BY p.published_at DESC;
+            """
+                cur.execute(select_query)
+                records = cur.fetchall()
+                cur.close()
+                return records
         except psycopg2.Error as e:
             print(f"Database error: {e}")
             raise Exception(f"Error en la base de datos Pichón: {str(e)}")
-        finally:
-            release_connection(conn)
 
     @staticmethod
+    @cached(index_cache_key)
+    @instrumented
+    def get_index_page(limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None, category=None, is_published=None):
+        """
+        Obtiene una página del índice de posts ordenada por (published_at, id) descendente.
+        Args:
+            limit (int): Número máximo de posts a devolver
+            cursor (str): Cursor opaco devuelto por la página anterior
+            fields (list): Columnas a devolver (ver INDEX_FIELDS); por defecto todas
+            category (str): Filtra los posts que contienen esta categoría
+            is_published (bool): Filtra por estado de publicación
+        Returns:
+            dict: {"data": lista de registros, "next_cursor": str o None}
+        Raises:
+            ValueError: si el cursor, el límite o algún campo no son válidos
+        """
+        select_query, values, fields = build_index_query(limit, cursor, fields, category, is_published)
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(select_query, values)
+                records = cur.fetchall()
+                cur.close()
+        except psycopg2.Error as e:
+            print(f"Database error: {e}")
+            raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+        return finish_index_page(records, limit, fields)
+
+    @staticmethod
+    @cached(post_cache_key)
+    @instrumented
     def get_post_by_id(post_id):
         """
-        Obtiene un post específico por su ID.
+        Obtiene un post publicado por su ID.
         Args:
             post_id (str): ID del post
+        Returns:
+            dict: Registro del post o None si no existe o no está publicado
+        """
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(POST_BY_ID_QUERY, (post_id,))
+                record = cur.fetchone()
+                cur.close()
+                return record
+        except psycopg2.Error as e:
+            print(f"Database error: {e}")
+            raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def get_syndication_data(limit, fields):
+        """
+        Lee sin caché, en una misma transacción (REPEATABLE READ), la versión
+        de 'posts', los últimos `limit` posts del feed y las entradas del
+        sitemap: los feeds de app/syndication.py se etiquetan con la versión
+        de los datos con los que se generan.
+        Returns:
+            tuple: (número de versión o None, posts, entradas del sitemap
+                    {"id", "slug", "published_at", "updated_at"})
+        """
+        select_query, values, fields = build_index_query(limit, None, fields, None, None)
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;")
+                cur.execute("SELECT version FROM content_versions WHERE table_name = 'posts';")
+                version = cur.fetchone()
+                cur.execute(select_query, values)
+                records = cur.fetchall()
+                cur.execute(SITEMAP_QUERY)
+                entries = cur.fetchall()
+                cur.close()
+                conn.rollback()
+        except psycopg2.Error as e:
+            print(f"Database error: {e}")
+            raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+        posts = finish_index_page(records, limit, fields)["data"]
+        return (version["version"] if version else None), posts, entries
+
+    @staticmethod
+    @cached(slug_cache_key)
+    @instrumented
+    def resolve_slug(slug):
+        """
+        Busca el post de un slug, actual o anterior (posts renombrados).
+        Args:
+            slug (str): Slug de la URL
+        Returns:
+            dict: {"id", "slug"} con el slug actual del post, o None si no existe o no está publicado
+        """
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(RESOLVE_SLUG_QUERY, {"slug": slug})
+                record = cur.fetchone()
+                cur.close()
+                return record
+        except psycopg2.Error as e:
+            print(f"Database error: {e}")
+            raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def get_post_summaries(post_ids):
+        """
+        Obtiene los metadatos (sin `content`) de varios posts publicados en una sola consulta.
+        Los que ya están en caché no se vuelven a pedir.
+        Args:
+            post_ids (list): IDs de los posts (máximo MAX_PAGE_SIZE)
+        Returns:
+            list: Registros encontrados, en el mismo orden que `post_ids`
+        Raises:
+            ValueError: si no hay IDs o hay demasiados
+        """
+        post_ids = list(dict.fromkeys(str(post_id) for post_id in post_ids))
+        if not post_ids or len(post_ids) > MAX_PAGE_SIZE:
+            raise ValueError(f"Se requieren entre 1 y {MAX_PAGE_SIZE} IDs")
+
+        version = content_version("posts")
+        found = {}
+        missing = []
+        for post_id in post_ids:
+            record = read_cache.get(versioned(summary_cache_key(post_id), version))
+            if record is None:
+                missing.append(post_id)
+            else:
+                found[post_id] = record
+
+        if missing:
+            try:
+                with db_connection(readonly=True) as conn:
+                    cur = conn.cursor(cursor_factory=RealDictCursor)
+                    cur.execute(SUMMARIES_BY_IDS_QUERY, (tuple(missing),))
+                    records = cur.fetchall()
+                    cur.close()
+            except psycopg2.Error as e:
+                print(f"Database error: {e}")
+                raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+            for record in records:
+                post_id = str(record["id"])
+                read_cache.set(versioned(summary_cache_key(post_id), version), record)
+                found[post_id] = record
+
+        return [found[post_id] for post_id in post_ids if post_id in found]
+
+    @staticmethod
+    @instrumented
+    def get_post_summary(post_id):
+        """
+        Obtiene los metadatos de un post sin su `content`.
         Returns:
             dict: Registro del post o None si no existe
         """
-        conn = get_connection()
-        try:
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            select_query = """
-            SELECT
-                p.id,
-                p.title,
-                p.slug,
-                p.abstract,
-                p.thumbnail_url,
-                p.published_at,
-                p.categories AS category_name,
-                p.content
-            FROM posts p
-            WHERE p.id = %s;
-        """
-            cur.execute(select_query, (post_id,))
-            record = cur.fetchone()
-            cur.close()
-            return record
+        summaries = PostsService.get_post_summaries([post_id])
+        return summaries[0] if summaries else None
+
+    @staticmethod
+    @cached(content_cache_key)
+    @instrumented
+    def get_post_content(post_id, format="html"):
+        """
+        Obtiene solo el contenido de un post, para cargarlo de forma diferida.
+        Args:
+            post_id (str): ID del post
+            format (str): "html" (`content`) o "text" (`content_text`, texto plano)
+        Returns:
+            dict: {"id", "content"} o {"id", "content_text"}, o None si no existe o no está publicado
+        Raises:
+            ValueError: si el formato no es válido
+        """
+        if format not in POST_CONTENT_QUERIES:
+            raise ValueError(f"Formato no válido: '{format}' (html o text)")
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(POST_CONTENT_QUERIES[format], (post_id,))
+                record = cur.fetchone()
+                cur.close()
+                return record
         except psycopg2.Error as e:
             print(f"Database error: {e}")
             raise Exception(f"Error en la base de datos Pichón: {str(e)}")
-        finally:
-            release_connection(conn)
 
     @staticmethod
-    def create_post(title, abstract, img, categories, prod, content):
+    def export_posts(since=None, is_published=None, include_drafts=False):
+        """
+        Recorre todos los posts (con `content`) mediante un cursor con nombre en
+        el servidor, que trae EXPORT_ITERSIZE filas en cada viaje. La memoria usada
+        no depende del tamaño del archivo. La conexión queda ocupada mientras se
+        consume el generador.
+        Args:
+            since (datetime): Solo posts modificados después de esta fecha
+            is_published (bool): Filtra por estado de publicación
+            include_drafts (bool): Incluye borradores y posts programados (solo administración)
+        Yields:
+            dict: Registro de cada post, por updated_at ascendente
+        """
+        sql, values = build_export_query(since, is_published, include_drafts)
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(name="posts_export", cursor_factory=RealDictCursor)
+                cur.itersize = Config.EXPORT_ITERSIZE
+                cur.execute(sql, values)
+                for record in cur:
+                    yield record
+                cur.close()
+                conn.rollback()
+        except psycopg2.Error as e:
+            print(f"Database error: {e}")
+            raise Exception(f"Error en la base de datos Pichón: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def create_post(title, abstract, img, categories, prod, content, published_at=None):
         """
         Crea un nuevo post con todos los campos necesarios.
         Args:
@@ -85,43 +731,48 @@ class PostsService:
             categories (list): Lista de categorías
             prod (bool): Indicador de producción
             content (str): Contenido HTML del post
+            published_at (str): Fecha de publicación ISO 8601; futura para programarlo. Por defecto, ahora
         Returns:
             str: ID del post creado
+        Raises:
+            ValueError: si published_at no es una fecha válida
         """
-        published_at = datetime.utcnow()
-        slug = title.lower().replace(' ', '-')
+        published_at = parse_publish_date(published_at) if published_at else datetime.utcnow()
         post_id = str(uuid.uuid4())
-        conn = get_connection()
         try:
-            cur = conn.cursor()
-            insert_query = """
-                INSERT INTO posts (id, title, slug, abstract, thumbnail_url, categories, is_published, published_at, content)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cur.execute(insert_query, (
-                post_id,
-                title,
-                slug,
-                abstract,
-                img,
-                categories,
-                prod,
-                published_at,
-                content
-            ))
-            conn.commit()
-            cur.close()
-            return post_id
+            with db_connection() as conn:
+                cur = conn.cursor()
+                slug = assign_slugs(cur, [(post_id, title)])[0]
+                insert_query = f"""
+                    INSERT INTO posts (id, title, slug, abstract, thumbnail_url, categories, is_published, published_at, content,
+                                       {', '.join(DERIVED_COLUMNS)})
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, {', '.join(['%s'] * len(DERIVED_COLUMNS))})
+                """
+                cur.execute(insert_query, (
+                    post_id,
+                    title,
+                    slug,
+                    abstract,
+                    img,
+                    categories,
+                    prod,
+                    published_at,
+                    content,
+                    *derived_values(content)
+                ))
+                conn.commit()
+                cur.close()
+                PostsService._invalidate_cache()
+                return post_id
         except psycopg2.IntegrityError as _e:
             raise Exception(f"Error de integridad: {str(_e)}")
         except psycopg2.Error as e:
             raise Exception(f"Error en la base de datos: {str(e)}")
-        finally:
-            release_connection(conn)
 
 
 
     @staticmethod
+    @instrumented
     def update_post(post_id, fields):
         """
         Actualiza parcialmente un post con los campos proporcionados.
@@ -130,82 +781,321 @@ class PostsService:
             fields (dict): Diccionario con los campos a actualizar
         Returns:
             bool: True si se actualizó, False si no existía
+        Raises:
+            ValueError: si published_at no es una fecha válida
         """
         if not fields:
             raise Exception("No se proporcionaron campos para actualizar")
 
-        column_map = {
-            "title": "title",
-            "abstract": "abstract",
-            "img": "thumbnail_url",
-            "categories": "categories",
-            "prod": "is_published",
-            "content": "content",
-        }
-
         set_clauses = []
         values = []
 
         for key, value in fields.items():
-            if key not in column_map:
+            if key not in POST_COLUMN_MAP:
                 raise Exception(f"Campo no permitido: '{key}'")
-            set_clauses.append(f"{column_map[key]} = %s")
+            if key == "published_at":
+                value = parse_publish_date(value)
+            set_clauses.append(f"{POST_COLUMN_MAP[key]} = %s")
             values.append(value)
 
-        if "title" in fields:
-            set_clauses.append("slug = %s")
-            values.append(fields["title"].lower().replace(" ", "-"))
+        if "content" in fields:
+            set_clauses.extend(f"{column} = %s" for column in DERIVED_COLUMNS)
+            values.extend(derived_values(fields["content"]))
 
-        values.append(post_id)
-        update_query = f"UPDATE posts SET {', '.join(set_clauses)} WHERE id = %s"
-
-        conn = get_connection()
         try:
-            cur = conn.cursor()
-            cur.execute(update_query, values)
-            updated = cur.rowcount > 0
-            conn.commit()
-            cur.close()
-            return updated
+            with db_connection() as conn:
+                cur = conn.cursor()
+                if "title" in fields:
+                    # El slug anterior pasa a post_slug_history (ver migrations/009_post_slugs.sql).
+                    set_clauses.append("slug = %s")
+                    values.append(assign_slugs(cur, [(post_id, fields["title"])])[0])
+                values.append(post_id)
+                cur.execute(f"UPDATE posts SET {', '.join(set_clauses)} WHERE id = %s", values)
+                updated = cur.rowcount > 0
+                conn.commit()
+                cur.close()
+                if updated:
+                    PostsService._invalidate_cache(post_id)
+                return updated
         except psycopg2.Error as e:
             raise Exception(f"Error al actualizar el post: {str(e)}")
-        finally:
-            release_connection(conn)
-
-    @staticmethod
-    def search_posts(query: str) -> list:
-        conn = get_connection()
-        try:
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            select_query = """
-            SELECT
-                p.id,
-                p.title,
-                p.slug,
-                p.abstract,
-                p.thumbnail_url,
-                p.published_at,
-                p.categories AS category_name,
-                ts_rank(
-                    to_tsvector('spanish', p.title || ' ' || COALESCE(p.abstract, '') || ' ' || COALESCE(p.content, '')),
-                    plainto_tsquery('spanish', %s)
-                ) AS rank
-            FROM posts p
-            WHERE to_tsvector('spanish', p.title || ' ' || COALESCE(p.abstract, '') || ' ' || COALESCE(p.content, ''))
-                  @@ plainto_tsquery('spanish', %s)
-            ORDER BY rank DESC;
-            """
-            cur.execute(select_query, (query, query))
-            records = cur.fetchall()
-            cur.close()
-            return records
+
+    @staticmethod
+    @instrumented
+    def bulk_create_posts(items):
+        """
+        Crea varios posts en una sola transacción con execute_values.
+        Los posts no válidos se informan y no se insertan; el resto sí.
+        Args:
+            items (list): Posts con los mismos campos que create_post
+        Returns:
+            list: Un resultado por post, en el mismo orden:
+                {"index", "status": "created", "id"} o {"index", "status": "invalid", "errors"}
+        Raises:
+            ValueError: si la lista está vacía o es demasiado grande
+        """
+        check_bulk_size(items)
+        published_at = datetime.utcnow()
+        results = []
+        rows = []
+        for index, item in enumerate(items):
+            errors = validate_post_fields(item)
+            if errors:
+                results.append({"index": index, "status": "invalid", "errors": errors})
+                continue
+            post_id = str(uuid.uuid4())
+            rows.append([
+                post_id,
+                item["title"],
+                None,  # slug, se asigna dentro de la transacción
+                item["abstract"],
+                item["img"],
+                item["categories"],
+                item["prod"],
+                parse_publish_date(item["published_at"]) if item.get("published_at") else published_at,
+                item["content"],
+                *derived_values(item["content"])
+            ])
+            results.append({"index": index, "status": "created", "id": post_id})
+
+        if not rows:
+            return results
+
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                for row, slug in zip(rows, assign_slugs(cur, [(row[0], row[1]) for row in rows])):
+                    row[2] = slug
+                execute_values(cur, f"""
+                    INSERT INTO posts (id, title, slug, abstract, thumbnail_url, categories, is_published, published_at, content,
+                                       {', '.join(DERIVED_COLUMNS)})
+                    VALUES %s
+                """, rows, page_size=MAX_BULK_ITEMS)
+                conn.commit()
+                cur.close()
+                PostsService._invalidate_cache()
+                return results
+        except psycopg2.IntegrityError as _e:
+            raise Exception(f"Error de integridad: {str(_e)}")
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def bulk_update_posts(items):
+        """
+        Actualiza parcialmente varios posts en una sola transacción.
+        Los posts que modifican los mismos campos se agrupan en un único
+        UPDATE ... FROM (VALUES ...) mediante execute_values.
+        Args:
+            items (list): Objetos con "id" y los campos a modificar
+        Returns:
+            list: Un resultado por post, en el mismo orden, con status
+                "updated", "not_found" o "invalid" (con sus errores)
+        Raises:
+            ValueError: si la lista está vacía o es demasiado grande
+        """
+        check_bulk_size(items)
+        results = []
+        groups = {}
+        for index, item in enumerate(items):
+            errors = validate_post_fields(item, partial=True)
+            if not errors:
+                unknown = [key for key in item if key != "id" and key not in POST_COLUMN_MAP]
+                errors = [f"Campo no permitido: '{key}'" for key in unknown]
+                if not isinstance(item.get("id"), str):
+                    errors.append("El campo 'id' es obligatorio")
+                else:
+                    try:
+                        item = dict(item, id=str(uuid.UUID(item["id"])))
+                    except ValueError:
+                        errors.append("El campo 'id' no es un UUID válido")
+                if len(item) < 2:
+                    errors.append("No se proporcionaron campos para actualizar")
+            if errors:
+                results.append({"index": index, "status": "invalid", "errors": errors})
+                continue
+            if "published_at" in item:
+                item = dict(item, published_at=parse_publish_date(item["published_at"]))
+            fields = tuple(sorted(key for key in item if key != "id"))
+            groups.setdefault(fields, []).append(item)
+            results.append({"index": index, "status": "not_found", "id": item["id"]})
+
+        if not groups:
+            return results
+
+        updated_ids = set()
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                # Los slugs de todos los grupos se asignan juntos para que no se repitan entre ellos.
+                renamed = [item for group in groups.values() for item in group if "title" in item]
+                slugs = dict(zip(
+                    (item["id"] for item in renamed),
+                    assign_slugs(cur, [(item["id"], item["title"]) for item in renamed])
+                ))
+                for fields, group in groups.items():
+                    columns = ["id"] + [POST_COLUMN_MAP[field] for field in fields]
+                    casts = ["uuid"] + [POST_FIELD_TYPES[field][1] for field in fields]
+                    set_clauses = [f"{POST_COLUMN_MAP[field]} = v.{POST_COLUMN_MAP[field]}" for field in fields]
+                    if "title" in fields:
+                        columns.append("slug")
+                        casts.append("text")
+                        set_clauses.append("slug = v.slug")
+                    if "content" in fields:
+                        columns.extend(DERIVED_COLUMNS)
+                        casts.extend(DERIVED_COLUMN_TYPES[column] for column in DERIVED_COLUMNS)
+                        set_clauses.extend(f"{column} = v.{column}" for column in DERIVED_COLUMNS)
+                    rows = []
+                    for item in group:
+                        row = [item["id"]] + [item[field] for field in fields]
+                        if "title" in fields:
+                            row.append(slugs[item["id"]])
+                        if "content" in fields:
+                            row.extend(derived_values(item["content"]))
+                        rows.append(row)
+                    template = "(" + ", ".join(f"%s::{cast}" for cast in casts) + ")"
+                    returned = execute_values(cur, f"""
+                        UPDATE posts p SET {', '.join(set_clauses)}
+                        FROM (VALUES %s) AS v ({', '.join(columns)})
+                        WHERE p.id = v.id
+                        RETURNING p.id
+                    """, rows, template=template, page_size=MAX_BULK_ITEMS, fetch=True)
+                    updated_ids.update(str(row[0]) for row in returned)
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al actualizar los posts: {str(e)}")
+
+        for result in results:
+            if result.get("id") in updated_ids:
+                result["status"] = "updated"
+        PostsService._invalidate_cache(*updated_ids)
+        return results
+
+    @staticmethod
+    @instrumented
+    def get_unprocessed_content(after_id=None, limit=500):
+        """
+        Posts cuyos campos derivados faltan o son de otra versión del procesado,
+        por id ascendente (ver app/workers/content_backfill.py).
+        Args:
+            after_id (str): Último id de la página anterior
+            limit (int): Número máximo de posts
+        Returns:
+            list: Registros {"id", "updated_at", "content"}
+        """
+        where = "WHERE p.content_version IS DISTINCT FROM %s"
+        values = [PROCESSING_VERSION]
+        if after_id is not None:
+            where += " AND p.id > %s"
+            values.append(after_id)
+        values.append(limit)
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(f"""
+                    SELECT p.id, p.updated_at, p.content
+                    FROM posts p
+                    {where}
+                    ORDER BY p.id
+                    LIMIT %s;
+                """, values)
+                records = cur.fetchall()
+                cur.close()
+                return records
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
+
+    @staticmethod
+    @instrumented
+    def save_derived_content(items):
+        """
+        Guarda los campos derivados calculados por el backfill. Un post que se
+        ha modificado desde que se leyó (otro updated_at) no se toca: su
+        escritura ya calculó los campos con el contenido nuevo.
+        Args:
+            items (list): Tuplas (id, updated_at, resultado de process_content)
+        Returns:
+            int: Número de posts actualizados
+        """
+        if not items:
+            return 0
+        columns = ["id", "updated_at", *DERIVED_COLUMNS]
+        casts = ["uuid", "timestamptz"] + [DERIVED_COLUMN_TYPES[column] for column in DERIVED_COLUMNS]
+        rows = [[str(post_id), updated_at, *derived_values(None, derived)] for post_id, updated_at, derived in items]
+        template = "(" + ", ".join(f"%s::{cast}" for cast in casts) + ")"
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                returned = execute_values(cur, f"""
+                    UPDATE posts p SET {', '.join(f"{column} = v.{column}" for column in DERIVED_COLUMNS)}
+                    FROM (VALUES %s) AS v ({', '.join(columns)})
+                    WHERE p.id = v.id AND p.updated_at = v.updated_at
+                    RETURNING p.id
+                """, rows, template=template, page_size=MAX_BULK_ITEMS, fetch=True)
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al guardar el contenido procesado: {str(e)}")
+        updated_ids = [str(row[0]) for row in returned]
+        if updated_ids:
+            PostsService._invalidate_cache(*updated_ids)
+        return len(updated_ids)
+
+    @staticmethod
+    @instrumented
+    def publish_due_posts():
+        """
+        Pasa al feed los posts programados cuya fecha de publicación ya ha
+        llegado (función publish_due_posts de migrations/010_posts_feed.sql).
+        Returns:
+            tuple: (posts publicados: int, próxima publicación programada: datetime o None)
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT publish_due_posts();")
+                published = cur.fetchone()[0]
+                cur.execute("SELECT min(publish_at) FROM scheduled_posts;")
+                next_due = cur.fetchone()[0]
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al publicar los posts programados: {str(e)}")
+        if published:
+            PostsService._invalidate_cache()
+        return published, next_due
+
+    @staticmethod
+    @cached(search_cache_key, coalesce=True)
+    @instrumented
+    def search_posts(query: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> dict:
+        """
+        Busca posts usando el vector de búsqueda indexado (migrations/002_posts_search_vector.sql).
+        Args:
+            query (str): Texto a buscar
+            limit (int): Número máximo de resultados
+            offset (int): Resultados a saltar
+        Returns:
+            dict: {"data": resultados con rank y snippet, "next_offset": int o None}
+        Raises:
+            ValueError: si limit u offset no son válidos
+        """
+        validate_search_page(limit, offset)
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(SEARCH_QUERY, (query, limit + 1, offset))
+                records = cur.fetchall()
+                cur.close()
         except psycopg2.Error as e:
             print(f"Database error: {e}")
             raise Exception(f"Error en la base de datos Pichón: {str(e)}")
-        finally:
-            release_connection(conn)
+        return finish_search_page(records, limit, offset)
 
     @staticmethod
+    @instrumented
     def delete_post(post_id):
             """
             Elimina un post por su ID.
@@ -214,16 +1104,16 @@ class PostsService:
             Returns:
                 bool: True si se eliminó, False si no existía
             """
-            conn = get_connection()
             try:
-                cur = conn.cursor()
-                delete_query = "DELETE FROM posts WHERE id = %s"
-                cur.execute(delete_query, (post_id,))
-                deleted = cur.rowcount > 0
-                conn.commit()
-                cur.close()
-                return deleted
+                with db_connection() as conn:
+                    cur = conn.cursor()
+                    delete_query = "DELETE FROM posts WHERE id = %s"
+                    cur.execute(delete_query, (post_id,))
+                    deleted = cur.rowcount > 0
+                    conn.commit()
+                    cur.close()
+                    if deleted:
+                        PostsService._invalidate_cache(post_id)
+                    return deleted
             except psycopg2.Error as e:
                 raise Exception(f"Error al eliminar el post: {str(e)}")
-            finally:
-                release_connection(conn)
@@ -0,0 +1,187 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
+from app.db import db_connection
+from app.instrumentation import instrumented
+from config import Config
+
+SUBSCRIBED = "subscribed"
+
+# Clave de bloqueo para que solo un proceso aplique una reconciliación a la vez.
+RECONCILE_LOCK_ID = 7_018_001
+
+
+def subscriber_hash(email):
+    """Hash MD5 del email en minúsculas: el ID del miembro en la API de Mailchimp."""
+    return hashlib.md5(email.lower().encode()).hexdigest()
+
+
+class SubscriberLedgerService:
+    """
+    Servicio para el registro local de suscriptores (tabla newsletter_subscribers).
+    Guarda el último estado conocido en Mailchimp de cada email para no repetir
+    suscripciones que ya están al día.
+    """
+
+    @staticmethod
+    def is_current(entry, fname, lname):
+        """
+        Indica si `entry` ya refleja una suscripción con estos datos y se
+        sincronizó hace menos de SUBSCRIBER_LEDGER_MAX_AGE_SECONDS.
+        """
+        if entry is None or entry["status"] != SUBSCRIBED:
+            return False
+        if entry["fname"] != (fname or "") or entry["lname"] != (lname or ""):
+            return False
+        max_age = timedelta(seconds=Config.SUBSCRIBER_LEDGER_MAX_AGE_SECONDS)
+        return datetime.now(timezone.utc) - entry["synced_at"] < max_age
+
+    @staticmethod
+    @instrumented
+    def get_many(emails):
+        """
+        Obtiene las entradas del registro de varios emails.
+        Returns:
+            dict: Entrada de cada email encontrado, por email en minúsculas
+        """
+        hashes = {subscriber_hash(email): email.lower() for email in emails}
+        if not hashes:
+            return {}
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute("""
+                    SELECT subscriber_hash, email, status, fname, lname, synced_at
+                    FROM newsletter_subscribers
+                    WHERE subscriber_hash IN %s;
+                """, (tuple(hashes),))
+                records = cur.fetchall()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al leer el registro de suscriptores: {str(e)}")
+        return {hashes[record["subscriber_hash"]]: record for record in records}
+
+    @staticmethod
+    def is_subscribed(email, fname, lname=""):
+        """Indica si el email ya está suscrito en Mailchimp con el mismo nombre."""
+        entry = SubscriberLedgerService.get_many([email]).get(email.lower())
+        return SubscriberLedgerService.is_current(entry, fname, lname)
+
+    @staticmethod
+    @instrumented
+    def record(members, status=SUBSCRIBED, synced_at=None):
+        """
+        Guarda (o actualiza) el estado de varios suscriptores.
+        Args:
+            members (list): Dicts con email, fname y lname
+            status (str): Estado en Mailchimp
+            synced_at (datetime): Momento de la sincronización (por defecto, ahora)
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                SubscriberLedgerService._upsert(cur, members, status, synced_at)
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al guardar el registro de suscriptores: {str(e)}")
+
+    @staticmethod
+    def _upsert(cur, members, status, synced_at):
+        rows = {}
+        for member in members:
+            email = member["email"]
+            rows[subscriber_hash(email)] = (
+                subscriber_hash(email), email, member.get("status") or status,
+                member.get("fname") or "", member.get("lname") or "",
+                synced_at or datetime.now(timezone.utc)
+            )
+        if not rows:
+            return
+        execute_values(cur, """
+            INSERT INTO newsletter_subscribers (subscriber_hash, email, status, fname, lname, synced_at)
+            VALUES %s
+            ON CONFLICT (subscriber_hash) DO UPDATE SET
+                email = EXCLUDED.email,
+                status = EXCLUDED.status,
+                fname = EXCLUDED.fname,
+                lname = EXCLUDED.lname,
+                synced_at = EXCLUDED.synced_at
+            WHERE newsletter_subscribers.synced_at <= EXCLUDED.synced_at;
+        """, list(rows.values()))
+
+    @staticmethod
+    @instrumented
+    def reconcile_due(max_age_seconds):
+        """
+        Indica si toca reconciliar: cada reconciliación reescribe o borra todas
+        las entradas, así que la más antigua dice cuándo terminó la última.
+        Con el registro vacío siempre toca.
+        """
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT COALESCE(min(synced_at) < now() - make_interval(secs => %s), TRUE)
+                    FROM newsletter_subscribers;
+                """, (max_age_seconds,))
+                due = cur.fetchone()[0]
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al leer el registro de suscriptores: {str(e)}")
+        return due
+
+    @staticmethod
+    @instrumented
+    def reconcile(mailchimp_service, page_size=None):
+        """
+        Recorre la lista completa de Mailchimp por páginas y actualiza el
+        registro con el estado real de cada miembro. Las entradas que no
+        aparecen en la lista (miembros borrados) se eliminan.
+        Las páginas se piden a Mailchimp sin ninguna conexión del pool tomada;
+        cada una se guarda después en una transacción corta con un advisory
+        lock de transacción. Si otro proceso tiene el lock, está reconciliando
+        a la vez y esta pasada se abandona.
+        Args:
+            mailchimp_service (MailchimpService): Cliente para la exportación
+            page_size (int): Miembros por página (por defecto SUBSCRIBER_RECONCILE_PAGE_SIZE)
+        Returns:
+            int: Miembros sincronizados, o None si otro proceso ya estaba reconciliando
+        """
+        page_size = page_size or Config.SUBSCRIBER_RECONCILE_PAGE_SIZE
+        started_at = datetime.now(timezone.utc)
+        synced = 0
+        offset = 0
+        while True:
+            members, total = mailchimp_service.export_members(offset, page_size)
+            if not SubscriberLedgerService._apply_page(members, started_at):
+                return None
+            synced += len(members)
+            offset += page_size
+            if not members or offset >= total:
+                break
+        # Lo que no se ha visto en la exportación (y no se ha escrito
+        # mientras tanto) ya no existe en Mailchimp.
+        if not SubscriberLedgerService._apply_page([], started_at, delete_stale=True):
+            return None
+        return synced
+
+    @staticmethod
+    def _apply_page(members, started_at, delete_stale=False):
+        try:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s);", (RECONCILE_LOCK_ID,))
+                if not cur.fetchone()[0]:
+                    conn.rollback()
+                    cur.close()
+                    return False
+                SubscriberLedgerService._upsert(cur, members, SUBSCRIBED, started_at)
+                if delete_stale:
+                    cur.execute("DELETE FROM newsletter_subscribers WHERE synced_at < %s;", (started_at,))
+                conn.commit()
+                cur.close()
+        except psycopg2.Error as e:
+            raise Exception(f"Error al reconciliar el registro de suscriptores: {str(e)}")
+        return True
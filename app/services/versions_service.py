@@ -0,0 +1,32 @@
+import psycopg2
+from app.db import db_connection
+from app.instrumentation import instrumented
+
+VERSION_QUERY = "SELECT version, updated_at FROM content_versions WHERE table_name = %s;"
+
+
+class VersionsService:
+    """Servicio para leer la versión de contenido de cada tabla (ver migrations/001_content_versions.sql)."""
+
+    @staticmethod
+    @instrumented
+    def get_version(table_name):
+        """
+        Obtiene la versión actual de una tabla. No pasa por la caché de
+        lecturas: es una búsqueda por clave primaria, y cacheada por proceso
+        otros workers seguirían respondiendo 304 con el ETag anterior a una
+        escritura durante todo el TTL.
+        Args:
+            table_name (str): 'posts' o 'categories'
+        Returns:
+            tuple: (version: int, updated_at: datetime) o None si la tabla no está registrada
+        """
+        try:
+            with db_connection(readonly=True) as conn:
+                cur = conn.cursor()
+                cur.execute(VERSION_QUERY, (table_name,))
+                row = cur.fetchone()
+                cur.close()
+                return tuple(row) if row else None
+        except psycopg2.Error as e:
+            raise Exception(f"Error en la base de datos: {str(e)}")
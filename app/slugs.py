@@ -0,0 +1,37 @@
+"""
+Slugs para las URLs de posts y categorías.
+
+slugify() normaliza el texto (sin acentos ni signos de puntuación); la
+unicidad de los slugs de posts se resuelve al escribir en posts_service,
+con sufijos -2, -3... sobre el índice único de migrations/009_post_slugs.sql.
+"""
+import re
+import unicodedata
+from config import Config
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(text, separator="-"):
+    """
+    Convierte un título en slug: "¿Qué es el Pichón?" -> "que-es-el-pichon".
+    Se corta en SLUG_MAX_LENGTH caracteres sin partir palabras.
+    Returns:
+        str: Slug; "post" si el texto no tiene letras ni números
+    """
+    ascii_text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    slug = _NON_ALNUM.sub(separator, ascii_text.lower()).strip(separator)
+    if len(slug) > Config.SLUG_MAX_LENGTH:
+        cut = slug[:Config.SLUG_MAX_LENGTH + 1]
+        slug = cut.rsplit(separator, 1)[0] if separator in cut else slug[:Config.SLUG_MAX_LENGTH]
+    return slug or "post"
+
+
+def with_suffix(base, taken):
+    """Primer slug libre entre base, base-2, base-3... que no esté en `taken`."""
+    if base not in taken:
+        return base
+    n = 2
+    while f"{base}-{n}" in taken:
+        n += 1
+    return f"{base}-{n}"
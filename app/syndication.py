@@ -0,0 +1,266 @@
+"""
+RSS 2.0 (/feed.xml), Atom (/atom.xml) y sitemap (/sitemap.xml) como
+instantáneas estáticas.
+
+Cada documento se genera una sola vez por versión de contenido de 'posts'
+(migrations/001_content_versions.sql) y se guarda en FEED_SNAPSHOT_DIR, de
+donde puede servirlo directamente un proxy inverso. Tras cada escritura en
+posts se regeneran en segundo plano; un fichero solo se reescribe si su
+contenido ha cambiado (editar un post antiguo no toca el RSS, por ejemplo).
+Junto a cada fichero, `.<nombre>.version` guarda la versión con la que se
+generó, para que los demás procesos no lo repitan.
+"""
+import os
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from app.services.posts_service import PostsService, change_listeners
+from app.services.versions_service import VersionsService
+from config import Config
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# Campos del índice que usan RSS y Atom.
+FEED_FIELDS = ["id", "title", "slug", "abstract", "excerpt", "published_at", "category_name"]
+
+
+def post_url(slug):
+    return Config.POST_URL_TEMPLATE.format(site_url=Config.SITE_URL.rstrip("/"), slug=slug)
+
+
+def _utc(value):
+    # published_at se guarda en UTC sin zona; updated_at ya la trae.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _iso(value):
+    return _utc(value).isoformat().replace("+00:00", "Z")
+
+
+def _text(parent, tag, text, **attrs):
+    element = ET.SubElement(parent, tag, attrs)
+    element.text = text
+    return element
+
+
+# Atom y el sitemap declaran su espacio de nombres con xmlns en el elemento raíz
+# y usan nombres sin calificar: ET.register_namespace cambiaría el prefijo por
+# defecto para todo el proceso.
+def _tostring(root):
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def _last_published(posts):
+    # La fecha del feed sale de los posts (no de la versión), para que una
+    # escritura que no cambia los últimos posts no cambie el documento.
+    return max((post["published_at"] for post in posts), default=datetime(1970, 1, 1))
+
+
+def render_rss(posts):
+    rss = ET.Element("rss", {"version": "2.0"})
+    channel = ET.SubElement(rss, "channel")
+    _text(channel, "title", Config.FEED_TITLE)
+    _text(channel, "link", Config.SITE_URL)
+    _text(channel, "description", Config.FEED_DESCRIPTION)
+    _text(channel, "language", Config.FEED_LANGUAGE)
+    _text(channel, "lastBuildDate", format_datetime(_utc(_last_published(posts))))
+    for post in posts:
+        item = ET.SubElement(channel, "item")
+        link = post_url(post["slug"])
+        _text(item, "title", post["title"])
+        _text(item, "link", link)
+        _text(item, "guid", link, isPermaLink="true")
+        _text(item, "pubDate", format_datetime(_utc(post["published_at"])))
+        _text(item, "description", post.get("excerpt") or post.get("abstract") or "")
+        for category in post.get("category_name") or []:
+            _text(item, "category", category)
+    return _tostring(rss)
+
+
+def render_atom(posts):
+    feed = ET.Element("feed", {"xmlns": ATOM_NS})
+    _text(feed, "title", Config.FEED_TITLE)
+    _text(feed, "subtitle", Config.FEED_DESCRIPTION)
+    _text(feed, "id", Config.SITE_URL)
+    _text(feed, "updated", _iso(_last_published(posts)))
+    ET.SubElement(feed, "link", {"href": Config.SITE_URL})
+    author = ET.SubElement(feed, "author")
+    _text(author, "name", Config.FEED_TITLE)
+    for post in posts:
+        entry = ET.SubElement(feed, "entry")
+        _text(entry, "title", post["title"])
+        _text(entry, "id", f"urn:uuid:{post['id']}")
+        ET.SubElement(entry, "link", {"href": post_url(post["slug"])})
+        _text(entry, "published", _iso(post["published_at"]))
+        _text(entry, "updated", _iso(post["published_at"]))
+        _text(entry, "summary", post.get("excerpt") or post.get("abstract") or "")
+        for category in post.get("category_name") or []:
+            ET.SubElement(entry, "category", {"term": category})
+    return _tostring(feed)
+
+
+def render_sitemap(entries):
+    urlset = ET.Element("urlset", {"xmlns": SITEMAP_NS})
+    home = ET.SubElement(urlset, "url")
+    _text(home, "loc", Config.SITE_URL)
+    for entry in entries:
+        url = ET.SubElement(urlset, "url")
+        _text(url, "loc", post_url(entry["slug"]))
+        _text(url, "lastmod", _iso(entry["updated_at"] or entry["published_at"]))
+    return _tostring(urlset)
+
+
+def _read_data():
+    """Versión de 'posts' y datos de los feeds, leídos juntos y sin caché."""
+    version, posts, entries = PostsService.get_syndication_data(Config.FEED_ITEMS, FEED_FIELDS)
+    return version, {"posts": posts, "sitemap": entries}
+
+
+# Nombre del fichero -> (mimetype, función que lo genera a partir de _read_data()).
+SNAPSHOTS = {
+    "feed.xml": ("application/rss+xml", lambda data: render_rss(data["posts"])),
+    "atom.xml": ("application/atom+xml", lambda data: render_atom(data["posts"])),
+    "sitemap.xml": ("application/xml", lambda data: render_sitemap(data["sitemap"])),
+}
+
+
+class SnapshotStore:
+    """Instantáneas en disco (y en memoria del proceso) etiquetadas con la versión de 'posts'."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _version_path(self, name):
+        return os.path.join(self.directory, f".{name}.version")
+
+    def _stored_version(self, name):
+        try:
+            with open(self._version_path(name), encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, data):
+        # Escritura atómica: el proxy nunca ve un fichero a medias.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+
+    def _load(self, name, version):
+        """Cuerpo de `name` para `version`, de memoria o del disco; None si no está."""
+        cached = self._memory.get(name)
+        if cached and cached[0] == version:
+            return cached[1]
+        if self._stored_version(name) == version:
+            try:
+                with open(self._path(name), "rb") as f:
+                    body = f.read()
+            except OSError:
+                return None
+            self._memory[name] = (version, body)
+            return body
+        return None
+
+    def _is_current(self, version):
+        return version is not None and all(self._load(name, version[0]) is not None for name in SNAPSHOTS)
+
+    def refresh(self):
+        """
+        Compara las instantáneas con la versión actual de 'posts' y regenera
+        las que no le correspondan. Los datos y la versión con la que se
+        etiquetan salen de la misma transacción. Un fichero cuyo contenido no
+        cambia no se reescribe.
+        Returns:
+            list: Nombres de los ficheros reescritos
+        """
+        written = []
+        with self._lock:
+            if self._is_current(VersionsService.get_version("posts")):
+                return written
+            number, data = _read_data()
+            if number is None:
+                return written
+            os.makedirs(self.directory, exist_ok=True)
+            for name, (_, render) in SNAPSHOTS.items():
+                if self._load(name, number) is not None:
+                    continue
+                body = render(data)
+                previous = self._memory.get(name)
+                if previous is None:
+                    try:
+                        with open(self._path(name), "rb") as f:
+                            previous = (None, f.read())
+                    except OSError:
+                        previous = None
+                if previous is None or previous[1] != body:
+                    self._write(self._path(name), body)
+                    written.append(name)
+                self._write(self._version_path(name), str(number).encode())
+                self._memory[name] = (number, body)
+        return written
+
+    def get(self, name):
+        """
+        Devuelve (cuerpo, mimetype) de la instantánea `name` para la versión
+        actual, regenerándola si hace falta.
+        """
+        mimetype, render = SNAPSHOTS[name]
+        version = VersionsService.get_version("posts")
+        if version is None:
+            return render(_read_data()[1]), mimetype
+        body = self._load(name, version[0])
+        if body is None:
+            self.refresh()
+            # Puede ser de una versión posterior a la leída arriba, nunca anterior.
+            body = self._memory[name][1]
+        return body, mimetype
+
+
+store = SnapshotStore(Config.FEED_SNAPSHOT_DIR)
+
+_pending = {"timer": None}
+_pending_lock = threading.Lock()
+
+
+def _refresh_current():
+    with _pending_lock:
+        _pending["timer"] = None
+    try:
+        store.refresh()
+    except Exception as e:
+        print(f"No se pudieron regenerar los feeds: {e}")
+
+
+def schedule_refresh():
+    """
+    Programa la regeneración de las instantáneas FEED_SNAPSHOT_DELAY_SECONDS
+    después de una escritura; las escrituras seguidas (p. ej. varias
+    peticiones masivas) comparten una sola regeneración.
+    """
+    with _pending_lock:
+        if _pending["timer"] is not None:
+            return
+        timer = threading.Timer(Config.FEED_SNAPSHOT_DELAY_SECONDS, _refresh_current)
+        timer.daemon = True
+        _pending["timer"] = timer
+        timer.start()
+
+
+def init_app(app):
+    """
+    Regenera los feeds tras cada escritura en posts de este proceso. Las de
+    otros procesos se detectan al servirlos (get compara la versión) y las
+    publicaciones programadas las regenera app/workers/feed_scheduler.py.
+    """
+    if schedule_refresh not in change_listeners:
+        change_listeners.append(schedule_refresh)
@@ -0,0 +1,33 @@
+"""
+Workers en segundo plano: newsletter, programador del feed, dispatcher del
+outbox de cambios y backfill de contenido.
+
+Los tres primeros pueden ir embebidos en los workers web; start_once los
+arranca como hilos daemon, uno por proceso (también la escucha de /changes,
+app/change_stream.py).
+"""
+import os
+import threading
+
+_started = {}
+_started_lock = threading.Lock()
+
+
+def start_once(name, target, enabled=True):
+    """
+    Arranca `target(stop_event)` en un hilo daemon llamado `name`. Llamarla otra
+    vez en el mismo proceso no arranca un segundo hilo; tras un fork, sí (los
+    hilos no sobreviven al fork).
+    Returns:
+        threading.Event: Evento para detener el hilo, o None si `enabled` es falso
+    """
+    if not enabled:
+        return None
+    with _started_lock:
+        pid, stop_event = _started.get(name, (None, None))
+        if pid == os.getpid():
+            return stop_event
+        stop_event = threading.Event()
+        threading.Thread(target=target, args=(stop_event,), name=name, daemon=True).start()
+        _started[name] = (os.getpid(), stop_event)
+        return stop_event
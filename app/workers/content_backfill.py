@@ -0,0 +1,59 @@
+"""
+Rellena los campos derivados del HTML (texto plano, palabras, minutos de
+lectura, índice y extracto) de los posts que aún no los tienen o que se
+procesaron con una versión anterior de app/content_processing.py:
+
+    python -m app.workers.content_backfill [--workers N] [--batch-size N]
+
+El análisis del HTML se reparte entre un pool de procesos; la lectura y la
+escritura en PostgreSQL se hacen por lotes desde el proceso principal.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.content_processing import process_content
+from app.services.posts_service import PostsService
+from config import Config
+
+
+def backfill(workers=None, batch_size=None):
+    """
+    Procesa todos los posts pendientes.
+    Returns:
+        tuple: (posts leídos, posts actualizados)
+    """
+    batch_size = batch_size or Config.CONTENT_BACKFILL_BATCH_SIZE
+    workers = workers or Config.CONTENT_BACKFILL_WORKERS or os.cpu_count() or 1
+    # Varios trozos por proceso para repartir bien los posts largos.
+    chunksize = max(1, batch_size // (workers * 4))
+    read = updated = 0
+    after_id = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            records = PostsService.get_unprocessed_content(after_id, batch_size)
+            if not records:
+                break
+            derived = pool.map(process_content, [record["content"] for record in records], chunksize=chunksize)
+            updated += PostsService.save_derived_content([
+                (record["id"], record["updated_at"], result) for record, result in zip(records, derived)
+            ])
+            read += len(records)
+            after_id = str(records[-1]["id"])
+            print(f"{read} posts procesados ({updated} actualizados)")
+    return read, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto CONTENT_BACKFILL_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Posts por lote (por defecto CONTENT_BACKFILL_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    read, updated = backfill(args.workers, args.batch_size)
+    print(f"{read} posts leídos, {updated} actualizados en {time.monotonic() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Publica los posts programados cuando llega su fecha (published_at futura):
+los pasa al feed publicado, invalida las cachés de posts y regenera las
+instantáneas de los feeds (app/syndication.py).
+
+Se puede ejecutar como proceso independiente:
+
+    python -m app.workers.feed_scheduler
+
+o dentro de cada worker web con FEED_SCHEDULER_EMBEDDED=1 (por defecto).
+Varias instancias a la vez no publican un post dos veces.
+"""
+import threading
+from datetime import datetime
+from app import syndication
+from app.services.posts_service import PostsService
+from app.workers import start_once
+from config import Config
+
+
+def run(stop_event=None):
+    """
+    Comprueba los posts programados cada FEED_SCHEDULER_INTERVAL_SECONDS, o
+    antes si el siguiente se publica en menos tiempo, hasta que se active `stop_event`.
+    """
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        wait = Config.FEED_SCHEDULER_INTERVAL_SECONDS
+        try:
+            published, next_due = PostsService.publish_due_posts()
+            if published:
+                print(f"Posts programados publicados: {published}")
+                # Como proceso independiente no hay escrituras que avisen a los workers web.
+                syndication.store.refresh()
+            if next_due is not None:
+                wait = min(wait, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+        except Exception as e:
+            print(f"Feed scheduler error: {e}")
+        stop_event.wait(wait)
+
+
+def start_background_scheduler():
+    """Arranca el programador embebido (FEED_SCHEDULER_EMBEDDED) en este proceso."""
+    return start_once("feed-scheduler", run, Config.FEED_SCHEDULER_EMBEDDED)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,151 @@
+"""
+Worker que vacía la cola newsletter_jobs contra Mailchimp.
+
+Se puede ejecutar como proceso independiente:
+
+    python -m app.workers.newsletter_worker
+
+o dentro de cada worker web con NEWSLETTER_WORKER_EMBEDDED=1 (por defecto).
+Varias instancias a la vez no reservan el mismo trabajo. Si se desactiva el
+worker embebido hay que arrancar el independiente: sin ninguno, las
+suscripciones se aceptan (202) y se quedan en la cola.
+"""
+import sys
+import threading
+import time
+from app.services.mailchimp_service import MailchimpService
+from app.services.newsletter_queue_service import NewsletterQueueService, SUBSCRIBE, INFO_EMAIL
+from app.services.subscriber_ledger_service import SubscriberLedgerService
+from app.workers import start_once
+from config import Config
+
+# Cada cuánto se comprueba si toca reconciliar el registro de suscriptores.
+RECONCILE_CHECK_SECONDS = 600
+
+
+def _process_subscriptions(service, jobs):
+    # Varias peticiones del mismo email se agrupan en un único miembro del batch;
+    # gana la más reciente.
+    by_email = {}
+    for job in jobs:
+        by_email.setdefault(job["payload"]["email"].lower(), []).append(job)
+
+    # Los emails que el registro local ya tiene suscritos con los mismos datos
+    # no se vuelven a enviar a Mailchimp.
+    ledger = SubscriberLedgerService.get_many(by_email)
+    done = []
+    pending = {}
+    for email, group in by_email.items():
+        payload = group[-1]["payload"]
+        if SubscriberLedgerService.is_current(ledger.get(email), payload.get("fname"), payload.get("lname")):
+            done.extend(job["id"] for job in group)
+        else:
+            pending[email] = group
+    if not pending:
+        NewsletterQueueService.mark_done(done)
+        return
+
+    members = [group[-1]["payload"] for group in pending.values()]
+    success, result = service.batch_subscribe(members)
+    if not success:
+        NewsletterQueueService.mark_done(done)
+        for group in pending.values():
+            for job in group:
+                NewsletterQueueService.mark_failed(job, result)
+        return
+
+    subscribed = []
+    for email, group in pending.items():
+        if email in result:
+            for job in group:
+                NewsletterQueueService.mark_failed(job, result[email])
+        else:
+            done.extend(job["id"] for job in group)
+            subscribed.append(group[-1]["payload"])
+    SubscriberLedgerService.record(subscribed)
+    NewsletterQueueService.mark_done(done)
+
+
+def _process_info_emails(service, jobs):
+    for job in jobs:
+        payload = job["payload"]
+        success, message = service.trigger_info_email(
+            payload["email"], payload["fname"], payload["journey_id"], payload["step_id"]
+        )
+        if success:
+            NewsletterQueueService.mark_done([job["id"]])
+        else:
+            NewsletterQueueService.mark_failed(job, message)
+
+
+def process_batch():
+    """
+    Reserva y procesa un lote de trabajos.
+    Returns:
+        int: Número de trabajos procesados
+    """
+    jobs = NewsletterQueueService.claim_batch(Config.NEWSLETTER_BATCH_SIZE)
+    if not jobs:
+        return 0
+
+    service = MailchimpService()
+    subscriptions = [job for job in jobs if job["kind"] == SUBSCRIBE]
+    info_emails = [job for job in jobs if job["kind"] == INFO_EMAIL]
+    unknown = [job for job in jobs if job["kind"] not in (SUBSCRIBE, INFO_EMAIL)]
+
+    if subscriptions:
+        _process_subscriptions(service, subscriptions)
+    if info_emails:
+        _process_info_emails(service, info_emails)
+    for job in unknown:
+        NewsletterQueueService.mark_failed(job, f"Tipo de trabajo desconocido: {job['kind']}")
+    return len(jobs)
+
+
+def reconcile_subscribers():
+    """
+    Sincroniza el registro local de suscriptores con la lista de Mailchimp.
+    Returns:
+        int: Miembros sincronizados, o None si otro proceso ya lo estaba haciendo
+    """
+    return SubscriberLedgerService.reconcile(MailchimpService())
+
+
+def run(stop_event=None):
+    """
+    Procesa la cola hasta que se active `stop_event`. Si
+    SUBSCRIBER_RECONCILE_SECONDS es mayor que 0, reconcilia además el registro
+    de suscriptores cuando la última reconciliación (según el propio registro,
+    así que no depende de cuánto lleve vivo el proceso) es más antigua.
+    """
+    stop_event = stop_event or threading.Event()
+    last_check = None
+    while not stop_event.is_set():
+        try:
+            processed = process_batch()
+        except Exception as e:
+            print(f"Newsletter worker error: {e}")
+            processed = 0
+        interval = Config.SUBSCRIBER_RECONCILE_SECONDS
+        if interval > 0 and (last_check is None or time.monotonic() - last_check >= RECONCILE_CHECK_SECONDS):
+            last_check = time.monotonic()
+            try:
+                if SubscriberLedgerService.reconcile_due(interval):
+                    reconcile_subscribers()
+            except Exception as e:
+                print(f"Subscriber reconciliation error: {e}")
+        if not processed:
+            stop_event.wait(Config.NEWSLETTER_POLL_SECONDS)
+
+
+def start_background_worker():
+    """Arranca el worker embebido (NEWSLETTER_WORKER_EMBEDDED) en este proceso."""
+    return start_once("newsletter-worker", run, Config.NEWSLETTER_WORKER_EMBEDDED)
+
+
+if __name__ == "__main__":
+    # python -m app.workers.newsletter_worker reconcile  -> una reconciliación y termina
+    if sys.argv[1:] == ["reconcile"]:
+        print(f"Suscriptores sincronizados: {reconcile_subscribers()}")
+    else:
+        run()
@@ -0,0 +1,101 @@
+"""
+Despacha el outbox de cambios (migrations/011_change_outbox.sql): numera los
+eventos confirmados y avisa por NOTIFY a los procesos que sirven /changes.
+
+Se puede ejecutar como proceso independiente:
+
+    python -m app.workers.outbox_dispatcher
+
+o dentro de los workers web con OUTBOX_DISPATCHER_EMBEDDED=1 (por defecto).
+De todas las instancias solo despacha una: la que consigue el bloqueo de
+sesión DISPATCHER_LEADER_LOCK_ID en su conexión de escucha. Las demás no
+mantienen ninguna conexión abierta y vuelven a intentarlo cada
+LEADER_RETRY_SECONDS, así que si la activa muere otra la sustituye.
+Los triggers la despiertan con NOTIFY al confirmar cada escritura; además
+revisa la tabla cada OUTBOX_DISPATCH_INTERVAL_SECONDS por si se perdió un aviso.
+"""
+import threading
+import time
+from app.db import listen_connection, wait_for_notifies
+from app.services.changes_service import ChangesService, OUTBOX_CHANNEL, DISPATCHER_LEADER_LOCK_ID
+from app.workers import start_once
+from config import Config
+
+# Espera antes de reintentar cuando otra instancia está despachando.
+BUSY_RETRY_SECONDS = 0.2
+PURGE_INTERVAL_SECONDS = 3600
+# Cada cuánto vuelve a intentar ser la instancia activa una que no lo es.
+LEADER_RETRY_SECONDS = 30
+
+
+def _lead_connection():
+    """
+    Conexión de escucha si esta instancia consigue ser la activa; si no, None.
+    El bloqueo dura lo que la sesión: se libera al cerrar la conexión o al
+    morir el proceso.
+    """
+    conn = listen_connection(OUTBOX_CHANNEL)
+    cur = conn.cursor()
+    cur.execute("SELECT pg_try_advisory_lock(%s);", (DISPATCHER_LEADER_LOCK_ID,))
+    leader = cur.fetchone()[0]
+    cur.close()
+    if not leader:
+        conn.close()
+        return None
+    return conn
+
+
+def dispatch_all():
+    """
+    Despacha por lotes hasta vaciar los pendientes.
+    Returns:
+        int: Eventos despachados, o None si otra instancia tenía el bloqueo
+    """
+    total = 0
+    while True:
+        dispatched = ChangesService.dispatch_pending()
+        if dispatched is None:
+            return None if total == 0 else total
+        total += dispatched
+        if dispatched < Config.OUTBOX_DISPATCH_BATCH_SIZE:
+            return total
+
+
+def run(stop_event=None):
+    """Despacha el outbox hasta que se active `stop_event`."""
+    stop_event = stop_event or threading.Event()
+    conn = None
+    last_purge = 0.0
+    while not stop_event.is_set():
+        wait = Config.OUTBOX_DISPATCH_INTERVAL_SECONDS
+        try:
+            if conn is None or conn.closed:
+                # Se escucha antes de despachar: un aviso que llegue durante
+                # el despacho no se pierde.
+                conn = _lead_connection()
+                if conn is None:
+                    stop_event.wait(LEADER_RETRY_SECONDS)
+                    continue
+            if dispatch_all() is None:
+                wait = BUSY_RETRY_SECONDS
+            if time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                ChangesService.purge_dispatched()
+                last_purge = time.monotonic()
+            wait_for_notifies(conn, wait)
+        except Exception as e:
+            print(f"Outbox dispatcher error: {e}")
+            if conn is not None:
+                conn.close()
+                conn = None
+            stop_event.wait(wait)
+    if conn is not None:
+        conn.close()
+
+
+def start_background_dispatcher():
+    """Arranca el dispatcher embebido (OUTBOX_DISPATCHER_EMBEDDED) en este proceso."""
+    return start_once("outbox-dispatcher", run, Config.OUTBOX_DISPATCHER_EMBEDDED)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,47 @@
+"""
+Compara dos ficheros de resultados de bench/run.py.
+
+    python -m bench.compare bench/results/abc123-....json bench/results/def456-....json
+"""
+import argparse
+import json
+
+
+def _key(result):
+    return result["scenario"], result["concurrency"]
+
+
+def _delta(old, new):
+    if old is None or new is None or not old:
+        return "    n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    old_results = {_key(r): r for r in baseline["results"]}
+    print(f"{baseline['revision']} -> {candidate['revision']}")
+    print(f"{'escenario':22} {'c':>4} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'db/req':>8}")
+    for new in candidate["results"]:
+        old = old_results.get(_key(new))
+        if old is None:
+            continue
+        print(f"{new['scenario']:22} {new['concurrency']:>4} "
+              f"{_delta(old['throughput_rps'], new['throughput_rps']):>9} "
+              f"{_delta(old['p50_ms'], new['p50_ms']):>8} "
+              f"{_delta(old['p95_ms'], new['p95_ms']):>8} "
+              f"{_delta(old['p99_ms'], new['p99_ms']):>8} "
+              f"{_delta(old.get('db_queries_per_request'), new.get('db_queries_per_request')):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Servidor local que imita los endpoints de Mailchimp que usa la app.
+
+    python -m bench.mailchimp_stub --port 8089 --latency-ms 80
+
+Arranca la app con MAILCHIMP_BASE_URL=http://127.0.0.1:8089/3.0 para usarlo.
+GET /_stats devuelve el número de peticiones recibidas por endpoint.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROUTES = [
+    ("GET", re.compile(r"^/3\.0/ping$"), "ping"),
+    ("GET", re.compile(r"^/3\.0/lists/[^/]+/members$"), "list_members"),
+    ("PUT", re.compile(r"^/3\.0/lists/[^/]+/members/[^/]+$"), "set_list_member"),
+    ("POST", re.compile(r"^/3\.0/lists/[^/]+$"), "batch_list_members"),
+    ("POST", re.compile(r"^/3\.0/customer-journeys/journeys/[^/]+/steps/[^/]+/actions/trigger$"), "journey_trigger"),
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    error_rate = 0.0
+    calls = Counter()
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _handle(self, method):
+        path = self.path.split("?", 1)[0]
+        if method == "GET" and path == "/_stats":
+            with self.lock:
+                return self._send(200, dict(self.calls))
+
+        for route_method, pattern, name in ROUTES:
+            if route_method == method and pattern.match(path):
+                break
+        else:
+            return self._send(404, {"title": "Resource Not Found", "status": 404})
+
+        body = self._body()
+        with self.lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            return self._send(503, {"title": "Service Unavailable", "status": 503})
+
+        if name == "ping":
+            return self._send(200, {"health_status": "Everything's Chimpy!"})
+        if name == "list_members":
+            return self._send(200, {"members": [], "total_items": 0})
+        if name == "set_list_member":
+            return self._send(200, {"email_address": body.get("email_address"), "status": "subscribed"})
+        if name == "batch_list_members":
+            members = body.get("members", [])
+            return self._send(200, {
+                "new_members": members,
+                "updated_members": [],
+                "errors": [],
+                "total_created": len(members),
+                "total_updated": 0,
+                "error_count": 0
+            })
+        return self._send(204)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def serve(host="127.0.0.1", port=8089, latency_ms=0, error_rate=0.0):
+    StubHandler.latency = latency_ms / 1000
+    StubHandler.error_rate = error_rate
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency_ms, args.error_rate)
+    print(f"Mailchimp stub en http://{args.host}:{args.port}/3.0")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Lanza carga contra una instancia de la app y mide latencia, throughput y
+número de consultas a la base de datos por escenario y nivel de concurrencia.
+
+    python -m bench.run --base-url http://127.0.0.1:5000 --dsn "$POSTGRES_URI_LOCAL" \\
+        --concurrency 1,8,32 --duration 15
+
+Los resultados se guardan en bench/results/<commit>-<fecha>.json; para comparar
+dos ejecuciones usa `python -m bench.compare`.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+import psycopg2
+import requests
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SEARCH_TERMS = ["cultura", "música ciudad", "memoria", "verano festival", "entrevista", "cine barrio"]
+
+
+def build_scenarios(base_url):
+    """Devuelve {nombre: (método, función que genera (ruta, json))} usando datos reales de la app."""
+    index = requests.get(f"{base_url}/posts", params={"limit": 100}, timeout=30).json()
+    ids = [str(post["id"]) for post in index.get("data", [])] or ["00000000-0000-0000-0000-000000000000"]
+    cursor = index.get("next_cursor")
+
+    def email():
+        return f"bench-{random.getrandbits(40)}@example.com"
+
+    return {
+        "posts_index": ("GET", lambda: ("/posts", None)),
+        "posts_index_fields": ("GET", lambda: ("/posts?fields=id,title,slug&limit=50", None)),
+        "posts_index_page2": ("GET", lambda: (f"/posts?cursor={cursor}" if cursor else "/posts", None)),
+        "post_detail": ("GET", lambda: (f"/posts/{random.choice(ids)}", None)),
+        "post_summary": ("GET", lambda: (f"/posts/{random.choice(ids)}?content=0", None)),
+        "posts_batch": ("GET", lambda: ("/posts/batch?ids=" + ",".join(random.sample(ids, min(20, len(ids)))), None)),
+        "posts_search": ("GET", lambda: (f"/posts/search?q={random.choice(SEARCH_TERMS)}", None)),
+        "categories": ("GET", lambda: ("/categories", None)),
+        "subscribe_newsletter": ("POST", lambda: ("/subscribe_newsletter", {"email": email(), "fname": "Bench"})),
+        "send_info_email": ("POST", lambda: ("/send_info_email", {
+            "email": email(), "fname": "Bench", "journey_id": 1, "step_id": 1
+        })),
+        "health": ("GET", lambda: ("/health", None)),
+    }
+
+
+def query_counter(dsn):
+    """
+    Devuelve una función que lee el contador de consultas de PostgreSQL:
+    pg_stat_statements si está instalado, o el número de transacciones si no.
+    """
+    if not dsn:
+        return None, None
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT coalesce(sum(calls), 0) FROM pg_stat_statements;")
+        sql, source = "SELECT coalesce(sum(calls), 0) FROM pg_stat_statements;", "pg_stat_statements.calls"
+    except psycopg2.Error:
+        sql = "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database();"
+        source = "pg_stat_database.transactions"
+
+    def read():
+        # pg_stat_database se actualiza con retraso; se fuerza una lectura fresca.
+        cur.execute("SELECT pg_stat_clear_snapshot();")
+        cur.execute(sql)
+        return int(cur.fetchone()[0])
+    return read, source
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_scenario(base_url, method, make_request, concurrency, duration):
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        session = requests.Session()
+        local_latencies = []
+        local_statuses = Counter()
+        while time.monotonic() < deadline:
+            path, body = make_request()
+            started = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=30)
+                response.content
+                local_statuses[response.status_code] += 1
+            except requests.RequestException:
+                local_statuses["error"] += 1
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0,
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else None,
+        "p95_ms": percentile(latencies, 95) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 99) * 1000 if latencies else None,
+        "max_ms": latencies[-1] * 1000 if latencies else None,
+        "statuses": {str(k): v for k, v in statuses.items()},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--dsn", default=os.getenv("POSTGRES_URI_LOCAL"), help="Para contar consultas (opcional)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Niveles de concurrencia separados por comas")
+    parser.add_argument("--duration", type=float, default=10, help="Segundos por escenario y concurrencia")
+    parser.add_argument("--scenarios", help="Escenarios a ejecutar separados por comas (por defecto todos)")
+    parser.add_argument("--label", default="", help="Etiqueta libre guardada con los resultados")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.base_url)
+    if args.scenarios:
+        wanted = args.scenarios.split(",")
+        scenarios = {name: scenarios[name] for name in wanted}
+    levels = [int(c) for c in args.concurrency.split(",")]
+    read_queries, query_source = query_counter(args.dsn)
+
+    results = []
+    for name, (method, make_request) in scenarios.items():
+        for concurrency in levels:
+            before = read_queries() if read_queries else None
+            result = run_scenario(args.base_url, method, make_request, concurrency, args.duration)
+            if read_queries:
+                queries = read_queries() - before
+                result["db_queries"] = queries
+                result["db_queries_per_request"] = queries / result["requests"] if result["requests"] else None
+            result.update({"scenario": name, "concurrency": concurrency})
+            results.append(result)
+            print(f"{name:22} c={concurrency:<4} {result['throughput_rps']:9.1f} req/s  "
+                  f"p50={result['p50_ms'] or 0:8.2f}ms  p95={result['p95_ms'] or 0:8.2f}ms  "
+                  f"p99={result['p99_ms'] or 0:8.2f}ms  db={result.get('db_queries', '-')}")
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "label": args.label,
+        "timestamp": datetime.utcnow().isoformat(),
+        "base_url": args.base_url,
+        "duration": args.duration,
+        "db_query_source": query_source,
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{revision}-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en {path}")
+
+
+if __name__ == "__main__":
+    main()
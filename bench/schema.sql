@@ -0,0 +1,23 @@
+-- Esquema base mínimo para una base de datos local de benchmark.
+-- Las migraciones de migrations/ se aplican después con bench/seed.py.
+
+CREATE TABLE IF NOT EXISTS categories (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    slug TEXT NOT NULL UNIQUE,
+    "order" INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS posts (
+    id UUID PRIMARY KEY,
+    title TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    abstract TEXT,
+    thumbnail_url TEXT,
+    categories TEXT[] NOT NULL DEFAULT '{}',
+    is_published BOOLEAN NOT NULL DEFAULT FALSE,
+    published_at TIMESTAMP NOT NULL DEFAULT now(),
+    content TEXT
+);
+
+CREATE INDEX IF NOT EXISTS posts_published_at_id_idx ON posts (published_at DESC, id DESC);
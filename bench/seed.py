@@ -0,0 +1,125 @@
+"""
+Crea y rellena una base de datos local con un archivo sintético de posts.
+
+    python -m bench.seed --dsn postgresql://localhost/pichon_bench --posts 50000
+
+Aplica bench/schema.sql y todas las migraciones de migrations/ antes de insertar.
+Los campos derivados del HTML (app/content_processing.py) se calculan al insertar,
+como en create_post.
+"""
+import argparse
+import glob
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+import psycopg2
+from psycopg2.extras import execute_values
+from app.content_processing import DERIVED_COLUMNS
+from app.services.posts_service import derived_values
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = (
+    "pichón revista cultura ciudad música arte libro cine barrio historia memoria "
+    "viaje palabra noche verano mercado calle plaza taller festival poesía mar "
+    "montaña cocina receta entrevista crónica ensayo fotografía archivo "
+    "editorial lector voz relato futuro pasado tiempo luz sombra camino casa"
+).split()
+
+CATEGORIES = ["Cultura", "Música", "Cine", "Libros", "Ciudad", "Entrevistas", "Opinión", "Viajes"]
+
+
+def sentence(rng, n_min=6, n_max=18):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(n_min, n_max))]
+    return " ".join(words).capitalize() + "."
+
+
+def html_body(rng, paragraphs):
+    """Cuerpo HTML con estructura parecida a la de un artículo real."""
+    parts = []
+    for i in range(paragraphs):
+        if i and i % 4 == 0:
+            parts.append(f"<h2>{sentence(rng, 3, 6)[:-1]}</h2>")
+        text = " ".join(sentence(rng) for _ in range(rng.randint(3, 7)))
+        if rng.random() < 0.3:
+            text += f' <a href="https://pichon.example/{rng.randint(1, 9999)}">{rng.choice(WORDS)}</a>'
+        parts.append(f"<p>{text}</p>")
+        if rng.random() < 0.1:
+            parts.append(f'<figure><img src="https://img.example/{uuid.uuid4()}.jpg" alt="{rng.choice(WORDS)}"></figure>')
+    return "\n".join(parts)
+
+
+def apply_schema(conn):
+    cur = conn.cursor()
+    files = [os.path.join(ROOT, "bench", "schema.sql")]
+    files += sorted(glob.glob(os.path.join(ROOT, "migrations", "*.sql")))
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            cur.execute(f.read())
+    conn.commit()
+    cur.close()
+
+
+def seed(conn, posts, batch_size, paragraphs, seed_value):
+    rng = random.Random(seed_value)
+    cur = conn.cursor()
+    cur.execute("TRUNCATE posts, categories RESTART IDENTITY CASCADE;")
+    execute_values(
+        cur,
+        'INSERT INTO categories (name, slug, "order") VALUES %s',
+        [(name, name.lower(), i) for i, name in enumerate(CATEGORIES)]
+    )
+
+    start = datetime.utcnow() - timedelta(days=posts // 5 + 1)
+    inserted = 0
+    while inserted < posts:
+        rows = []
+        for i in range(inserted, min(inserted + batch_size, posts)):
+            title = sentence(rng, 3, 9)[:-1]
+            content = html_body(rng, rng.randint(paragraphs // 2, paragraphs * 2))
+            rows.append((
+                str(uuid.UUID(int=rng.getrandbits(128))),
+                title,
+                f"{title.lower().replace(' ', '-')}-{i}",
+                sentence(rng, 15, 40),
+                f"https://img.example/thumb-{i}.jpg",
+                rng.sample(CATEGORIES, rng.randint(1, 3)),
+                rng.random() < 0.9,
+                start + timedelta(minutes=i * 288 + rng.randint(0, 200)),
+                content,
+                *derived_values(content),
+            ))
+        execute_values(
+            cur,
+            "INSERT INTO posts (id, title, slug, abstract, thumbnail_url, categories, "
+            f"is_published, published_at, content, {', '.join(DERIVED_COLUMNS)}) VALUES %s",
+            rows
+        )
+        conn.commit()
+        inserted += len(rows)
+        print(f"{inserted}/{posts} posts")
+    cur.execute("ANALYZE posts; ANALYZE categories;")
+    conn.commit()
+    cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("POSTGRES_URI_LOCAL"), help="DSN de la base de datos de benchmark")
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--paragraphs", type=int, default=12, help="Párrafos medios por post")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        apply_schema(conn)
+        seed(conn, args.posts, args.batch_size, args.paragraphs, args.seed)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Mide el arranque en frío de un worker: importar la app, create_app() y la
+primera (y segunda) petición, cada ejecución en un proceso Python nuevo.
+
+    python -m bench.startup --runs 10 --path /metrics/cache
+    python -m bench.startup --warm-up --path /posts   # con warm_up() antes de la primera petición
+
+Con --top N muestra además los N paquetes más lentos de importar (python -X importtime).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app, warm_up
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+if {warm_up!r}:
+    warm_up()
+warmed = time.perf_counter()
+client = app.test_client()
+client.get({path!r})
+first = time.perf_counter()
+client.get({path!r})
+second = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "warm_up_ms": (warmed - created) * 1000,
+    "first_request_ms": (first - warmed) * 1000,
+    "second_request_ms": (second - first) * 1000,
+    "mailchimp_imported": "mailchimp_marketing" in sys.modules,
+}}))
+"""
+
+METRICS = ["import_ms", "create_app_ms", "warm_up_ms", "first_request_ms", "second_request_ms"]
+
+
+def run_once(path, warm_up):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(path=path, warm_up=warm_up)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top):
+    """Paquetes que más tardan en importarse al cargar la app (suma del tiempo propio de sus módulos)."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import create_app; create_app()"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(own) / 1000
+    return sorted(((ms, name) for name, ms in totals.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/metrics/cache", help="Ruta de la primera petición")
+    parser.add_argument("--warm-up", action="store_true", help="Llama a warm_up() antes de la primera petición")
+    parser.add_argument("--top", type=int, default=10, help="Paquetes más lentos a mostrar (0 para ninguno)")
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen en JSON")
+    args = parser.parse_args()
+
+    results = [run_once(args.path, args.warm_up) for _ in range(args.runs)]
+    summary = {
+        metric: {
+            "median": statistics.median(r[metric] for r in results),
+            "max": max(r[metric] for r in results),
+        }
+        for metric in METRICS
+    }
+    summary["mailchimp_imported"] = any(r["mailchimp_imported"] for r in results)
+    if args.top:
+        summary["slowest_imports"] = [{"module": name, "ms": ms} for ms, name in slowest_imports(args.top)]
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{args.runs} arranques, primera petición a {args.path}")
+    for metric in METRICS:
+        print(f"{metric:20} p50 {summary[metric]['median']:8.1f} ms   max {summary[metric]['max']:8.1f} ms")
+    print(f"mailchimp_marketing importado: {'sí' if summary['mailchimp_imported'] else 'no'}")
+    for row in summary.get("slowest_imports", []):
+        print(f"  {row['ms']:8.1f} ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# python-dotenv solo se importa si hay un .env (en producción las variables ya vienen del entorno).
+if os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")) or os.path.exists(".env"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 class Config:
     # Environment
@@ -11,8 +13,130 @@ class Config:
     POSTGRES_URI_LOCAL = os.getenv("POSTGRES_URI_LOCAL")
     POSTGRES_URI_PROD = os.getenv("POSTGRES_URI_PROD")
     POSTGRES_URI = POSTGRES_URI_PROD if ENVIRONMENT == "production" else POSTGRES_URI_LOCAL
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    DB_POOL_VALIDATE_IDLE_SECONDS = float(os.getenv("DB_POOL_VALIDATE_IDLE_SECONDS", "30"))
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+    # Abre el pool en el hook post_fork de gunicorn en lugar de en la primera petición.
+    DB_POOL_PREWARM = os.getenv("DB_POOL_PREWARM", "1") == "1"
+    # Réplicas de lectura (URIs separadas por comas). Vacío: todo va al primario.
+    POSTGRES_REPLICA_URIS = [uri.strip() for uri in os.getenv("POSTGRES_REPLICA_URIS", "").split(",") if uri.strip()]
+    DB_REPLICA_POOL_MAX = int(os.getenv("DB_REPLICA_POOL_MAX", "10"))
+    # Tras una escritura, las lecturas del proceso van al primario durante este tiempo.
+    DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+    # Tiempo que se aparta una réplica que ha fallado antes de volver a probarla.
+    DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+    # Espera máxima por una conexión libre de una réplica; si está llena se prueba
+    # la siguiente (o el primario) sin apartarla.
+    DB_REPLICA_CHECKOUT_TIMEOUT = float(os.getenv("DB_REPLICA_CHECKOUT_TIMEOUT", "0.1"))
+
+    # Gunicorn Configuration (ver gunicorn.conf.py)
+    PRELOAD_APP = os.getenv("PRELOAD_APP", "0") == "1"
+    # Hilos por worker (gthread); no debe superar DB_POOL_MAX.
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "8"))
+
+    # Content Processing (ver app/content_processing.py)
+    CONTENT_WORDS_PER_MINUTE = int(os.getenv("CONTENT_WORDS_PER_MINUTE", "200"))
+    CONTENT_EXCERPT_CHARS = int(os.getenv("CONTENT_EXCERPT_CHARS", "280"))
+    CONTENT_BACKFILL_BATCH_SIZE = int(os.getenv("CONTENT_BACKFILL_BATCH_SIZE", "500"))
+    # Procesos del backfill; vacío usa todos los núcleos.
+    CONTENT_BACKFILL_WORKERS = int(os.getenv("CONTENT_BACKFILL_WORKERS", "0")) or None
+
+    # Slugs (ver app/slugs.py)
+    SLUG_MAX_LENGTH = int(os.getenv("SLUG_MAX_LENGTH", "80"))
+
+    # JSON Configuration
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "fast")
+    JSON_STREAM_CHUNK_ROWS = int(os.getenv("JSON_STREAM_CHUNK_ROWS", "25"))
+    EXPORT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", "500"))
 
     # Mailchimp Configuration
     MAILCHIMP_API_KEY = os.getenv('MAILCHIMP_API_KEY')
     MAILCHIMP_DC = os.getenv('MAILCHIMP_DC')
     MAILCHIMP_LIST_ID = os.getenv('MAILCHIMP_LIST_ID')
+    MAILCHIMP_BASE_URL = os.getenv('MAILCHIMP_BASE_URL')
+    MAILCHIMP_CONNECT_TIMEOUT = float(os.getenv('MAILCHIMP_CONNECT_TIMEOUT', '3.05'))
+    MAILCHIMP_READ_TIMEOUT = float(os.getenv('MAILCHIMP_READ_TIMEOUT', '10'))
+    MAILCHIMP_POOL_SIZE = int(os.getenv('MAILCHIMP_POOL_SIZE', '10'))
+    MAILCHIMP_BREAKER_THRESHOLD = int(os.getenv('MAILCHIMP_BREAKER_THRESHOLD', '5'))
+    MAILCHIMP_BREAKER_RESET_SECONDS = float(os.getenv('MAILCHIMP_BREAKER_RESET_SECONDS', '30'))
+
+    # Feeds y sitemap (ver app/syndication.py)
+    SITE_URL = os.getenv("SITE_URL", "http://localhost:3000")
+    POST_URL_TEMPLATE = os.getenv("POST_URL_TEMPLATE", "{site_url}/posts/{slug}")
+    FEED_TITLE = os.getenv("FEED_TITLE", "Pichón")
+    FEED_DESCRIPTION = os.getenv("FEED_DESCRIPTION", "Revista Pichón")
+    FEED_LANGUAGE = os.getenv("FEED_LANGUAGE", "es")
+    FEED_ITEMS = int(os.getenv("FEED_ITEMS", "50"))
+    # Directorio de las instantáneas; el proxy inverso puede servirlas directamente.
+    FEED_SNAPSHOT_DIR = os.getenv(
+        "FEED_SNAPSHOT_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "feeds")
+    )
+    # Espera tras una escritura antes de regenerar, para agrupar escrituras seguidas.
+    FEED_SNAPSHOT_DELAY_SECONDS = float(os.getenv("FEED_SNAPSHOT_DELAY_SECONDS", "2"))
+
+    # Change Events Configuration (ver app/workers/outbox_dispatcher.py)
+    OUTBOX_DISPATCHER_EMBEDDED = os.getenv("OUTBOX_DISPATCHER_EMBEDDED", "1") == "1"
+    OUTBOX_DISPATCH_BATCH_SIZE = int(os.getenv("OUTBOX_DISPATCH_BATCH_SIZE", "500"))
+    OUTBOX_DISPATCH_INTERVAL_SECONDS = float(os.getenv("OUTBOX_DISPATCH_INTERVAL_SECONDS", "5"))
+    OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+    CHANGES_PAGE_SIZE = int(os.getenv("CHANGES_PAGE_SIZE", "100"))
+    CHANGES_MAX_PAGE_SIZE = int(os.getenv("CHANGES_MAX_PAGE_SIZE", "1000"))
+    # Espera máxima de /changes cuando no hay eventos nuevos. Cada petición en espera
+    # ocupa un hilo de gunicorn (ver GUNICORN_THREADS en gunicorn.conf.py).
+    CHANGES_LONGPOLL_SECONDS = float(os.getenv("CHANGES_LONGPOLL_SECONDS", "25"))
+    # Peticiones de /changes que pueden esperar a la vez en cada proceso; debe quedar
+    # por debajo de GUNICORN_THREADS para que siempre haya hilos para el resto de rutas.
+    CHANGES_MAX_WAITERS = int(os.getenv("CHANGES_MAX_WAITERS", "4"))
+    CHANGES_LISTENER_EMBEDDED = os.getenv("CHANGES_LISTENER_EMBEDDED", "1") == "1"
+
+    # Feed Scheduler Configuration (ver app/workers/feed_scheduler.py)
+    FEED_SCHEDULER_EMBEDDED = os.getenv("FEED_SCHEDULER_EMBEDDED", "1") == "1"
+    FEED_SCHEDULER_INTERVAL_SECONDS = float(os.getenv("FEED_SCHEDULER_INTERVAL_SECONDS", "30"))
+
+    # Newsletter Queue Configuration
+    # Varios workers embebidos pueden vaciar la cola a la vez (FOR UPDATE SKIP LOCKED).
+    NEWSLETTER_WORKER_EMBEDDED = os.getenv("NEWSLETTER_WORKER_EMBEDDED", "1") == "1"
+    NEWSLETTER_BATCH_SIZE = int(os.getenv("NEWSLETTER_BATCH_SIZE", "100"))
+    NEWSLETTER_POLL_SECONDS = float(os.getenv("NEWSLETTER_POLL_SECONDS", "5"))
+    NEWSLETTER_MAX_ATTEMPTS = int(os.getenv("NEWSLETTER_MAX_ATTEMPTS", "5"))
+    NEWSLETTER_RETRY_BASE_SECONDS = int(os.getenv("NEWSLETTER_RETRY_BASE_SECONDS", "30"))
+    NEWSLETTER_LOCK_TIMEOUT = int(os.getenv("NEWSLETTER_LOCK_TIMEOUT", "300"))
+    SUBSCRIBER_LEDGER_MAX_AGE_SECONDS = int(os.getenv("SUBSCRIBER_LEDGER_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+    SUBSCRIBER_RECONCILE_SECONDS = int(os.getenv("SUBSCRIBER_RECONCILE_SECONDS", "86400"))
+    SUBSCRIBER_RECONCILE_PAGE_SIZE = int(os.getenv("SUBSCRIBER_RECONCILE_PAGE_SIZE", "1000"))
+
+    # Read Cache Configuration
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+    # HTTP Cache Configuration
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+    # Rate Limit Configuration ("peticiones/segundos" por IP y endpoint)
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_NEWSLETTER = os.getenv("RATE_LIMIT_NEWSLETTER", "5/60")
+    RATE_LIMIT_SEARCH = os.getenv("RATE_LIMIT_SEARCH", "30/10")
+    RATE_LIMIT_CHANGES = os.getenv("RATE_LIMIT_CHANGES", "30/60")
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+    RATE_LIMIT_PRUNE_SECONDS = int(os.getenv("RATE_LIMIT_PRUNE_SECONDS", "600"))
+    # Número de proxies delante de gunicorn/uvicorn que añaden X-Forwarded-For (en
+    # Render, 1). Obligatorio detrás de un proxy: con 0 todos los clientes comparten
+    # la IP del proxy en el límite por IP. No debe superar los proxies reales o un
+    # cliente podría elegir su IP en X-Forwarded-For.
+    PROXY_COUNT = int(os.getenv("PROXY_COUNT", "0"))
+    # Token (Authorization: Bearer) de las lecturas que incluyen borradores:
+    # published=0 en /posts y /categories/<slug>/posts, y /posts/export completo.
+    # Sin token esas lecturas no están disponibles.
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+    # Compression Configuration
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+    COMPRESS_CACHE_MAX_ENTRIES = int(os.getenv("COMPRESS_CACHE_MAX_ENTRIES", "512"))
+    COMPRESS_CACHE_TTL_SECONDS = float(os.getenv("COMPRESS_CACHE_TTL_SECONDS", "600"))
@@ -0,0 +1,28 @@
+"""
+Configuración de gunicorn (se carga sola desde el directorio del proyecto):
+
+    gunicorn wsgi:app
+
+Con PRELOAD_APP=1 la app se importa y se crea una vez en el proceso maestro y
+los workers la heredan al hacer fork, así que arrancan sin volver a pagar los
+imports. Ni el pool de conexiones ni el cliente de Mailchimp se crean en el
+maestro: cada worker abre los suyos en post_fork (o en su primera petición).
+
+Los workers son de hilos (gthread): una petición larga, como el long-poll de
+/changes o una espera a Mailchimp, ocupa solo uno de sus GUNICORN_THREADS
+hilos. Con el worker síncrono por defecto cada worker atendería una sola
+petición a la vez. GUNICORN_THREADS no debe superar DB_POOL_MAX.
+"""
+from config import Config
+
+preload_app = Config.PRELOAD_APP
+worker_class = "gthread"
+threads = Config.GUNICORN_THREADS
+# Con gthread el timeout vigila al worker, no a cada petición; aun así se deja
+# muy por encima de la espera máxima de /changes.
+timeout = max(30, int(2 * Config.CHANGES_LONGPOLL_SECONDS))
+
+
+def post_fork(server, worker):
+    from app import warm_up
+    warm_up()
@@ -0,0 +1,31 @@
+-- Contador de cambios por tabla para ETag / Last-Modified.
+-- Cada sentencia que modifica posts o categories incrementa su versión.
+
+CREATE TABLE IF NOT EXISTS content_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO content_versions (table_name)
+VALUES ('posts'), ('categories')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_content_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE content_versions
+    SET version = version + 1, updated_at = now()
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_bump_content_version ON posts;
+CREATE TRIGGER posts_bump_content_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON posts
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
+
+DROP TRIGGER IF EXISTS categories_bump_content_version ON categories;
+CREATE TRIGGER categories_bump_content_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
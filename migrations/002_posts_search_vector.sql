@@ -0,0 +1,12 @@
+-- Vector de búsqueda precalculado y ponderado (título > resumen > contenido)
+-- con índice GIN. Al ser una columna generada, PostgreSQL lo mantiene al día
+-- en cada INSERT/UPDATE de create_post/update_post.
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('spanish', COALESCE(abstract, '')), 'B') ||
+        setweight(to_tsvector('spanish', COALESCE(content, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS posts_search_vector_idx ON posts USING GIN (search_vector);
@@ -0,0 +1,19 @@
+-- Cola persistente de envíos a Mailchimp. Las rutas de newsletter insertan
+-- un trabajo y responden 202; app/workers/newsletter_worker.py los procesa.
+
+CREATE TABLE IF NOT EXISTS newsletter_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS newsletter_jobs_pending_idx
+    ON newsletter_jobs (run_after)
+    WHERE status IN ('pending', 'processing');
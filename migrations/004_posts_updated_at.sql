@@ -0,0 +1,18 @@
+-- Fecha de última modificación de cada post, para las exportaciones
+-- incrementales (/posts/export?since=). La mantiene un trigger en cada UPDATE.
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_touch_updated_at ON posts;
+CREATE TRIGGER posts_touch_updated_at
+    BEFORE UPDATE ON posts
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS posts_updated_at_id_idx ON posts (updated_at, id);
@@ -0,0 +1,95 @@
+-- Índice GIN sobre posts.categories para filtrar por categoría (operador @>)
+-- y recuento de posts por categoría mantenido por triggers, de modo que
+-- /categories?with_counts=1 no tenga que recorrer la tabla posts.
+
+CREATE INDEX IF NOT EXISTS posts_categories_idx ON posts USING GIN (categories);
+
+CREATE TABLE IF NOT EXISTS category_counts (
+    name TEXT PRIMARY KEY,
+    post_count INTEGER NOT NULL DEFAULT 0,
+    published_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- Triggers por sentencia con tablas de transición: un INSERT masivo hace una
+-- sola actualización por categoría. Como los recuentos forman parte de la
+-- respuesta de /categories, también se incrementa la versión de 'categories'.
+CREATE OR REPLACE FUNCTION refresh_category_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NOT EXISTS (
+        SELECT 1 FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE o.categories IS DISTINCT FROM n.categories
+           OR o.is_published IS DISTINCT FROM n.is_published
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO category_counts AS cc (name, post_count, published_count)
+        SELECT name, -count(*), -count(*) FILTER (WHERE is_published)
+        FROM (SELECT DISTINCT o.id, o.is_published, c.name
+              FROM old_rows o, unnest(o.categories) AS c(name)) AS removed
+        GROUP BY name
+        ON CONFLICT (name) DO UPDATE
+        SET post_count = cc.post_count + EXCLUDED.post_count,
+            published_count = cc.published_count + EXCLUDED.published_count;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO category_counts AS cc (name, post_count, published_count)
+        SELECT name, count(*), count(*) FILTER (WHERE is_published)
+        FROM (SELECT DISTINCT n.id, n.is_published, c.name
+              FROM new_rows n, unnest(n.categories) AS c(name)) AS added
+        GROUP BY name
+        ON CONFLICT (name) DO UPDATE
+        SET post_count = cc.post_count + EXCLUDED.post_count,
+            published_count = cc.published_count + EXCLUDED.published_count;
+    END IF;
+
+    DELETE FROM category_counts WHERE post_count <= 0;
+    UPDATE content_versions
+    SET version = version + 1, updated_at = now()
+    WHERE table_name = 'categories';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reset_category_counts() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM category_counts;
+    UPDATE content_versions
+    SET version = version + 1, updated_at = now()
+    WHERE table_name = 'categories';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_category_counts_insert ON posts;
+CREATE TRIGGER posts_category_counts_insert
+    AFTER INSERT ON posts REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_category_counts();
+
+DROP TRIGGER IF EXISTS posts_category_counts_update ON posts;
+CREATE TRIGGER posts_category_counts_update
+    AFTER UPDATE ON posts REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_category_counts();
+
+DROP TRIGGER IF EXISTS posts_category_counts_delete ON posts;
+CREATE TRIGGER posts_category_counts_delete
+    AFTER DELETE ON posts REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_category_counts();
+
+DROP TRIGGER IF EXISTS posts_category_counts_truncate ON posts;
+CREATE TRIGGER posts_category_counts_truncate
+    AFTER TRUNCATE ON posts
+    FOR EACH STATEMENT EXECUTE FUNCTION reset_category_counts();
+
+-- Recuento inicial (se puede volver a ejecutar: recalcula desde cero).
+BEGIN;
+LOCK TABLE posts IN SHARE MODE;
+DELETE FROM category_counts;
+INSERT INTO category_counts (name, post_count, published_count)
+SELECT name, count(*), count(*) FILTER (WHERE is_published)
+FROM (SELECT DISTINCT p.id, p.is_published, c.name
+      FROM posts p, unnest(p.categories) AS c(name)) AS counted
+GROUP BY name;
+COMMIT;
@@ -0,0 +1,11 @@
+-- Estado compartido de los token buckets de app/rate_limit.py (RATE_LIMIT_BACKEND=postgres).
+-- UNLOGGED: se escribe en cada petición limitada y no hace falta que sobreviva a un reinicio.
+
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    allowed BOOLEAN NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS rate_limits_updated_at_idx ON rate_limits (updated_at);
@@ -0,0 +1,14 @@
+-- Registro local del estado de cada suscriptor en Mailchimp, por el mismo hash
+-- MD5 del email que usa la API. Permite no repetir upserts de suscriptores que
+-- ya están al día; el worker lo reconcilia con la lista de Mailchimp.
+
+CREATE TABLE IF NOT EXISTS newsletter_subscribers (
+    subscriber_hash TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    status TEXT NOT NULL,
+    fname TEXT NOT NULL DEFAULT '',
+    lname TEXT NOT NULL DEFAULT '',
+    synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS newsletter_subscribers_synced_at_idx ON newsletter_subscribers (synced_at);
@@ -0,0 +1,35 @@
+-- Campos derivados del HTML de cada post, calculados al escribirlo
+-- (app/content_processing.py). Los posts existentes se rellenan con
+-- `python -m app.workers.content_backfill`.
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS content_text TEXT;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS word_count INTEGER;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS reading_minutes INTEGER;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS toc JSONB;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS excerpt TEXT;
+-- Versión del procesado con la que se calcularon (NULL: pendiente de backfill).
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS content_version SMALLINT;
+
+-- El vector de búsqueda pasa a indexar el texto plano en lugar del HTML, para
+-- no tokenizar etiquetas ni atributos. Mientras un post no se haya procesado
+-- se sigue usando su HTML. Solo se recrea la columna si aún usa el HTML.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'posts'
+          AND column_name = 'search_vector'
+          AND generation_expression LIKE '%content_text%'
+    ) THEN
+        ALTER TABLE posts DROP COLUMN IF EXISTS search_vector;
+        ALTER TABLE posts ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('spanish', COALESCE(title, '')), 'A') ||
+                setweight(to_tsvector('spanish', COALESCE(abstract, '')), 'B') ||
+                setweight(to_tsvector('spanish', COALESCE(content_text, content, '')), 'C')
+            ) STORED;
+    END IF;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS posts_search_vector_idx ON posts USING GIN (search_vector);
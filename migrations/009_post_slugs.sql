@@ -0,0 +1,45 @@
+-- Slugs únicos de posts e historial de slugs anteriores, para que las URLs
+-- de un post renombrado sigan resolviendo (/posts/by-slug/<slug>).
+
+-- Los slugs repetidos que ya existieran se desambiguan con el inicio del id;
+-- el más antiguo conserva el suyo.
+WITH duplicates AS (
+    SELECT id, row_number() OVER (PARTITION BY slug ORDER BY published_at, id) AS n
+    FROM posts
+)
+UPDATE posts p
+SET slug = p.slug || '-' || left(replace(p.id::text, '-', ''), 8)
+FROM duplicates d
+WHERE p.id = d.id AND d.n > 1;
+
+-- text_pattern_ops sirve tanto para la búsqueda exacta como para buscar los
+-- sufijos ya usados (slug LIKE 'base-%') al asignar un slug nuevo.
+CREATE UNIQUE INDEX IF NOT EXISTS posts_slug_key ON posts (slug text_pattern_ops);
+
+CREATE TABLE IF NOT EXISTS post_slug_history (
+    slug TEXT NOT NULL,
+    post_id UUID NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS post_slug_history_slug_key ON post_slug_history (slug text_pattern_ops);
+CREATE INDEX IF NOT EXISTS post_slug_history_post_id_idx ON post_slug_history (post_id);
+
+-- Al cambiar el slug de un post se guarda el anterior; si el post recupera un
+-- slug que tuvo antes, deja de estar en el historial.
+CREATE OR REPLACE FUNCTION record_post_slug_history() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM post_slug_history WHERE slug = NEW.slug;
+    INSERT INTO post_slug_history (slug, post_id)
+    VALUES (OLD.slug, NEW.id)
+    ON CONFLICT (slug) DO UPDATE SET post_id = EXCLUDED.post_id, created_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_record_slug_history ON posts;
+CREATE TRIGGER posts_record_slug_history
+    AFTER UPDATE OF slug ON posts
+    FOR EACH ROW
+    WHEN (OLD.slug IS DISTINCT FROM NEW.slug)
+    EXECUTE FUNCTION record_post_slug_history();
@@ -0,0 +1,134 @@
+-- Feed publicado: copia de los metadatos de los posts visibles (is_published
+-- y published_at ya alcanzado) que sirve /posts y /posts/search sin recorrer
+-- borradores ni posts programados. Lo mantienen triggers sobre posts; los
+-- posts programados esperan en scheduled_posts hasta que publish_due_posts()
+-- los pasa al feed (ver app/workers/feed_scheduler.py).
+--
+-- published_at guarda la hora UTC sin zona (datetime.utcnow() en la API), por
+-- eso se compara con now() AT TIME ZONE 'UTC'.
+
+CREATE TABLE IF NOT EXISTS posts_feed (
+    id UUID PRIMARY KEY,
+    title TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    abstract TEXT,
+    thumbnail_url TEXT,
+    published_at TIMESTAMP NOT NULL,
+    categories TEXT[] NOT NULL DEFAULT '{}',
+    excerpt TEXT,
+    word_count INTEGER,
+    reading_minutes INTEGER,
+    search_vector TSVECTOR
+);
+
+CREATE INDEX IF NOT EXISTS posts_feed_published_at_id_idx ON posts_feed (published_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS posts_feed_categories_idx ON posts_feed USING GIN (categories);
+CREATE INDEX IF NOT EXISTS posts_feed_search_vector_idx ON posts_feed USING GIN (search_vector);
+
+CREATE TABLE IF NOT EXISTS scheduled_posts (
+    id UUID PRIMARY KEY,
+    publish_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS scheduled_posts_publish_at_idx ON scheduled_posts (publish_at);
+
+-- Triggers por sentencia con tablas de transición, como los de category_counts:
+-- las filas modificadas salen del feed y de la cola, y se vuelven a añadir
+-- según su estado nuevo.
+CREATE OR REPLACE FUNCTION sync_posts_feed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM posts_feed f USING old_rows o WHERE f.id = o.id;
+        DELETE FROM scheduled_posts s USING old_rows o WHERE s.id = o.id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO posts_feed (id, title, slug, abstract, thumbnail_url, published_at, categories,
+                                excerpt, word_count, reading_minutes, search_vector)
+        SELECT n.id, n.title, n.slug, n.abstract, n.thumbnail_url, n.published_at, n.categories,
+               n.excerpt, n.word_count, n.reading_minutes, n.search_vector
+        FROM new_rows n
+        WHERE n.is_published AND n.published_at <= (now() AT TIME ZONE 'UTC');
+
+        INSERT INTO scheduled_posts (id, publish_at)
+        SELECT n.id, n.published_at
+        FROM new_rows n
+        WHERE n.is_published AND n.published_at > (now() AT TIME ZONE 'UTC');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reset_posts_feed() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM posts_feed;
+    DELETE FROM scheduled_posts;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_feed_insert ON posts;
+CREATE TRIGGER posts_feed_insert
+    AFTER INSERT ON posts REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_posts_feed();
+
+DROP TRIGGER IF EXISTS posts_feed_update ON posts;
+CREATE TRIGGER posts_feed_update
+    AFTER UPDATE ON posts REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_posts_feed();
+
+DROP TRIGGER IF EXISTS posts_feed_delete ON posts;
+CREATE TRIGGER posts_feed_delete
+    AFTER DELETE ON posts REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_posts_feed();
+
+DROP TRIGGER IF EXISTS posts_feed_truncate ON posts;
+CREATE TRIGGER posts_feed_truncate
+    AFTER TRUNCATE ON posts
+    FOR EACH STATEMENT EXECUTE FUNCTION reset_posts_feed();
+
+-- Pasa al feed los posts programados cuya hora ya ha llegado. Como cambia la
+-- respuesta de /posts, incrementa la versión de 'posts' (ETag). Devuelve
+-- cuántos se han publicado; varias llamadas simultáneas no publican dos veces.
+CREATE OR REPLACE FUNCTION publish_due_posts() RETURNS INTEGER AS $$
+DECLARE
+    published INTEGER;
+BEGIN
+    WITH due AS (
+        DELETE FROM scheduled_posts
+        WHERE publish_at <= (now() AT TIME ZONE 'UTC')
+        RETURNING id
+    )
+    INSERT INTO posts_feed (id, title, slug, abstract, thumbnail_url, published_at, categories,
+                            excerpt, word_count, reading_minutes, search_vector)
+    SELECT p.id, p.title, p.slug, p.abstract, p.thumbnail_url, p.published_at, p.categories,
+           p.excerpt, p.word_count, p.reading_minutes, p.search_vector
+    FROM due JOIN posts p ON p.id = due.id
+    ON CONFLICT (id) DO NOTHING;
+    GET DIAGNOSTICS published = ROW_COUNT;
+
+    IF published > 0 THEN
+        UPDATE content_versions
+        SET version = version + 1, updated_at = now()
+        WHERE table_name = 'posts';
+    END IF;
+    RETURN published;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Carga inicial (se puede volver a ejecutar: reconstruye desde cero).
+BEGIN;
+LOCK TABLE posts IN SHARE MODE;
+DELETE FROM posts_feed;
+DELETE FROM scheduled_posts;
+INSERT INTO posts_feed (id, title, slug, abstract, thumbnail_url, published_at, categories,
+                        excerpt, word_count, reading_minutes, search_vector)
+SELECT id, title, slug, abstract, thumbnail_url, published_at, categories,
+       excerpt, word_count, reading_minutes, search_vector
+FROM posts
+WHERE is_published AND published_at <= (now() AT TIME ZONE 'UTC');
+INSERT INTO scheduled_posts (id, publish_at)
+SELECT id, published_at
+FROM posts
+WHERE is_published AND published_at > (now() AT TIME ZONE 'UTC');
+COMMIT;
@@ -0,0 +1,155 @@
+-- Outbox de cambios: cada sentencia que modifica posts o categories añade,
+-- en la misma transacción, un evento por fila (triggers por sentencia con
+-- tablas de transición). El dispatcher (app/workers/outbox_dispatcher.py)
+-- numera los eventos confirmados en `position`, en orden de confirmación, y
+-- avisa con NOTIFY a /changes?since=<position>.
+--
+-- position se asigna al despachar y no al insertar: un BIGSERIAL se reparte
+-- antes del COMMIT, así que un lector podría ver el 11 antes de que se
+-- confirmara el 10 y saltárselo.
+
+CREATE TABLE IF NOT EXISTS change_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    entity TEXT NOT NULL,
+    entity_id TEXT,
+    op TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    position BIGINT UNIQUE,
+    dispatched_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS change_outbox_pending_idx ON change_outbox (id) WHERE position IS NULL;
+
+-- entity: 'post' o 'category'. op: 'insert', 'update', 'delete', 'publish'
+-- (un post programado llega al feed) o 'truncate' (entity_id NULL).
+CREATE OR REPLACE FUNCTION record_post_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO change_outbox (entity, entity_id, op, payload)
+        SELECT 'post', n.id::text, 'insert',
+               jsonb_build_object('slug', n.slug, 'is_published', n.is_published,
+                                  'published_at', n.published_at, 'categories', n.categories)
+        FROM new_rows n;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO change_outbox (entity, entity_id, op, payload)
+        SELECT 'post', n.id::text, 'update',
+               jsonb_build_object('slug', n.slug, 'is_published', n.is_published,
+                                  'published_at', n.published_at, 'categories', n.categories,
+                                  'old_slug', o.slug, 'old_categories', o.categories)
+        FROM new_rows n JOIN old_rows o ON o.id = n.id;
+    ELSE
+        INSERT INTO change_outbox (entity, entity_id, op, payload)
+        SELECT 'post', o.id::text, 'delete',
+               jsonb_build_object('slug', o.slug, 'categories', o.categories)
+        FROM old_rows o;
+    END IF;
+    PERFORM pg_notify('change_outbox', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_category_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO change_outbox (entity, entity_id, op, payload)
+        SELECT 'category', n.id::text, 'insert', jsonb_build_object('slug', n.slug, 'name', n.name)
+        FROM new_rows n;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO change_outbox (entity, entity_id, op, payload)
+        SELECT 'category', n.id::text, 'update',
+               jsonb_build_object('slug', n.slug, 'name', n.name, 'old_slug', o.slug)
+        FROM new_rows n JOIN old_rows o ON o.id = n.id;
+    ELSE
+        INSERT INTO change_outbox (entity, entity_id, op, payload)
+        SELECT 'category', o.id::text, 'delete', jsonb_build_object('slug', o.slug, 'name', o.name)
+        FROM old_rows o;
+    END IF;
+    PERFORM pg_notify('change_outbox', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_truncate_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO change_outbox (entity, op) VALUES (TG_ARGV[0], 'truncate');
+    PERFORM pg_notify('change_outbox', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_outbox_insert ON posts;
+CREATE TRIGGER posts_outbox_insert
+    AFTER INSERT ON posts REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_post_changes();
+
+DROP TRIGGER IF EXISTS posts_outbox_update ON posts;
+CREATE TRIGGER posts_outbox_update
+    AFTER UPDATE ON posts REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_post_changes();
+
+DROP TRIGGER IF EXISTS posts_outbox_delete ON posts;
+CREATE TRIGGER posts_outbox_delete
+    AFTER DELETE ON posts REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_post_changes();
+
+DROP TRIGGER IF EXISTS posts_outbox_truncate ON posts;
+CREATE TRIGGER posts_outbox_truncate
+    AFTER TRUNCATE ON posts
+    FOR EACH STATEMENT EXECUTE FUNCTION record_truncate_change('post');
+
+DROP TRIGGER IF EXISTS categories_outbox_insert ON categories;
+CREATE TRIGGER categories_outbox_insert
+    AFTER INSERT ON categories REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_category_changes();
+
+DROP TRIGGER IF EXISTS categories_outbox_update ON categories;
+CREATE TRIGGER categories_outbox_update
+    AFTER UPDATE ON categories REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_category_changes();
+
+DROP TRIGGER IF EXISTS categories_outbox_delete ON categories;
+CREATE TRIGGER categories_outbox_delete
+    AFTER DELETE ON categories REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_category_changes();
+
+DROP TRIGGER IF EXISTS categories_outbox_truncate ON categories;
+CREATE TRIGGER categories_outbox_truncate
+    AFTER TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION record_truncate_change('category');
+
+-- Igual que en la 010, y además registra un evento 'publish' por cada post
+-- programado que pasa al feed (no modifica posts, así que no lo ven los triggers).
+CREATE OR REPLACE FUNCTION publish_due_posts() RETURNS INTEGER AS $$
+DECLARE
+    published INTEGER;
+BEGIN
+    WITH due AS (
+        DELETE FROM scheduled_posts
+        WHERE publish_at <= (now() AT TIME ZONE 'UTC')
+        RETURNING id
+    ), moved AS (
+        INSERT INTO posts_feed (id, title, slug, abstract, thumbnail_url, published_at, categories,
+                                excerpt, word_count, reading_minutes, search_vector)
+        SELECT p.id, p.title, p.slug, p.abstract, p.thumbnail_url, p.published_at, p.categories,
+               p.excerpt, p.word_count, p.reading_minutes, p.search_vector
+        FROM due JOIN posts p ON p.id = due.id
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id, slug, published_at, categories
+    )
+    INSERT INTO change_outbox (entity, entity_id, op, payload)
+    SELECT 'post', m.id::text, 'publish',
+           jsonb_build_object('slug', m.slug, 'is_published', true,
+                              'published_at', m.published_at, 'categories', m.categories)
+    FROM moved m;
+    GET DIAGNOSTICS published = ROW_COUNT;
+
+    IF published > 0 THEN
+        UPDATE content_versions
+        SET version = version + 1, updated_at = now()
+        WHERE table_name = 'posts';
+        PERFORM pg_notify('change_outbox', '');
+    END IF;
+    RETURN published;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,98 @@
+-- published_count de category_counts pasa a contar los posts del feed
+-- publicado (posts_feed) en lugar de los que tienen is_published: los posts
+-- programados no cuentan hasta que publish_due_posts() los pasa al feed.
+--
+-- post_count lo sigue manteniendo el trigger de posts (migrations/005) y
+-- published_count lo mantienen triggers sobre posts_feed, así que también se
+-- actualiza cuando publica el feed_scheduler.
+
+CREATE OR REPLACE FUNCTION refresh_category_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NOT EXISTS (
+        SELECT 1 FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE o.categories IS DISTINCT FROM n.categories
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO category_counts AS cc (name, post_count)
+        SELECT name, -count(*)
+        FROM (SELECT DISTINCT o.id, c.name
+              FROM old_rows o, unnest(o.categories) AS c(name)) AS removed
+        GROUP BY name
+        ON CONFLICT (name) DO UPDATE
+        SET post_count = cc.post_count + EXCLUDED.post_count;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO category_counts AS cc (name, post_count)
+        SELECT name, count(*)
+        FROM (SELECT DISTINCT n.id, c.name
+              FROM new_rows n, unnest(n.categories) AS c(name)) AS added
+        GROUP BY name
+        ON CONFLICT (name) DO UPDATE
+        SET post_count = cc.post_count + EXCLUDED.post_count;
+    END IF;
+
+    DELETE FROM category_counts WHERE post_count <= 0;
+    UPDATE content_versions
+    SET version = version + 1, updated_at = now()
+    WHERE table_name = 'categories';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Al salir del feed solo se actualizan las filas que siguen existiendo: si el
+-- post se ha borrado, el trigger de posts puede haber quitado ya la categoría.
+-- Al entrar se inserta la fila si aún no existe; el trigger de posts le suma
+-- después su post_count. Así el resultado no depende del orden de los triggers.
+CREATE OR REPLACE FUNCTION refresh_published_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE category_counts AS cc
+        SET published_count = GREATEST(cc.published_count - removed.n, 0)
+        FROM (SELECT c.name, count(DISTINCT o.id) AS n
+              FROM old_rows o, unnest(o.categories) AS c(name)
+              GROUP BY c.name) AS removed
+        WHERE cc.name = removed.name;
+    ELSE
+        INSERT INTO category_counts AS cc (name, published_count)
+        SELECT c.name, count(DISTINCT n.id)
+        FROM new_rows n, unnest(n.categories) AS c(name)
+        GROUP BY c.name
+        ON CONFLICT (name) DO UPDATE
+        SET published_count = cc.published_count + EXCLUDED.published_count;
+    END IF;
+
+    UPDATE content_versions
+    SET version = version + 1, updated_at = now()
+    WHERE table_name = 'categories';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS posts_feed_published_counts_insert ON posts_feed;
+CREATE TRIGGER posts_feed_published_counts_insert
+    AFTER INSERT ON posts_feed REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_published_counts();
+
+DROP TRIGGER IF EXISTS posts_feed_published_counts_delete ON posts_feed;
+CREATE TRIGGER posts_feed_published_counts_delete
+    AFTER DELETE ON posts_feed REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_published_counts();
+
+-- Recuento inicial (se puede volver a ejecutar: recalcula desde cero).
+BEGIN;
+LOCK TABLE posts, posts_feed IN SHARE MODE;
+DELETE FROM category_counts;
+INSERT INTO category_counts (name, post_count, published_count)
+SELECT c.name, count(DISTINCT p.id), count(DISTINCT f.id)
+FROM posts p
+CROSS JOIN unnest(p.categories) AS c(name)
+LEFT JOIN posts_feed f ON f.id = p.id
+GROUP BY c.name;
+UPDATE content_versions
+SET version = version + 1, updated_at = now()
+WHERE table_name = 'categories';
+COMMIT;
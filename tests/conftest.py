@@ -0,0 +1,82 @@
+"""
+Fixtures comunes.
+
+Las pruebas que necesitan PostgreSQL usan la base de datos de TEST_POSTGRES_URI
+(se le aplican bench/schema.sql y las migraciones) y se saltan si no está definida:
+
+    TEST_POSTGRES_URI=postgresql://localhost/pichon_test python -m pytest
+"""
+import os
+
+# Sin hilos en segundo plano ni conexiones al importar la app.
+for name in ("NEWSLETTER_WORKER_EMBEDDED", "FEED_SCHEDULER_EMBEDDED", "OUTBOX_DISPATCHER_EMBEDDED",
+             "CHANGES_LISTENER_EMBEDDED", "DB_POOL_PREWARM"):
+    os.environ.setdefault(name, "0")
+
+import psycopg2
+import pytest
+from config import Config
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def mailchimp_stub(monkeypatch):
+    """Servidor de bench/mailchimp_stub.py en un puerto libre, con un cliente y un breaker nuevos."""
+    from bench import mailchimp_stub
+    from app.circuit_breaker import CircuitBreaker
+    from app.services import mailchimp_service
+
+    server = mailchimp_stub.serve(port=0)
+    handler = mailchimp_stub.StubHandler
+    handler.calls.clear()
+    host, port = server.server_address
+    monkeypatch.setattr(Config, "MAILCHIMP_BASE_URL", f"http://{host}:{port}/3.0")
+    monkeypatch.setattr(Config, "MAILCHIMP_API_KEY", "test-us1")
+    monkeypatch.setattr(Config, "MAILCHIMP_DC", "us1")
+    monkeypatch.setattr(Config, "MAILCHIMP_LIST_ID", "list")
+    monkeypatch.setattr(mailchimp_service, "_client", None)
+    monkeypatch.setattr(mailchimp_service, "mailchimp_breaker", CircuitBreaker(5, 30))
+    yield handler
+    handler.error_rate = 0.0
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def postgres_uri():
+    """Base de datos de pruebas con el esquema aplicado; el pool del primario apunta a ella."""
+    uri = os.getenv("TEST_POSTGRES_URI")
+    if not uri:
+        pytest.skip("TEST_POSTGRES_URI no está definida")
+    from app import db
+    from bench.seed import apply_schema
+
+    conn = psycopg2.connect(uri)
+    try:
+        apply_schema(conn)
+    finally:
+        conn.close()
+    previous = db._primary.dsn
+    db._primary.dsn = uri
+    db._primary.init()
+    yield uri
+    db._primary.dsn = previous
+
+
+@pytest.fixture
+def postgres(postgres_uri):
+    """Conexión directa a la base de datos de pruebas (autocommit)."""
+    conn = psycopg2.connect(postgres_uri)
+    conn.autocommit = True
+    yield conn
+    conn.close()
@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+import threading
+import pytest
+from app import change_stream
+from app.services import changes_service
+from app.services.changes_service import ChangesService
+from app.workers import outbox_dispatcher
+
+
+class FakeOutbox:
+    """change_outbox en memoria para CHANGES_QUERY y la consulta de min(position)."""
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.result = []
+
+    def cursor(self, cursor_factory=None):
+        return self
+
+    def execute(self, query, params=None):
+        if "min(position)" in query:
+            self.result = [{"oldest": min(self.positions, default=None)}]
+        else:
+            since, limit = params
+            self.result = [{"position": p} for p in sorted(self.positions) if p > since][:limit]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    def install(positions):
+        fake = FakeOutbox(positions)
+
+        @contextmanager
+        def db_connection(readonly=False):
+            yield fake
+
+        monkeypatch.setattr(changes_service, "db_connection", db_connection)
+        return fake
+    return install
+
+
+def test_get_changes_returns_events_in_position_order(outbox):
+    outbox([5, 3, 4, 6])
+
+    page = ChangesService.get_changes(3, limit=2)
+
+    assert [event["position"] for event in page["data"]] == [4, 5]
+    assert page["next_since"] == 5
+
+
+def test_get_changes_detects_purged_events(outbox):
+    outbox([10, 11, 12])
+
+    assert ChangesService.get_changes(9)["next_since"] == 12
+    # Los eventos 5..9 ya no están: el cliente no puede continuar desde 4.
+    assert ChangesService.get_changes(4) is None
+
+
+def test_get_changes_at_head_returns_empty_page(outbox):
+    outbox([10, 11, 12])
+
+    assert ChangesService.get_changes(12) == {"data": [], "next_since": 12}
+
+
+def test_changes_route_answers_410_for_purged_positions(client, outbox):
+    outbox([10, 11])
+
+    response = client.get("/changes?since=3&timeout=0")
+
+    assert response.status_code == 410
+
+
+def test_changes_route_reads_again_after_notification(client, outbox, monkeypatch):
+    fake = outbox([1])
+    waits = []
+
+    def wait_for_change(since, timeout):
+        waits.append((since, timeout))
+        fake.positions.append(2)
+        return True
+
+    monkeypatch.setattr(change_stream, "wait_for_change", wait_for_change)
+
+    response = client.get("/changes?since=1&timeout=3")
+
+    assert waits == [(1, 3.0)]
+    assert [event["position"] for event in response.get_json()["data"]] == [2]
+    assert "no-store" in response.headers["Cache-Control"]
+
+
+def test_changes_route_reads_again_when_the_wait_times_out(client, outbox, monkeypatch):
+    # El evento se despachó antes de que el proceso escuchara: no llega aviso.
+    fake = outbox([1])
+    monkeypatch.setattr(change_stream, "start_listener", lambda: fake.positions.append(2))
+
+    response = client.get("/changes?since=1&timeout=0.05")
+
+    assert [event["position"] for event in response.get_json()["data"]] == [2]
+
+
+def test_changes_route_answers_at_once_when_waiters_are_full(client, outbox, monkeypatch):
+    outbox([1])
+    monkeypatch.setattr(change_stream, "_waiters", threading.BoundedSemaphore(0))
+    monkeypatch.setattr(change_stream, "start_listener", lambda: pytest.fail("no debe esperar"))
+
+    response = client.get("/changes?since=1&timeout=3")
+
+    assert response.get_json()["data"] == []
+    assert response.get_json()["next_since"] == 1
+
+
+# Con PostgreSQL (TEST_POSTGRES_URI)
+
+@pytest.fixture
+def change_outbox(postgres):
+    postgres.cursor().execute("TRUNCATE change_outbox RESTART IDENTITY;")
+    return postgres
+
+
+def add_events(conn, count):
+    cur = conn.cursor()
+    for n in range(count):
+        cur.execute("INSERT INTO change_outbox (entity, entity_id, op, payload) VALUES ('post', %s, 'update', '{}');",
+                    (str(n),))
+
+
+def test_dispatch_numbers_events_consecutively_in_commit_order(change_outbox):
+    add_events(change_outbox, 3)
+    assert ChangesService.dispatch_pending() == 3
+    add_events(change_outbox, 2)
+    assert ChangesService.dispatch_pending() == 2
+
+    cur = change_outbox.cursor()
+    cur.execute("SELECT id, position FROM change_outbox ORDER BY id;")
+    assert [position for _, position in cur.fetchall()] == [1, 2, 3, 4, 5]
+    assert [event["position"] for event in ChangesService.get_changes(0)["data"]] == [1, 2, 3, 4, 5]
+
+
+def test_purge_keeps_numbering_and_reports_the_gap(change_outbox):
+    add_events(change_outbox, 3)
+    ChangesService.dispatch_pending()
+    change_outbox.cursor().execute("UPDATE change_outbox SET dispatched_at = now() - interval '30 days';")
+
+    assert ChangesService.purge_dispatched(retention_days=7) == 2
+    assert ChangesService.get_changes(0) is None
+    assert [event["position"] for event in ChangesService.get_changes(2)["data"]] == [3]
+
+    add_events(change_outbox, 1)
+    ChangesService.dispatch_pending()
+    assert [event["position"] for event in ChangesService.get_changes(3)["data"]] == [4]
+
+
+def test_only_one_dispatcher_leads(change_outbox, postgres_uri, monkeypatch):
+    monkeypatch.setattr(outbox_dispatcher.Config, "POSTGRES_URI", postgres_uri)
+    leader = outbox_dispatcher._lead_connection()
+    try:
+        assert leader is not None
+        assert outbox_dispatcher._lead_connection() is None
+    finally:
+        leader.close()
+    follower = outbox_dispatcher._lead_connection()
+    assert follower is not None
+    follower.close()
@@ -0,0 +1,28 @@
+import gzip
+import pytest
+from app import compression
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    compression.compressed_cache.clear()
+
+
+def test_cached_bytes_always_match_the_body(monkeypatch):
+    calls = []
+    real_compress = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, encoding: calls.append(body) or real_compress(body, encoding))
+
+    old = compression.compress_cached(b'{"title": "antes"}' * 100, "gzip", cacheable=True)
+    new = compression.compress_cached(b'{"title": "despues"}' * 100, "gzip", cacheable=True)
+    again = compression.compress_cached(b'{"title": "despues"}' * 100, "gzip", cacheable=True)
+
+    assert gzip.decompress(old) == b'{"title": "antes"}' * 100
+    assert gzip.decompress(new) == b'{"title": "despues"}' * 100
+    assert again == new
+    assert len(calls) == 2
+
+
+def test_uncacheable_bodies_are_not_stored():
+    compression.compress_cached(b"x" * 2000, "gzip")
+    assert compression.compressed_cache.stats()["size"] == 0
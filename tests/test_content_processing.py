@@ -0,0 +1,67 @@
+import pytest
+from app.content_processing import DERIVED_COLUMNS, PROCESSING_VERSION, html_to_text, make_excerpt, process_content
+from config import Config
+
+
+def test_blocks_become_lines_and_inline_tags_do_not_split_words():
+    text, _ = html_to_text("<h2>Título</h2><p>Una <b>neg</b>rita y\n  <a href='#'>un enlace</a>.</p><ul><li>uno</li><li>dos</li></ul>")
+
+    assert text == "Título\nUna negrita y un enlace.\nuno\ndos"
+
+
+def test_scripts_and_styles_are_not_text():
+    text, toc = html_to_text("<p>antes</p><script>var x = '<h2>no</h2>';</script><style>p {}</style><p>después &amp; más</p>")
+
+    assert text == "antes\ndespués & más"
+    assert toc == []
+
+
+def test_toc_lists_headings_with_their_ids():
+    _, toc = html_to_text("<h1>Uno</h1><p>texto</p><h3 id='b'> Dos  <em>y tres</em></h3><h2></h2>")
+
+    assert toc == [{"level": 1, "text": "Uno", "id": None}, {"level": 3, "text": "Dos y tres", "id": "b"}]
+
+
+def test_empty_content():
+    assert html_to_text(None) == ("", [])
+    derived = process_content("")
+    assert derived["word_count"] == 0
+    assert derived["reading_minutes"] == 0
+    assert derived["excerpt"] == ""
+
+
+def test_short_text_is_not_truncated():
+    assert make_excerpt("hola   mundo\n", 20) == "hola mundo"
+    assert make_excerpt("exacto", 6) == "exacto"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("uno dos tres cuatro", "uno dos…"),
+    # La palabra que acaba justo en el límite se conserva.
+    ("uno dosis tres", "uno dosis…"),
+    ("uno, dos. tres", "uno, dos…"),
+    # Una sola palabra más larga que el límite se corta dentro de ella.
+    ("supercalifragilístico", "supercali…"),
+])
+def test_excerpt_is_cut_at_a_word_boundary(text, expected):
+    assert make_excerpt(text, 9) == expected
+
+
+def test_excerpt_does_not_join_words_across_tags():
+    text, _ = html_to_text("<p>primero</p><p>segundo</p><p>tercero</p>")
+
+    assert make_excerpt(text, 16) == "primero segundo…"
+
+
+def test_process_content_fills_every_derived_column(monkeypatch):
+    monkeypatch.setattr(Config, "CONTENT_WORDS_PER_MINUTE", 2)
+    monkeypatch.setattr(Config, "CONTENT_EXCERPT_CHARS", 8)
+
+    derived = process_content("<h2 id='a'>Hola</h2><p>uno dos tres</p>")
+
+    assert tuple(derived) == DERIVED_COLUMNS
+    assert derived["content_text"] == "Hola\nuno dos tres"
+    assert derived["word_count"] == 4
+    assert derived["reading_minutes"] == 2
+    assert derived["excerpt"] == "Hola uno…"
+    assert derived["content_version"] == PROCESSING_VERSION
@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import datetime, timezone
+import pytest
+from app.services.posts_service import (INDEX_FIELDS, MAX_PAGE_SIZE, build_index_query, decode_cursor,
+                                        encode_cursor, finish_index_page)
+
+POST_ID = "0b6f1a52-3c1e-4d8e-9a57-2f1c5e0d9b11"
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    published_at = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+    cursor = encode_cursor(published_at, POST_ID)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (published_at, POST_ID)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "no es base64!",
+    "e30",  # {}
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor(["2026-03-01T12:30:00"]),
+    raw_cursor(["2026-03-01T12:30:00", POST_ID, "extra"]),
+    raw_cursor(["ayer", POST_ID]),
+    raw_cursor([20260301, POST_ID]),
+    raw_cursor(["2026-03-01T12:30:00", 7]),
+    raw_cursor(["2026-03-01T12:30:00", "1; DROP TABLE posts"]),
+    raw_cursor({"published_at": "2026-03-01", "id": POST_ID}),
+    raw_cursor(42),
+])
+def test_malformed_or_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Cursor no válido"):
+        decode_cursor(cursor)
+
+
+def test_index_route_answers_400_for_a_tampered_cursor(client, monkeypatch):
+    monkeypatch.setattr("app.http_cache.VersionsService.get_version", lambda table_name: None)
+
+    response = client.get(f"/posts?cursor={raw_cursor(['2026-03-01T12:30:00', 'x'])}")
+
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Cursor no válido"
+
+
+def test_first_page_reads_the_published_feed():
+    query, values, fields = build_index_query(20, None, None, None, None)
+
+    assert "FROM posts_feed p" in query
+    assert "WHERE" not in query
+    assert values == [21]
+    assert fields == list(INDEX_FIELDS)
+
+
+def test_next_page_continues_after_the_cursor():
+    published_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    cursor = encode_cursor(published_at, POST_ID)
+
+    query, values, fields = build_index_query(10, cursor, ["title"], "cultura", None)
+
+    assert "(p.published_at, p.id) < (%s, %s)" in query
+    assert "p.categories @> ARRAY[%s]::text[]" in query
+    assert values == [published_at, POST_ID, "cultura", 11]
+    # id y published_at se leen siempre para el cursor siguiente.
+    assert "p.id" in query and "p.published_at" in query
+    assert fields == ["title"]
+
+
+def test_draft_listing_reads_posts():
+    query, _, _ = build_index_query(20, None, None, None, False)
+
+    assert "FROM posts p" in query
+    assert "p.is_published = FALSE" in query
+
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_limit_out_of_range(limit):
+    with pytest.raises(ValueError, match=f"'limit' debe estar entre 1 y {MAX_PAGE_SIZE}"):
+        build_index_query(limit, None, None, None, None)
+
+
+def test_unknown_fields():
+    with pytest.raises(ValueError, match="Campos no permitidos: content, password"):
+        build_index_query(20, None, ["title", "content", "password"], None, None)
+
+
+def test_finish_index_page_builds_the_next_cursor():
+    rows = [{"id": str(n), "title": f"Post {n}", "published_at": datetime(2026, 1, 10 - n)} for n in range(3)]
+
+    page = finish_index_page([dict(row) for row in rows], 2, ["title"])
+
+    assert page["data"] == [{"title": "Post 0"}, {"title": "Post 1"}]
+    assert page["next_cursor"] == encode_cursor(rows[1]["published_at"], "1")
+    assert finish_index_page([dict(row) for row in rows], 3, ["title"])["next_cursor"] is None
@@ -0,0 +1,116 @@
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import pytest
+from app import db
+
+
+class FakeConnection:
+    """Lo justo de una conexión de psycopg2 para el pool real (sin servidor)."""
+
+    class Info:
+        transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def __init__(self):
+        self.closed = 0
+        self.info = self.Info()
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        pass
+
+    def cursor(self):
+        return FakeCursor()
+
+
+class FakeCursor:
+    def execute(self, query):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(psycopg2.pool.psycopg2, "connect", lambda *args, **kwargs: FakeConnection())
+    pool = db._ProcessPool("dbname=test", max_size=2, min_size=0)
+    pool.init()
+    return pool
+
+
+def test_checkin_after_reinit_returns_connection_to_its_own_pool(pool):
+    conn = pool.checkout()
+    old = pool.pool
+
+    pool.init()
+    pool.checkin(conn)
+
+    assert conn.closed
+    assert old.closed
+    assert pool.retired == {}
+    assert pool.stats()["in_use"] == 0
+    # El pool nuevo sigue funcionando con todas sus plazas.
+    first, second = pool.checkout(), pool.checkout()
+    pool.checkin(first)
+    pool.checkin(second)
+
+
+def test_reinit_without_borrowed_connections_closes_old_pool(pool):
+    pool.checkin(pool.checkout())
+    old = pool.pool
+
+    pool.init()
+
+    assert old.closed
+    assert pool.retired == {}
+
+
+def test_checkin_of_connection_borrowed_before_fork_is_left_alone(pool, monkeypatch):
+    conn = pool.checkout()
+    monkeypatch.setattr(db.os, "getpid", lambda: -1)
+
+    pool.init()
+    pool.checkin(conn)
+
+    # El socket es del proceso padre: ni se cierra ni se devuelve al pool nuevo.
+    assert not conn.closed
+    assert pool.stats()["in_use"] == 0
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    monkeypatch.setattr(psycopg2.pool.psycopg2, "connect", lambda *args, **kwargs: FakeConnection())
+    monkeypatch.setattr(db.Config, "DB_REPLICA_POOL_MAX", 1)
+    monkeypatch.setattr(db.Config, "DB_REPLICA_CHECKOUT_TIMEOUT", 0)
+    replicas = [db._Replica(0, "dbname=replica0"), db._Replica(1, "dbname=replica1")]
+    monkeypatch.setattr(db, "_replicas", replicas)
+    monkeypatch.setattr(db, "_round_robin", iter(range(100)))
+    return replicas
+
+
+def test_busy_replica_is_skipped_without_being_marked_unhealthy(replicas):
+    busy = replicas[0].checkout()
+
+    conn = db._replica_connection()
+
+    assert conn.owner_pool is replicas[1]
+    assert replicas[0].healthy()
+    assert replicas[0].stats()["failures"] == 0
+    replicas[0].checkin(busy)
+    replicas[1].checkin(conn)
+
+
+def test_failing_replica_is_marked_unhealthy(replicas, monkeypatch):
+    def broken_checkout(timeout=None):
+        raise psycopg2.OperationalError("sin conexión")
+
+    monkeypatch.setattr(replicas[0], "checkout", broken_checkout)
+
+    conn = db._replica_connection()
+
+    assert conn.owner_pool is replicas[1]
+    assert not replicas[0].healthy()
+    replicas[1].checkin(conn)
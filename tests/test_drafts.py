@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+import pytest
+from app.auth import is_admin_token
+from app.cache import read_cache
+from app.services.posts_service import PostsService, PUBLISHED_FILTER, build_export_query
+from app.services.versions_service import VersionsService
+from config import Config
+
+ADMIN = {"Authorization": "Bearer secreto"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "secreto")
+
+
+@pytest.fixture
+def no_versions(monkeypatch):
+    monkeypatch.setattr(VersionsService, "get_version", lambda table_name: None)
+
+
+def test_admin_token():
+    assert is_admin_token("Bearer secreto")
+    assert is_admin_token("bearer secreto")
+    assert not is_admin_token("Bearer otro")
+    assert not is_admin_token("secreto")
+    assert not is_admin_token(None)
+
+
+def test_admin_token_disabled_without_config(monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "")
+    assert not is_admin_token("Bearer ")
+
+
+@pytest.mark.parametrize("path", ["/posts?published=0", "/categories/cultura/posts?published=0",
+                                  "/posts/export?published=0"])
+def test_draft_reads_require_admin_token(client, no_versions, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer otro"}).status_code == 401
+
+
+def test_admin_draft_listing_is_not_publicly_cacheable(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(PostsService, "get_index_page",
+                        lambda **kwargs: calls.append(kwargs) or {"data": [], "next_cursor": None})
+
+    response = client.get("/posts?published=0", headers=ADMIN)
+
+    assert response.status_code == 200
+    assert calls[0]["is_published"] is False
+    assert "no-store" in response.headers["Cache-Control"]
+    assert "public" not in response.headers["Cache-Control"]
+
+
+def test_public_export_only_includes_published_posts(client, no_versions, monkeypatch):
+    calls = []
+    monkeypatch.setattr(PostsService, "export_posts", lambda **kwargs: calls.append(kwargs) or iter([]))
+
+    client.get("/posts/export")
+    client.get("/posts/export", headers=ADMIN)
+
+    assert [call["include_drafts"] for call in calls] == [False, True]
+    assert PUBLISHED_FILTER in build_export_query(None, None)[0]
+    assert PUBLISHED_FILTER not in build_export_query(None, None, include_drafts=True)[0]
+
+
+# Con PostgreSQL (TEST_POSTGRES_URI)
+
+@pytest.fixture
+def posts(postgres):
+    postgres.cursor().execute("TRUNCATE posts RESTART IDENTITY CASCADE;")
+    read_cache.clear()
+    future = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    ids = {
+        "published": PostsService.create_post("Publicado", "", "", ["cultura"], True, "<p>a</p>"),
+        "draft": PostsService.create_post("Borrador", "", "", ["cultura"], False, "<p>b</p>"),
+        "scheduled": PostsService.create_post("Programado", "", "", ["cultura"], True, "<p>c</p>", future),
+    }
+    read_cache.clear()
+    return ids
+
+
+def test_single_reads_hide_drafts_and_scheduled_posts(client, posts):
+    for name, post_id in posts.items():
+        expected = 200 if name == "published" else 404
+        assert client.get(f"/posts/{post_id}").status_code == expected
+        assert client.get(f"/posts/{post_id}?content=0").status_code == expected
+        assert client.get(f"/posts/{post_id}/content").status_code == expected
+
+    assert client.get("/posts/by-slug/borrador").status_code == 404
+    assert client.get("/posts/by-slug/programado").status_code == 404
+    batch = client.get(f"/posts/batch?ids={','.join(posts.values())}").get_json()
+    assert [post["id"] for post in batch["data"]] == [posts["published"]]
+
+
+def test_export_hides_drafts_unless_admin(client, posts):
+    public = client.get("/posts/export").get_data(as_text=True).splitlines()
+    admin = client.get("/posts/export", headers=ADMIN).get_data(as_text=True).splitlines()
+    assert len(public) == 1
+    assert len(admin) == 3
+
+
+def category_counts(conn, name):
+    cur = conn.cursor()
+    cur.execute("SELECT post_count, published_count FROM category_counts WHERE name = %s;", (name,))
+    return cur.fetchone()
+
+
+def test_published_count_only_counts_the_feed(posts, postgres):
+    assert category_counts(postgres, "cultura") == (3, 1)
+
+    postgres.cursor().execute("UPDATE scheduled_posts SET publish_at = now() AT TIME ZONE 'UTC' - interval '1 minute';")
+    PostsService.publish_due_posts()
+    assert category_counts(postgres, "cultura") == (3, 2)
+
+    PostsService.delete_post(posts["published"])
+    assert category_counts(postgres, "cultura") == (2, 1)
@@ -0,0 +1,33 @@
+from datetime import datetime
+import pytest
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, stream_jsonify
+from app.services.posts_service import PostsService
+
+
+def rows(count):
+    return [{"id": str(n), "title": f"Título {n}  ", "score": n / 3,
+             "published_at": datetime(2026, 1, 1 + n % 28)} for n in range(count)]
+
+
+@pytest.mark.parametrize("provider", [FastJSONProvider, DefaultJSONProvider])
+@pytest.mark.parametrize("count, chunk_size", [(0, 25), (1, 25), (60, 25), (50, 50), (7, 1)])
+def test_stream_jsonify_matches_jsonify(app, provider, count, chunk_size):
+    app.json = provider(app)
+    payload = {"status": "success", "data": rows(count), "count": count, "next_cursor": None}
+
+    with app.app_context():
+        streamed = stream_jsonify(payload, chunk_size=chunk_size)
+        assert streamed.is_streamed
+        assert streamed.get_data() == jsonify(payload).get_data()
+
+
+def test_paginated_lists_keep_content_length(client, monkeypatch):
+    monkeypatch.setattr(PostsService, "get_index_page",
+                        lambda **kwargs: {"data": rows(100), "next_cursor": "c"})
+    monkeypatch.setattr("app.http_cache.VersionsService.get_version", lambda table_name: None)
+
+    response = client.get("/posts?limit=100")
+
+    assert int(response.headers["Content-Length"]) == len(response.get_data())
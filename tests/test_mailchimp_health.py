@@ -0,0 +1,51 @@
+import pytest
+import requests
+from app.circuit_breaker import CircuitBreaker, OPEN
+from app.routes import health
+from app.services import mailchimp_service
+from app.services.mailchimp_service import MailchimpService
+
+
+@pytest.fixture
+def breaker(mailchimp_stub, monkeypatch):
+    monkeypatch.setattr(health, "mailchimp_breaker", mailchimp_service.mailchimp_breaker)
+    return mailchimp_service.mailchimp_breaker
+
+
+def test_health_does_not_call_mailchimp(client, mailchimp_stub, breaker):
+    mailchimp_stub.error_rate = 1.0
+
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.get_json()["mailchimp"]["state"] == "closed"
+    assert sum(mailchimp_stub.calls.values()) == 0
+
+
+def test_health_mailchimp_pings(client, mailchimp_stub, breaker):
+    assert client.get("/health/mailchimp").status_code == 200
+    mailchimp_stub.error_rate = 1.0
+    response = client.get("/health/mailchimp")
+    assert response.status_code == 503
+    assert response.get_json()["mailchimp"]["reachable"] is False
+    assert mailchimp_stub.calls["ping"] == 2
+
+
+def test_timeout_in_half_open_probe_reopens_the_circuit(mailchimp_stub, monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    monkeypatch.setattr(mailchimp_service, "mailchimp_breaker", breaker)
+    service = MailchimpService()
+
+    def timeout():
+        raise requests.exceptions.ReadTimeout("timeout")
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        service._call(timeout)
+    assert breaker.stats()["consecutive_failures"] == 1
+
+    # La llamada de prueba (half-open) también falla por timeout: el circuito
+    # vuelve a abrirse y la siguiente prueba se permite.
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        service._call(timeout)
+    assert breaker._state == OPEN
+    assert breaker.allow()
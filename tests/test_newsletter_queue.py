@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta, timezone
+import psycopg2
+import pytest
+from app.services.newsletter_queue_service import NewsletterQueueService, SUBSCRIBE, INFO_EMAIL
+from app.services.subscriber_ledger_service import SubscriberLedgerService
+from app.workers import newsletter_worker
+from config import Config
+
+
+class FakeQueue:
+    """Cola en memoria con la misma interfaz que usa el worker."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.done = []
+        self.failed = []
+
+    def claim_batch(self, limit):
+        claimed, self.jobs = self.jobs[:limit], self.jobs[limit:]
+        return claimed
+
+    def mark_done(self, job_ids):
+        self.done.extend(job_ids)
+
+    def mark_failed(self, job, error):
+        self.failed.append((job["id"], error))
+
+
+@pytest.fixture
+def fake_queue(monkeypatch):
+    def install(jobs):
+        queue = FakeQueue(jobs)
+        for name in ("claim_batch", "mark_done", "mark_failed"):
+            monkeypatch.setattr(NewsletterQueueService, name, getattr(queue, name))
+        return queue
+    return install
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(SubscriberLedgerService, "get_many", lambda emails: {})
+    monkeypatch.setattr(SubscriberLedgerService, "record", recorded.extend)
+    return recorded
+
+
+def subscription(job_id, email, fname="Ana", attempts=1):
+    return {"id": job_id, "kind": SUBSCRIBE, "attempts": attempts,
+            "payload": {"email": email, "fname": fname, "lname": ""}}
+
+
+def test_subscribe_newsletter_enqueues_and_returns_202(client, monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(SubscriberLedgerService, "is_subscribed", lambda *args: False)
+    monkeypatch.setattr(NewsletterQueueService, "enqueue", lambda kind, payload: enqueued.append((kind, payload)) or 7)
+
+    response = client.post("/subscribe_newsletter", json={"email": "ana@example.com", "fname": "Ana"})
+
+    assert response.status_code == 202
+    assert response.get_json()["job_id"] == 7
+    assert enqueued == [(SUBSCRIBE, {"email": "ana@example.com", "fname": "Ana", "lname": ""})]
+
+
+def test_retry_delay_doubles_up_to_one_hour(monkeypatch):
+    monkeypatch.setattr(Config, "NEWSLETTER_RETRY_BASE_SECONDS", 30)
+    assert [NewsletterQueueService.retry_delay(n) for n in (1, 2, 3, 4)] == [30, 60, 120, 240]
+    assert NewsletterQueueService.retry_delay(20) == 3600
+
+
+def test_is_final_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(Config, "NEWSLETTER_MAX_ATTEMPTS", 3)
+    assert not NewsletterQueueService.is_final(2)
+    assert NewsletterQueueService.is_final(3)
+
+
+def test_worker_coalesces_subscriptions_into_one_batch_call(mailchimp_stub, fake_queue, ledger):
+    queue = fake_queue([
+        subscription(1, "ana@example.com", "A"),
+        subscription(2, "ANA@example.com", "Ana"),
+        subscription(3, "luis@example.com", "Luis"),
+    ])
+
+    assert newsletter_worker.process_batch() == 3
+
+    assert mailchimp_stub.calls["batch_list_members"] == 1
+    assert sorted(queue.done) == [1, 2, 3]
+    assert queue.failed == []
+    # Del mismo email gana la petición más reciente.
+    assert [member["fname"] for member in ledger] == ["Ana", "Luis"]
+
+
+def test_worker_marks_jobs_failed_when_mailchimp_errors(mailchimp_stub, fake_queue, ledger):
+    mailchimp_stub.error_rate = 1.0
+    queue = fake_queue([subscription(1, "ana@example.com"), subscription(2, "luis@example.com")])
+
+    newsletter_worker.process_batch()
+
+    assert queue.done == []
+    assert [job_id for job_id, _ in queue.failed] == [1, 2]
+    assert ledger == []
+
+
+def test_worker_triggers_info_email(mailchimp_stub, fake_queue, ledger):
+    queue = fake_queue([{
+        "id": 5, "kind": INFO_EMAIL, "attempts": 1,
+        "payload": {"email": "ana@example.com", "fname": "Ana", "journey_id": 1, "step_id": 2},
+    }])
+
+    newsletter_worker.process_batch()
+
+    assert mailchimp_stub.calls["journey_trigger"] == 1
+    assert queue.done == [5]
+
+
+# Con PostgreSQL (TEST_POSTGRES_URI)
+
+@pytest.fixture
+def jobs_table(postgres):
+    postgres.cursor().execute("TRUNCATE newsletter_jobs RESTART IDENTITY;")
+    return postgres
+
+
+def job_row(conn, job_id):
+    cur = conn.cursor()
+    cur.execute("SELECT status, attempts, run_after, finished_at, last_error FROM newsletter_jobs WHERE id = %s;",
+                (job_id,))
+    return cur.fetchone()
+
+
+def test_enqueue_inserts_pending_job(jobs_table):
+    job_id = NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "ana@example.com", "fname": "Ana", "lname": ""})
+
+    status, attempts, _, finished_at, _ = job_row(jobs_table, job_id)
+    assert (status, attempts, finished_at) == ("pending", 0, None)
+
+
+def test_claim_batch_skips_jobs_locked_by_another_worker(jobs_table, postgres_uri):
+    first = NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "a@example.com"})
+    second = NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "b@example.com"})
+
+    other = psycopg2.connect(postgres_uri)
+    try:
+        other.cursor().execute("SELECT id FROM newsletter_jobs WHERE id = %s FOR UPDATE;", (first,))
+        assert [job["id"] for job in NewsletterQueueService.claim_batch(10)] == [second]
+        other.rollback()
+    finally:
+        other.close()
+
+    assert [job["id"] for job in NewsletterQueueService.claim_batch(10)] == [first]
+    assert NewsletterQueueService.claim_batch(10) == []
+
+
+def test_mark_failed_retries_with_backoff(jobs_table, monkeypatch):
+    monkeypatch.setattr(Config, "NEWSLETTER_RETRY_BASE_SECONDS", 30)
+    NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "a@example.com"})
+    job = NewsletterQueueService.claim_batch(10)[0]
+
+    NewsletterQueueService.mark_failed(job, "503")
+
+    status, attempts, run_after, finished_at, last_error = job_row(jobs_table, job["id"])
+    assert (status, attempts, finished_at, last_error) == ("pending", 1, None, "503")
+    assert run_after > datetime.now(timezone.utc) + timedelta(seconds=20)
+    # No se vuelve a reservar hasta que pasa el backoff.
+    assert NewsletterQueueService.claim_batch(10) == []
+
+
+def test_mark_failed_gives_up_after_max_attempts(jobs_table, monkeypatch):
+    monkeypatch.setattr(Config, "NEWSLETTER_MAX_ATTEMPTS", 1)
+    NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "a@example.com"})
+    job = NewsletterQueueService.claim_batch(10)[0]
+
+    NewsletterQueueService.mark_failed(job, "400")
+
+    status, attempts, _, finished_at, _ = job_row(jobs_table, job["id"])
+    assert (status, attempts) == ("failed", 1)
+    assert finished_at is not None
+    jobs_table.cursor().execute("UPDATE newsletter_jobs SET run_after = now() - interval '1 hour';")
+    assert NewsletterQueueService.claim_batch(10) == []
+
+
+def test_stats_report_depth_and_latency(client, jobs_table):
+    NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "a@example.com"})
+    NewsletterQueueService.enqueue(SUBSCRIBE, {"email": "b@example.com"})
+    job = NewsletterQueueService.claim_batch(1)[0]
+    jobs_table.cursor().execute("UPDATE newsletter_jobs SET created_at = now() - interval '10 seconds';")
+    NewsletterQueueService.mark_done([job["id"]])
+
+    stats = client.get("/metrics/newsletter").get_json()["data"]
+
+    assert stats["depth"] == {"pending": 1, "done": 1}
+    assert stats["oldest_pending_seconds"] >= 10
+    assert stats["avg_latency_seconds"] >= 10
@@ -0,0 +1,75 @@
+import pytest
+from app.services.posts_service import MAX_BULK_ITEMS, check_bulk_size, parse_publish_date, validate_post_fields
+
+
+def post(**overrides):
+    data = {"title": "Hola", "abstract": "", "img": "", "categories": ["cultura"], "prod": True,
+            "content": "<p>hola</p>"}
+    data.update(overrides)
+    return data
+
+
+def test_valid_post():
+    assert validate_post_fields(post()) == []
+    assert validate_post_fields(post(published_at="2026-05-01T10:00:00+02:00")) == []
+
+
+def test_missing_fields_are_required_on_create_only():
+    data = post()
+    del data["content"], data["prod"]
+
+    assert validate_post_fields(data) == ["El campo 'prod' es obligatorio", "El campo 'content' es obligatorio"]
+    assert validate_post_fields({"title": "Nuevo"}, partial=True) == []
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("title", 5, "El campo 'title' no es válido"),
+    ("prod", "true", "El campo 'prod' no es válido"),
+    ("prod", 1, "El campo 'prod' no es válido"),
+    ("categories", "cultura", "El campo 'categories' no es válido"),
+    ("categories", ["cultura", 3], "El campo 'categories' debe ser una lista de textos"),
+    ("content", None, "El campo 'content' no es válido"),
+    ("published_at", "mañana", "Fecha de publicación no válida: 'mañana'"),
+    ("published_at", 1767225600, "El campo 'published_at' no es válido"),
+])
+def test_invalid_values(field, value, message):
+    assert validate_post_fields(post(**{field: value})) == [message]
+    assert validate_post_fields({field: value}, partial=True) == [message]
+
+
+@pytest.mark.parametrize("title", ["", "   ", "\n\t"])
+def test_empty_title(title):
+    assert validate_post_fields(post(title=title)) == ["El campo 'title' no puede estar vacío"]
+
+
+def test_every_error_is_reported():
+    errors = validate_post_fields({"title": " ", "prod": "sí"})
+
+    assert errors == [
+        "El campo 'abstract' es obligatorio",
+        "El campo 'img' es obligatorio",
+        "El campo 'categories' es obligatorio",
+        "El campo 'prod' no es válido",
+        "El campo 'content' es obligatorio",
+        "El campo 'title' no puede estar vacío",
+    ]
+
+
+@pytest.mark.parametrize("data", [None, [], "post", 3])
+def test_post_must_be_an_object(data):
+    assert validate_post_fields(data) == ["Cada post debe ser un objeto JSON"]
+
+
+def test_publish_date_is_stored_as_naive_utc():
+    assert parse_publish_date("2026-05-01T10:00:00+02:00").isoformat() == "2026-05-01T08:00:00"
+    assert parse_publish_date("2026-05-01T10:00:00").isoformat() == "2026-05-01T10:00:00"
+
+
+@pytest.mark.parametrize("items, message", [
+    ([], "Se requiere una lista de posts no vacía"),
+    ({"title": "Hola"}, "Se requiere una lista de posts no vacía"),
+    ([post()] * (MAX_BULK_ITEMS + 1), f"Se admiten como máximo {MAX_BULK_ITEMS} posts por petición"),
+])
+def test_bulk_size(items, message):
+    with pytest.raises(ValueError, match=message):
+        check_bulk_size(items)
@@ -0,0 +1,64 @@
+import pytest
+from app import rate_limit
+from app.rate_limit import MemoryRateLimitStore, client_ip
+from app.services.async_reads import AsyncReadsService
+from app.services.newsletter_queue_service import NewsletterQueueService
+from app.services.subscriber_ledger_service import SubscriberLedgerService
+from config import Config
+
+
+@pytest.fixture
+def behind_proxy(monkeypatch):
+    monkeypatch.setattr(Config, "PROXY_COUNT", 1)
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "store", MemoryRateLimitStore(max_keys=100))
+
+
+def test_client_ip_follows_proxy_count(monkeypatch):
+    monkeypatch.setattr(Config, "PROXY_COUNT", 1)
+    assert client_ip("10.0.0.1", "203.0.113.7") == "203.0.113.7"
+    # Lo que el cliente añade por la izquierda no cuenta.
+    assert client_ip("10.0.0.1", "1.2.3.4, 203.0.113.7") == "203.0.113.7"
+    assert client_ip("10.0.0.1", None) == "10.0.0.1"
+
+    monkeypatch.setattr(Config, "PROXY_COUNT", 2)
+    assert client_ip("10.0.0.1", "1.2.3.4, 203.0.113.7, 10.0.0.2") == "203.0.113.7"
+    assert client_ip("10.0.0.1", "10.0.0.2") == "10.0.0.1"
+
+    monkeypatch.setattr(Config, "PROXY_COUNT", 0)
+    assert client_ip("10.0.0.1", "203.0.113.7") == "10.0.0.1"
+
+
+def test_flask_limit_is_per_forwarded_client(behind_proxy, monkeypatch):
+    from app import create_app
+    monkeypatch.setattr(SubscriberLedgerService, "is_subscribed", lambda *args: False)
+    monkeypatch.setattr(NewsletterQueueService, "enqueue", lambda kind, payload: 1)
+    client = create_app().test_client()
+
+    def subscribe(forwarded_for):
+        return client.post("/subscribe_newsletter", json={"email": "ana@example.com"},
+                           headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    burst, _ = rate_limit.parse_limit(Config.RATE_LIMIT_NEWSLETTER)
+    assert [subscribe("203.0.113.7") for _ in range(burst)] == [202] * burst
+    assert subscribe("9.9.9.9, 203.0.113.7") == 429
+    assert subscribe("203.0.113.8") == 202
+
+
+def test_asgi_limit_is_per_forwarded_client(behind_proxy, monkeypatch):
+    from starlette.testclient import TestClient
+    from app.asgi import create_asgi_app
+
+    async def no_version(table_name):
+        return None
+
+    monkeypatch.setattr(AsyncReadsService, "get_version", no_version)
+    client = TestClient(create_asgi_app())
+
+    def search(forwarded_for):
+        return client.get("/posts/search", headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    burst, _ = rate_limit.parse_limit(Config.RATE_LIMIT_SEARCH)
+    assert [search("203.0.113.7") for _ in range(burst)] == [400] * burst
+    assert search("9.9.9.9, 203.0.113.7") == 429
+    assert search("203.0.113.8") == 400
@@ -0,0 +1,52 @@
+import pytest
+from app.cache import TTLCache, cached
+from app.services.versions_service import VersionsService
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    current = {"posts": 1}
+    monkeypatch.setattr(VersionsService, "get_version", lambda table_name: (current[table_name], None))
+    return current
+
+
+def test_cached_reads_are_keyed_by_content_version(versions):
+    cache = TTLCache(maxsize=10, ttl=60)
+    loads = []
+
+    @cached(lambda post_id: ("posts", "post", post_id), cache=cache)
+    def get_post(post_id):
+        loads.append(versions["posts"])
+        return {"id": post_id, "version": versions["posts"]}
+
+    assert get_post("a")["version"] == 1
+    assert get_post("a")["version"] == 1
+    # Escritura de otro proceso: ninguna invalidación local, solo la versión nueva.
+    versions["posts"] = 2
+    assert get_post("a")["version"] == 2
+    assert loads == [1, 2]
+
+
+def test_conditional_body_is_read_with_the_etag_version(monkeypatch):
+    from flask import Flask, jsonify
+    from app.http_cache import conditional, make_etag
+    versions = iter([1, 2, 3])
+    monkeypatch.setattr(VersionsService, "get_version", lambda table_name: (next(versions), None))
+    cache = TTLCache(maxsize=10, ttl=60)
+    app = Flask(__name__)
+
+    @cached(lambda: ("posts", "index"), cache=cache)
+    def read_index():
+        return []
+
+    @app.route("/index")
+    @conditional("posts")
+    def index():
+        read_index()
+        return jsonify([list(key) for key in cache._data])
+
+    # Otro proceso escribe justo después de calcular el ETag: la lectura usa la misma versión.
+    response = app.test_client().get("/index")
+
+    assert response.get_json() == [["posts", "index", 1]]
+    assert response.headers["ETag"].strip('W/"') == make_etag({"posts": 1}, "/index?")
@@ -0,0 +1,76 @@
+import pytest
+from app.services.posts_service import assign_slugs
+from app.slugs import slugify, with_suffix
+from config import Config
+
+
+class FakeCursor:
+    """Devuelve los slugs ocupados (slug, dueño) a TAKEN_SLUGS_QUERY."""
+
+    def __init__(self, taken):
+        self.taken = taken
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+
+    def fetchall(self):
+        return self.taken
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("¿Qué es el Pichón?", "que-es-el-pichon"),
+    ("Ñandú   & Cigüeña", "nandu-ciguena"),
+    ("  --Hola--Mundo--  ", "hola-mundo"),
+    ("Año 2026: ¡ya!", "ano-2026-ya"),
+    ("", "post"),
+    (None, "post"),
+    ("¿¡…!?", "post"),
+    ("日本語", "post"),
+])
+def test_slugify(title, expected):
+    assert slugify(title) == expected
+
+
+def test_slugify_cuts_long_titles_between_words(monkeypatch):
+    monkeypatch.setattr(Config, "SLUG_MAX_LENGTH", 10)
+
+    assert slugify("uno dos tres cuatro") == "uno-dos"
+    assert slugify("uno dosdos tres") == "uno-dosdos"
+    assert slugify("supercalifragilistico") == "supercalif"
+
+
+def test_with_suffix_takes_the_first_free_number():
+    assert with_suffix("hola", set()) == "hola"
+    assert with_suffix("hola", {"hola"}) == "hola-2"
+    assert with_suffix("hola", {"hola", "hola-2", "hola-4"}) == "hola-3"
+    assert with_suffix("hola", {"hola-2"}) == "hola"
+
+
+def test_assign_slugs_adds_suffixes_for_other_owners():
+    cur = FakeCursor([("hola", "1"), ("hola-2", "2"), ("hola-mundo", "3")])
+
+    assert assign_slugs(cur, [("9", "Hola")]) == ["hola-3"]
+    _, params = cur.queries[-1]
+    assert params == {"bases": ["hola"], "patterns": ["hola-%"]}
+
+
+def test_assign_slugs_keeps_the_post_own_slug():
+    # El slug actual del post (o uno de su historial) no cuenta como ocupado.
+    cur = FakeCursor([("hola", "1"), ("hola-2", "2")])
+
+    assert assign_slugs(cur, [("1", "¡Hola!")]) == ["hola"]
+    assert assign_slugs(cur, [("2", "Hola")]) == ["hola-2"]
+
+
+def test_assign_slugs_resolves_collisions_within_the_batch():
+    cur = FakeCursor([("hola", "1")])
+
+    assert assign_slugs(cur, [("7", "Hola"), ("8", "hola"), ("9", "Adiós")]) == ["hola-2", "hola-3", "adios"]
+
+
+def test_assign_slugs_without_items_does_not_query():
+    cur = FakeCursor([])
+
+    assert assign_slugs(cur, []) == []
+    assert cur.queries == []
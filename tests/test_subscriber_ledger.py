@@ -0,0 +1,122 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import psycopg2
+import pytest
+from app.services import subscriber_ledger_service
+from app.services.subscriber_ledger_service import SubscriberLedgerService, RECONCILE_LOCK_ID, subscriber_hash
+
+
+class FakeExport:
+    """Exportación de Mailchimp por páginas; comprueba que no haya conexiones tomadas."""
+
+    def __init__(self, members, connections):
+        self.members = members
+        self.connections = connections
+        self.offsets = []
+
+    def export_members(self, offset, count):
+        assert self.connections["open"] == 0
+        self.offsets.append(offset)
+        return self.members[offset:offset + count], len(self.members)
+
+
+class FakeCursor:
+    def __init__(self, lock_available, statements):
+        self.lock_available = lock_available
+        self.statements = statements
+
+    def execute(self, query, params=None):
+        self.statements.append(query.split()[0])
+
+    def fetchone(self):
+        return (self.lock_available,)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    state = {"open": 0, "lock_available": True, "statements": [], "pages": []}
+
+    class FakeConnection:
+        def cursor(self):
+            return FakeCursor(state["lock_available"], state["statements"])
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+    @contextmanager
+    def db_connection():
+        state["open"] += 1
+        try:
+            yield FakeConnection()
+        finally:
+            state["open"] -= 1
+
+    monkeypatch.setattr(subscriber_ledger_service, "db_connection", db_connection)
+    monkeypatch.setattr(SubscriberLedgerService, "_upsert",
+                        lambda cur, members, status, synced_at: state["pages"].append(len(members)))
+    return state
+
+
+def member(n):
+    return {"email": f"user{n}@example.com", "status": "subscribed", "fname": "", "lname": ""}
+
+
+def test_reconcile_fetches_pages_without_holding_a_connection(fake_db):
+    export = FakeExport([member(n) for n in range(5)], fake_db)
+
+    assert SubscriberLedgerService.reconcile(export, page_size=2) == 5
+
+    assert export.offsets == [0, 2, 4]
+    # Una transacción por página y la del borrado final.
+    assert fake_db["pages"] == [2, 2, 1, 0]
+    assert fake_db["statements"].count("DELETE") == 1
+
+
+def test_reconcile_gives_up_when_another_process_holds_the_lock(fake_db):
+    fake_db["lock_available"] = False
+    export = FakeExport([member(n) for n in range(5)], fake_db)
+
+    assert SubscriberLedgerService.reconcile(export, page_size=2) is None
+
+    assert export.offsets == [0]
+    assert fake_db["pages"] == []
+    assert "DELETE" not in fake_db["statements"]
+
+
+# Con PostgreSQL (TEST_POSTGRES_URI)
+
+@pytest.fixture
+def ledger_table(postgres):
+    postgres.cursor().execute("TRUNCATE newsletter_subscribers;")
+    return postgres
+
+
+def test_reconcile_replaces_the_ledger(ledger_table):
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    SubscriberLedgerService.record([member(0), member(99)], synced_at=old)
+    assert SubscriberLedgerService.reconcile_due(86400)
+
+    export = FakeExport([member(n) for n in range(3)], {"open": 0})
+    assert SubscriberLedgerService.reconcile(export, page_size=2) == 3
+
+    cur = ledger_table.cursor()
+    cur.execute("SELECT subscriber_hash FROM newsletter_subscribers;")
+    assert {row[0] for row in cur.fetchall()} == {subscriber_hash(member(n)["email"]) for n in range(3)}
+    assert not SubscriberLedgerService.reconcile_due(86400)
+
+
+def test_reconcile_skips_while_another_transaction_holds_the_lock(ledger_table, postgres_uri):
+    other = psycopg2.connect(postgres_uri)
+    try:
+        other.cursor().execute("SELECT pg_advisory_xact_lock(%s);", (RECONCILE_LOCK_ID,))
+        export = FakeExport([member(0)], {"open": 0})
+        assert SubscriberLedgerService.reconcile(export) is None
+        other.rollback()
+    finally:
+        other.close()
@@ -0,0 +1,74 @@
+from datetime import datetime
+import xml.etree.ElementTree as ET
+import pytest
+from app import syndication
+from app.services.posts_service import PostsService
+from app.services.versions_service import VersionsService
+
+
+def post(n):
+    return {"id": str(n), "title": f"Post {n}", "slug": f"post-{n}", "abstract": "", "excerpt": "",
+            "published_at": datetime(2026, 1, n), "category_name": []}
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Versión y datos de 'posts' tal y como los vería PostgreSQL."""
+    state = {"version": 1, "posts": [post(1)], "reads": 0}
+
+    def get_syndication_data(limit, fields):
+        state["reads"] += 1
+        entries = [dict(p, updated_at=None) for p in state["posts"]]
+        return state["version"], list(state["posts"]), entries
+
+    monkeypatch.setattr(PostsService, "get_syndication_data", get_syndication_data)
+    monkeypatch.setattr(VersionsService, "get_version", lambda table_name: (state["version"], None))
+    return state
+
+
+@pytest.fixture
+def store(tmp_path):
+    return syndication.SnapshotStore(str(tmp_path))
+
+
+def test_snapshot_is_stamped_with_the_version_read_with_its_data(store, database, monkeypatch):
+    # La versión leída por separado va por detrás de la de los datos.
+    monkeypatch.setattr(VersionsService, "get_version", lambda table_name: (0, None))
+    database["version"] = 2
+
+    store.refresh()
+
+    assert store._stored_version("feed.xml") == 2
+    assert store._load("feed.xml", 2) is not None
+
+
+def test_get_regenerates_when_another_process_bumped_the_version(store, database):
+    body, _ = store.get("feed.xml")
+    assert b"post-2" not in body
+
+    # Publicación de otro proceso (p. ej. el feed_scheduler independiente): ningún aviso local.
+    database["posts"] = [post(2), post(1)]
+    database["version"] = 2
+
+    body, _ = store.get("feed.xml")
+    assert b"post-2" in body
+    assert store._stored_version("sitemap.xml") == 2
+
+
+def test_refresh_skips_reads_when_snapshots_are_current(store, database):
+    store.refresh()
+    reads = database["reads"]
+
+    assert store.refresh() == []
+    assert database["reads"] == reads
+
+
+def test_rendering_leaves_global_namespaces_alone():
+    namespaces = dict(ET._namespace_map)
+
+    atom = ET.fromstring(syndication.render_atom([post(1)]))
+    sitemap = ET.fromstring(syndication.render_sitemap([dict(post(1), updated_at=None)]))
+
+    assert ET._namespace_map == namespaces
+    assert atom.find(f"{{{syndication.ATOM_NS}}}entry/{{{syndication.ATOM_NS}}}title").text == "Post 1"
+    assert len(sitemap.findall(f"{{{syndication.SITEMAP_NS}}}url")) == 2
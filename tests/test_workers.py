@@ -0,0 +1,34 @@
+import threading
+from app import workers
+from app.workers import start_once
+
+
+def test_start_once_starts_one_thread_per_process(monkeypatch):
+    monkeypatch.setattr(workers, "_started", {})
+    started = threading.Semaphore(0)
+
+    def target(stop_event):
+        assert threading.current_thread().name == "prueba"
+        started.release()
+        stop_event.wait()
+
+    first = start_once("prueba", target)
+    try:
+        assert start_once("prueba", target) is first
+        # Tras un fork el hilo del padre no existe en el hijo: se arranca otro.
+        monkeypatch.setattr(workers.os, "getpid", lambda: -1)
+        second = start_once("prueba", target)
+        assert second is not first
+    finally:
+        first.set()
+        second.set()
+
+    assert started.acquire(timeout=1) and started.acquire(timeout=1)
+    assert not started.acquire(timeout=0.05)
+
+
+def test_start_once_disabled(monkeypatch):
+    monkeypatch.setattr(workers, "_started", {})
+
+    assert start_once("prueba", lambda stop_event: None, enabled=False) is None
+    assert workers._started == {}